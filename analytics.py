@@ -1,19 +1,27 @@
+import os
 import streamlit as st
 import requests
+import numpy as np
 import pandas as pd
-
-
-
-url = "https://fantasy.premierleague.com/api/bootstrap-static/"
-response = requests.get(url)
-data = response.json()
-
-
-url = "https://fantasy.premierleague.com/api/fixtures/"
-response = requests.get(url)
-fixtures_data = response.json()
-
-def suggest_triple_captain(user_id, data, fixtures):
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from fixture_index import get_fixture_index
+from fpl_client import get_client
+from profiling import timed
+from ratelimit import TokenBucket
+from visuals import load_projection
+
+# Mini-league batch modu: paralel istek sayısı ve saniyedeki istek limiti
+BATCH_WORKERS = int(os.getenv("FPL_BATCH_WORKERS", "16"))
+BATCH_RATE = float(os.getenv("FPL_BATCH_RATE", "25"))
+
+def suggest_triple_captain(user_id, data, fixtures, context=None, projection=None):
+    """
+    - context: fpl_client.EntryContext for the current GW; loaded via the
+      shared client when not given (check_wildcard ile aynı nesne paylaşılır)
+    - projection: xpoints.Projection that covers the current GW (chip bu GW
+      için oynanır; load_projection(..., gw=current)); if given, candidates
+      that pass the rules are ranked by this GW's expected points (then form)
+    """
     players = pd.DataFrame(data["elements"])
     teams = pd.DataFrame(data["teams"])
     events = pd.DataFrame(data["events"])
@@ -25,44 +33,40 @@ def suggest_triple_captain(user_id, data, fixtures):
     current_gw = events.loc[events["is_current"] == True, "id"].values[0]
 
     # Get user squad
-    entry_url = f"https://fantasy.premierleague.com/api/entry/{user_id}/event/{current_gw}/picks/"
-    squad = requests.get(entry_url).json()["picks"]
+    if context is None:
+        context = get_client().entry_context(user_id, current_gw)
+    squad = context.picks()["picks"]
     squad_ids = [p["element"] for p in squad]
 
     user_players = players[players["id"].isin(squad_ids)].copy()
     user_players["form"] = user_players["form"].astype(float)
+    order = ["form"]
+    if projection is not None:
+        user_players["xp"] = projection.for_gw(user_players["id"], current_gw)
+        order = ["xp", "form"]
 
-    # GW Fixtures
-    gw_fixtures = [f for f in fixtures if f["event"] == current_gw]
+    def xp_text(best):
+        return f", xP {best['xp']:.1f}" if projection is not None else ""
 
-    # Fixture difficulty table (team id → avg difficulty)
-    fixture_df = pd.DataFrame([
-        {"team": f["team_h"], "difficulty": f["team_h_difficulty"]} for f in gw_fixtures
-    ] + [
-        {"team": f["team_a"], "difficulty": f["team_a_difficulty"]} for f in gw_fixtures
-    ])
-    team_difficulty = fixture_df.groupby("team")["difficulty"].mean().to_dict()
+    # GW fixtures: takım × GW dizilerinden fikstür sayısı ve ortalama FDR
+    index = get_fixture_index(fixtures)
+    team_ids = user_players["team"].to_numpy()
+    user_players["team_difficulty"] = index.mean_difficulty(team_ids, current_gw, current_gw + 1)
 
     # Find Double GW players
-    doubles = []
-    for pid in user_players["id"]:
-        team_id = user_players.loc[user_players["id"] == pid, "team"].values[0]
-        matches = [f for f in gw_fixtures if f["team_h"] == team_id or f["team_a"] == team_id]
-        if len(matches) > 1:
-            doubles.append(pid)
+    doubles = user_players.loc[index.counts(team_ids, current_gw) > 1, "id"].tolist()
 
     # --- Priority  1: Double GW + form >= 5.5
     candidates = user_players[(user_players["form"] >= 5.5) & (user_players["id"].isin(doubles))]
     if not candidates.empty:
-        best = candidates.sort_values("form", ascending=False).iloc[0]
-        return f"🎯 Triple Captain candidate: {best['web_name']} ({teams.loc[best['team']-1,'name']}) - Form {best['form']}, Double GW!"
+        best = candidates.sort_values(order, ascending=False).iloc[0]
+        return f"🎯 Triple Captain candidate: {best['web_name']} ({teams.loc[best['team']-1,'name']}) - Form {best['form']}{xp_text(best)}, Double GW!"
     
     # --- Priority  lik 2: Single game + form >= 6.5 + easy fixture
-    user_players["team_difficulty"] = user_players["team"].map(team_difficulty)
     candidates = user_players[(user_players["form"] >= 6.5) & (user_players["team_difficulty"] <= 2.5)]
     if not candidates.empty:
-        best = candidates.sort_values("form", ascending=False).iloc[0]
-        return f"🎯 Alternative  Triple Captain candidate: {best['web_name']} ({teams.loc[best['team']-1,'name']}) - Form {best['form']}, easy fixture ({best['team_difficulty']})"
+        best = candidates.sort_values(order, ascending=False).iloc[0]
+        return f"🎯 Alternative  Triple Captain candidate: {best['web_name']} ({teams.loc[best['team']-1,'name']}) - Form {best['form']}{xp_text(best)}, easy fixture ({best['team_difficulty']})"
     
     # --- Nothing found, explain why 
     reasons = []
@@ -70,7 +74,7 @@ def suggest_triple_captain(user_id, data, fixtures):
         reasons.append("No Double GW")
     if user_players["form"].max() < 6.5:
         reasons.append("You don't have any in-form players")
-    if user_players["team"].map(team_difficulty).min() > 2.5:
+    if user_players["team_difficulty"].min() > 2.5:
         reasons.append("fixtures are not easy enough")
 
     reason_text = ", ".join(reasons) if reasons else "general conditions are not suitable"
@@ -79,7 +83,8 @@ def suggest_triple_captain(user_id, data, fixtures):
 
 
 def check_wildcard(user_id, data, fixtures, lookahead_gw=5, form_weeks=5,
-                   form_threshold_count=3, fdr_threshold=3.6, injured_threshold=0.25): 
+                   form_threshold_count=3, fdr_threshold=3.6, injured_threshold=0.25, context=None,
+                   projection=None):
     """
 Wildcard check (more robust version).
 - user_id: FPL entry id (int or str)
@@ -90,6 +95,8 @@ Wildcard check (more robust version).
 - form_threshold_count: number of times in the past form_weeks that it falls below will be considered bad form (default 3)
 - fdr_threshold: average FDR threshold (e.g. 3.6)
 - injured_threshold: injured/penalty ratio threshold (e.g. 0.25)
+- context: fpl_client.EntryContext (picks + history) for the current GW; loaded if not given
+- projection: xpoints.Projection; if given, the squad's expected points over lookahead_gw are reported too
     """
 
     players = pd.DataFrame(data.get("elements", []))
@@ -106,12 +113,14 @@ Wildcard check (more robust version).
        # fallback: smallest unfinished or max id - safer logic varies optional
         raise RuntimeError("Couldn't determine current GW from bootstrap 'events' data.")
 
+    if context is None:
+        context = get_client().entry_context(user_id, current_gw)
+
     # --- 1) Check the user's history (safe)
-    history_url = f"https://fantasy.premierleague.com/api/entry/{user_id}/history/"
-    r = requests.get(history_url)
-    if r.status_code != 200:
-        raise RuntimeError(f"History fetch failed (status {r.status_code}) for user {user_id}")
-    hist = r.json()
+    try:
+        hist = context.history()
+    except requests.HTTPError as e:
+        raise RuntimeError(f"History fetch failed (status {e.response.status_code}) for user {user_id}")
     if "current" not in hist or len(hist["current"]) == 0:
         # bazen farklı yapı olabilir; handle gracefully
         return "⚠️ User history not found or empty. Check ID."
@@ -129,11 +138,10 @@ Wildcard check (more robust version).
     bad_form = under_avg >= form_threshold_count
 
     # --- 2) Squad/picks check
-    picks_url = f"https://fantasy.premierleague.com/api/entry/{user_id}/event/{current_gw}/picks/"
-    r = requests.get(picks_url)
-    if r.status_code != 200:
+    try:
+        picks_json = context.picks()
+    except requests.HTTPError:
         return "⚠️ Could not retrieve user picks data. (private / non-existent / rate-limited?)"
-    picks_json = r.json()
     # The picks JSON structure may vary (some endpoints will have different responses when there are no 'picks')
     if "picks" not in picks_json:
         return "⚠️ Picks information is not in the response."
@@ -145,19 +153,11 @@ Wildcard check (more robust version).
         return "⚠️ Squad data did not match (player IDs not found)."
 
     # --- 3) Fixture challenges: upcoming lookahead_gw weekly average FDR
-    gw_fixtures = [f for f in fixtures if f.get("event") and current_gw <= f["event"] < current_gw + lookahead_gw]
-    if len(gw_fixtures) == 0:
-        avg_fdr = float("nan")
-    else:
-        rows = []
-        for f in gw_fixtures:
-            rows.append({"team": int(f["team_h"]), "diff": float(f["team_h_difficulty"])})
-            rows.append({"team": int(f["team_a"]), "diff": float(f["team_a_difficulty"])})
-        fix_df = pd.DataFrame(rows)
-        team_diff_map = fix_df.groupby("team")["diff"].mean().to_dict()
-        # map team difficulties to the user's squad
-        squad_players["team_difficulty"] = squad_players["team"].map(team_diff_map)
-        avg_fdr = float(squad_players["team_difficulty"].dropna().mean()) if not squad_players["team_difficulty"].dropna().empty else float("nan")
+    index = get_fixture_index(fixtures)
+    squad_players["team_difficulty"] = index.mean_difficulty(
+        squad_players["team"].to_numpy(), current_gw, current_gw + lookahead_gw
+    )
+    avg_fdr = float(squad_players["team_difficulty"].dropna().mean()) if not squad_players["team_difficulty"].dropna().empty else float("nan")
 
     hard_fixtures = False
     if not pd.isna(avg_fdr):
@@ -181,6 +181,9 @@ Wildcard check (more robust version).
         reasons.append("insufficient fixture data")
     if many_injuries:
         reasons.append(f"{int(injured_ratio*100)}% of the squad is injured/questionable/suspended")
+    if projection is not None:
+        squad_xp = float(np.nansum(projection.total(squad_players["id"], lookahead_gw)))
+        reasons.append(f"squad projects {squad_xp:.1f} points over the next {min(lookahead_gw, projection.horizon)} GW")
 
     # Decision logic: propose a wildcard if one or more reasons exist
     if bad_form or hard_fixtures or many_injuries:
@@ -188,24 +191,240 @@ Wildcard check (more robust version).
     else:
         return "✅ There doesn't seem to be any pressing reason for a wildcard " + "; ".join(reasons) + "."
     
-def chip_suggestion():
+def _fetch_entries(entry_ids, gw, max_workers=BATCH_WORKERS, rate=BATCH_RATE):
+    """
+    picks (gw) + history of many entries concurrently, rate limited by a token bucket.
+    Returns (picks, histories, errors) dicts keyed by entry id.
+    """
+    client = get_client()
+    bucket = TokenBucket(rate)
+
+    def fetch(kind, entry):
+        bucket.acquire()
+        if kind == "picks":
+            return client.entry_picks(entry, gw)
+        return client.entry_history(entry)
+
+    results = {"picks": {}, "history": {}}
+    errors = {}
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        futures = {
+            pool.submit(fetch, kind, entry): (kind, entry)
+            for entry in entry_ids for kind in ("picks", "history")
+        }
+        for future in as_completed(futures):
+            kind, entry = futures[future]
+            try:
+                results[kind][entry] = future.result()
+            except Exception as e:
+                errors[entry] = f"{kind} fetch failed: {e}"
+    return results["picks"], results["history"], errors
+
+
+def evaluate_chips_batch(picks, histories, data, fixtures, lookahead_gw=5, form_weeks=5,
+                         form_threshold_count=3, fdr_threshold=3.6, injured_threshold=0.25, projection=None,
+                         tc_projection=None):
+    """
+    suggest_triple_captain + check_wildcard rules applied to every squad at once.
+    - picks / histories: {entry: picks JSON} / {entry: history JSON}
+    - projection: xpoints.Projection of the upcoming GWs; adds squad_xp
+    - tc_projection: xpoints.Projection covering the current GW; ranks TC
+      candidates by xP and adds tc_xp
+    Returns one row per entry with the TC pick, the wildcard decision and its inputs.
+    Entries without any history rows are left out (no wildcard decision without
+    history; league_chip_suggestions reports them as errors).
+    """
+    players = pd.DataFrame(data["elements"])
+    teams = pd.DataFrame(data["teams"])
+    events = pd.DataFrame(data["events"])
+    current_gw = int(events.loc[events["is_current"] == True, "id"].values[0])
+
+    picks = {e: js for e, js in picks.items() if histories.get(e, {}).get("current")}
+    squads = pd.DataFrame(
+        [(entry, p["element"]) for entry, js in picks.items() for p in js.get("picks", [])],
+        columns=["entry", "id"],
+    )
+    # Tek kullanıcılı sürümle aynı eşitlik sırası için bootstrap oyuncu sırası korunur
+    squads = players[["id", "web_name", "team", "form", "status"]].merge(squads, on="id")
+    squads["form"] = squads["form"].astype(float)
+    squads["team_name"] = squads["team"].map(teams.set_index("id")["name"])
+
+    # Bütün kadrolar için tek seferde takım × GW lookup'ları
+    index = get_fixture_index(fixtures)
+    team_ids = squads["team"].to_numpy()
+    squads["double"] = index.counts(team_ids, current_gw) > 1
+    squads["gw_difficulty"] = index.mean_difficulty(team_ids, current_gw, current_gw + 1)
+    squads["lookahead_difficulty"] = index.mean_difficulty(team_ids, current_gw, current_gw + lookahead_gw)
+    squads["flagged"] = squads["status"].isin(["i", "s", "d"])
+    order = ["form"]
+    if tc_projection is not None:
+        squads["xp"] = tc_projection.for_gw(squads["id"], current_gw)
+        order = ["xp", "form"]
+    if projection is not None:
+        squads["xp_horizon"] = projection.total(squads["id"], lookahead_gw)
+
+    out = squads.groupby("entry").agg(
+        doubles=("double", "sum"),
+        max_form=("form", "max"),
+        min_gw_difficulty=("gw_difficulty", "min"),
+        avg_fdr=("lookahead_difficulty", "mean"),
+        injured_ratio=("flagged", "mean"),
+    )
+
+    # --- Triple Captain: 1) double GW + form >= 5.5, 2) form >= 6.5 + easy fixture
+    by_form = squads.sort_values(order, ascending=False, kind="stable")
+    double_pick = by_form[(by_form["form"] >= 5.5) & by_form["double"]].drop_duplicates("entry").set_index("entry")
+    easy_pick = by_form[(by_form["form"] >= 6.5) & (by_form["gw_difficulty"] <= 2.5)].drop_duplicates("entry").set_index("entry")
+
+    reasons = pd.DataFrame({
+        "No Double GW": out["doubles"] == 0,
+        "You don't have any in-form players": out["max_form"] < 6.5,
+        "fixtures are not easy enough": out["min_gw_difficulty"] > 2.5,
+    })
+    # result_type="reduce": boş tabloda da Series döner (hiç entry çekilemediğinde)
+    no_tc = reasons.apply(
+        lambda r: ", ".join(r.index[r]) or "general conditions are not suitable", axis=1, result_type="reduce"
+    )
+    easy_label = "easy fixture (" + easy_pick["gw_difficulty"].astype(str) + ")"
+    out["triple_captain"] = double_pick["web_name"].combine_first(easy_pick["web_name"])
+    out["tc_team"] = double_pick["team_name"].combine_first(easy_pick["team_name"])
+    out["tc_form"] = double_pick["form"].combine_first(easy_pick["form"])
+    out["tc_reason"] = pd.Series("Double GW", index=double_pick.index).combine_first(easy_label).combine_first(no_tc)
+    if tc_projection is not None:
+        out["tc_xp"] = double_pick["xp"].combine_first(easy_pick["xp"])
+    if projection is not None:
+        out["squad_xp"] = squads.groupby("entry")["xp_horizon"].sum()
+
+    # --- Wildcard: son form_weeks haftada sezon ortalamasının altında kalma sayısı
+    hist = pd.DataFrame(
+        [(entry, row["points"]) for entry, js in histories.items() for row in js.get("current", [])],
+        columns=["entry", "points"],
+    )
+    season_mean = hist.groupby("entry")["points"].mean()
+    last_n = hist.groupby("entry").tail(form_weeks)
+    below = last_n["points"] < last_n["entry"].map(season_mean)
+    out["season_mean"] = season_mean
+    out["under_avg"] = below.groupby(last_n["entry"]).sum().reindex(out.index)
+
+    bad_form = out["under_avg"] >= form_threshold_count
+    hard_fixtures = out["avg_fdr"] >= fdr_threshold
+    many_injuries = out["injured_ratio"] >= injured_threshold
+    out["wildcard"] = bad_form | hard_fixtures | many_injuries
+    out["wc_reason"] = pd.DataFrame({
+        "bad form": bad_form, "hard fixtures": hard_fixtures, "injuries": many_injuries,
+    }).apply(lambda r: ", ".join(r.index[r]), axis=1, result_type="reduce")
+
+    columns = ["triple_captain", "tc_team", "tc_form", "tc_reason", "wildcard", "wc_reason",
+               "season_mean", "under_avg", "avg_fdr", "injured_ratio"]
+    if tc_projection is not None:
+        columns[3:3] = ["tc_xp"]
+    if projection is not None:
+        columns.append("squad_xp")
+    return out[columns].rename_axis("entry").reset_index()
+
+
+def league_chip_suggestions(league_id=None, entry_ids=None, max_workers=BATCH_WORKERS, rate=BATCH_RATE,
+                            projection=None, tc_projection=None):
+    """
+    Mini-league batch mode: TC + Wildcard advice for every entry of a classic
+    league (or an explicit list of entry ids) in one table.
+    - projection / tc_projection: see evaluate_chips_batch
+    """
+    client = get_client()
+    data = client.bootstrap()
+    fixtures = client.fixtures()
+    current_gw = next(e["id"] for e in data["events"] if e["is_current"])
+
+    if league_id is not None:
+        entries = pd.DataFrame(client.league_entries(league_id), columns=["entry", "entry_name", "player_name"])
+    else:
+        entries = pd.DataFrame({"entry": [int(e) for e in entry_ids]})
+
+    picks, histories, errors = _fetch_entries(entries["entry"].tolist(), current_gw, max_workers, rate)
+    for entry, js in histories.items():
+        if entry not in errors and not js.get("current"):
+            errors[entry] = "User history not found or empty"
+    ok = {e: picks[e] for e in picks if e in histories and e not in errors}
+    table = evaluate_chips_batch(ok, {e: histories[e] for e in ok}, data, fixtures,
+                                 projection=projection, tc_projection=tc_projection)
+
+    result = entries.merge(table, on="entry", how="left")
+    result["error"] = result["entry"].map(errors)
+    return result
+
+
+@st.cache_data(ttl=600, show_spinner="Fetching league squads...")
+def _league_chip_table(league_id, entry_ids, projection_versions=(), _projection=None, _tc_projection=None):
+    # Projeksiyonlar hash'lenmez; anahtara versiyonları (projection_versions) girer
+    return league_chip_suggestions(league_id=league_id, entry_ids=entry_ids,
+                                   projection=_projection, tc_projection=_tc_projection)
+
+
+def _parse_entry_ids(text):
+    return tuple(int(t) for t in text.replace(";", ",").replace(" ", ",").split(",") if t.strip().isdigit())
+
+
+@timed("chip_suggestion")
+def chip_suggestion(players=None):
     st.title("🎮 Chip Suggestions for FPL")
 
+    # players (player table handle) verilirse öneriler xP projeksiyonuyla sıralanır:
+    # wildcard önümüzdeki GW'lere, triple captain current GW'ye bakar
+    projection = tc_projection = None
+    if players is not None:
+        events = get_client().bootstrap()["events"]
+        projection = load_projection(players, events)
+        current = next((e["id"] for e in events if e["is_current"]), None)
+        if current is not None:
+            tc_projection = load_projection(players, events, horizon=1, gw=current)
+
     # 1) User ID input
     user_id = st.text_input("Enter your FPL User ID:", placeholder="ex. 123456")
 
     if user_id:
+        # Bootstrap ve fixtures import anında değil, ilk kullanımda yüklenir
+        client = get_client()
+        data = client.bootstrap()
+        fixtures_data = client.fixtures()
+        # picks + history tek seferde (paralel) çekilir, iki chip fonksiyonu aynı nesneyi kullanır.
+        # Diğer panellerin tetiklediği rerun'larda TTL süresince tekrar istek atılmaz.
+        current_gw = next(e["id"] for e in data["events"] if e["is_current"])
+        context = client.entry_context(user_id, current_gw)
+
         st.divider()  # separate with gray line
         
         # 2) Triple Captain
         st.subheader("🎯 Triple Captain Suggestion")
-        tc_suggestion = suggest_triple_captain(user_id, data, fixtures_data)
+        tc_suggestion = suggest_triple_captain(user_id, data, fixtures_data, context=context, projection=tc_projection)
         st.info(tc_suggestion)
 
         st.divider()
 
         # 3) Wild Card
         st.subheader("🃏 Wild Card Suggestion")
-        wc_suggestion = check_wildcard(user_id, data, fixtures_data)
-        st.info(wc_suggestion)    
+        wc_suggestion = check_wildcard(user_id, data, fixtures_data, context=context, projection=projection)
+        st.info(wc_suggestion)
+
+    # 4) Mini-league batch mode
+    st.divider()
+    st.subheader("👥 Mini-League Chip Suggestions")
+    source = st.radio("Source", ["League ID", "Entry IDs"], horizontal=True)
+    batch_input = st.text_input(
+        "Classic league ID" if source == "League ID" else "Entry IDs (comma separated)",
+        placeholder="ex. 314" if source == "League ID" else "ex. 123456, 234567",
+    )
+    if batch_input:
+        versions = tuple(p.version if p is not None else None for p in (projection, tc_projection))
+        if source == "League ID":
+            if not batch_input.strip().isdigit():
+                st.warning("League ID must be a number.")
+                return
+            table = _league_chip_table(int(batch_input.strip()), None, versions, projection, tc_projection)
+        else:
+            entry_ids = _parse_entry_ids(batch_input)
+            if not entry_ids:
+                st.warning("No valid entry IDs found.")
+                return
+            table = _league_chip_table(None, entry_ids, versions, projection, tc_projection)
+        st.dataframe(table, use_container_width=True, hide_index=True)    
 
@@ -0,0 +1,20 @@
+"""
+Uncached, per-rerun versions of dashboard computations, kept only as
+benchmark baselines for the cached/indexed paths the panels use.
+"""
+import pandas as pd
+
+from history_store import summarize_points
+from panel_tables import compute_consistency_from_stats
+from player_table import build_player_table
+from scout_index import ScoutIndex
+
+
+def filter_scout_players(players, teams, position, cost_limit, min_minutes, min_points, sel_range):
+    """Scout Assistant filtresi, her seferinde baştan: oyuncu tablosu + index + sorgu."""
+    return ScoutIndex(build_player_table(players, teams)).query(position, cost_limit, min_minutes, min_points, sel_range)
+
+
+def compute_consistency(history_df: pd.DataFrame, players: pd.DataFrame) -> pd.DataFrame:
+    """Per-player mean/std of weekly points from the full history, merged with player info and filtered for the panel."""
+    return compute_consistency_from_stats(summarize_points(history_df), players)
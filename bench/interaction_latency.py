@@ -0,0 +1,158 @@
+"""
+Per-interaction latency and server CPU of the dashboard, full rerun vs fragment rerun.
+
+Starts the replay server and `streamlit run streamlit_app.py` headless, then
+talks to the app over its websocket like a browser would: one initial run,
+then the same slider change sent as a full-script rerun and as a rerun of the
+slider's card fragment only. Server CPU is read from /proc (Linux).
+
+    python -m bench.interaction_latency --repeat 10
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+from websockets.asyncio.client import connect
+
+from streamlit.proto.BackMsg_pb2 import BackMsg
+from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+
+from bench.replay_server import ReplayConfig, serve
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# (slider label, new value) pairs; each lives in a different card
+INTERACTIONS = [
+    ("Max selection rate (%)", 25.0),
+    ("Maximum Player Value", 10.0),
+]
+
+
+def _cpu_seconds(pid):
+    with open(f"/proc/{pid}/stat") as f:
+        fields = f.read().rsplit(")", 1)[1].split()
+    return (int(fields[11]) + int(fields[12])) / os.sysconf("SC_CLK_TCK")
+
+
+async def _run(ws, widget_states=None, fragment_id=""):
+    """Send one rerun_script and wait for script_finished -> (seconds, sliders seen)."""
+    msg = BackMsg()
+    msg.rerun_script.query_string = ""
+    msg.rerun_script.page_script_hash = ""
+    if fragment_id:
+        msg.rerun_script.fragment_id = fragment_id
+    for state in widget_states or []:
+        msg.rerun_script.widget_states.widgets.add().CopyFrom(state)
+
+    sliders = {}
+    start = time.perf_counter()
+    await ws.send(msg.SerializeToString())
+    while True:
+        raw = await ws.recv()
+        fwd = ForwardMsg()
+        fwd.ParseFromString(raw)
+        kind = fwd.WhichOneof("type")
+        if kind == "delta" and fwd.delta.WhichOneof("type") == "new_element":
+            element = fwd.delta.new_element
+            if element.WhichOneof("type") == "slider":
+                sliders[element.slider.label] = (element.slider, fwd.delta.fragment_id)
+        elif kind == "script_finished":
+            if fwd.script_finished == ForwardMsg.FINISHED_EARLY_FOR_RERUN:
+                continue
+            return time.perf_counter() - start, sliders
+
+
+def _slider_state(slider, value):
+    msg = BackMsg()
+    state = msg.rerun_script.widget_states.widgets.add()
+    state.id = slider.id
+    state.double_array_value.data.append(value)
+    return state
+
+
+async def measure(port, pid, repeat):
+    async with connect(f"ws://127.0.0.1:{port}/_stcore/stream", max_size=None) as ws:
+        return await _measure(ws, pid, repeat)
+
+
+async def _measure(ws, pid, repeat):
+    first, sliders = await _run(ws)
+    # İkinci tam çalıştırma: cache'ler ısınmış halde başlangıç noktası
+    await _run(ws)
+    rows = [{"interaction": "initial page load", "mode": "full", "p50_s": first, "cpu_s": None}]
+
+    for label, value in INTERACTIONS:
+        if label not in sliders:
+            print(f"slider not found: {label}")
+            continue
+        slider, fragment_id = sliders[label]
+        for mode, frag in (("full rerun", ""), ("fragment rerun", fragment_id)):
+            walls, cpus = [], []
+            for i in range(repeat):
+                state = _slider_state(slider, value if i % 2 == 0 else slider.default[-1])
+                cpu_start = _cpu_seconds(pid)
+                wall, _ = await _run(ws, [state], frag)
+                cpus.append(_cpu_seconds(pid) - cpu_start)
+                walls.append(wall)
+            rows.append({
+                "interaction": label,
+                "mode": mode,
+                "p50_s": statistics.median(walls),
+                "cpu_s": statistics.median(cpus),
+            })
+    return rows
+
+
+def _wait_for_server(port, proc, timeout=60):
+    import urllib.request
+
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if proc.poll() is not None:
+            raise RuntimeError("streamlit exited early")
+        try:
+            urllib.request.urlopen(f"http://127.0.0.1:{port}/_stcore/health", timeout=1)
+            return
+        except Exception:
+            time.sleep(0.5)
+    raise TimeoutError("streamlit did not start")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=10)
+    parser.add_argument("--port", type=int, default=8599)
+    args = parser.parse_args(argv)
+
+    replay, _ = serve(ReplayConfig(), port=0)
+    env = dict(
+        os.environ,
+        FPL_API_BASE=f"http://127.0.0.1:{replay.server_address[1]}/api",
+        FPL_HTTP_CACHE_DIR=os.environ.get("FPL_HTTP_CACHE_DIR", "/tmp/fpl_interaction_cache"),
+    )
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "streamlit", "run", "streamlit_app.py", "--server.headless", "true",
+         "--server.port", str(args.port), "--browser.gatherUsageStats", "false"],
+        cwd=ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    try:
+        _wait_for_server(args.port, proc)
+        rows = asyncio.run(measure(args.port, proc.pid, args.repeat))
+    finally:
+        proc.terminate()
+        proc.wait(timeout=10)
+        replay.shutdown()
+
+    print(f"{'interaction':28s} {'mode':16s} {'p50 (ms)':>10s} {'server CPU (ms)':>16s}")
+    for r in rows:
+        cpu = f"{r['cpu_s'] * 1000:16.0f}" if r["cpu_s"] is not None else f"{'-':>16s}"
+        print(f"{r['interaction']:28s} {r['mode']:16s} {r['p50_s'] * 1000:10.0f} {cpu}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,244 @@
+"""
+Local stand-in for the FPL and football-data.org APIs.
+
+Serves recorded responses from --data-dir when present, synthetic ones
+(bench/synthetic.py) otherwise, with optional latency, 429s and 5xx errors.
+
+    python -m bench.replay_server --port 8765 --latency-ms 80 --rate-429 0.02
+    FPL_API_BASE=http://127.0.0.1:8765/api \\
+    FOOTBALL_DATA_API_BASE=http://127.0.0.1:8765/v4 \\
+        python weekly_exec/weekly_execution.py
+
+Record real responses for later replay:
+
+    python -m bench.replay_server record --data-dir recorded/ --players 50
+"""
+import argparse
+import hashlib
+import json
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qs, urlparse
+
+from bench import synthetic
+
+ROUTES = [
+    (re.compile(r"^/api/bootstrap-static/?$"), "bootstrap"),
+    (re.compile(r"^/api/fixtures/?$"), "fixtures"),
+    (re.compile(r"^/api/element-summary/(\d+)/?$"), "element_summary"),
+    (re.compile(r"^/api/event/(\d+)/live/?$"), "event_live"),
+    (re.compile(r"^/api/entry/(\d+)/history/?$"), "entry_history"),
+    (re.compile(r"^/api/entry/(\d+)/event/(\d+)/picks/?$"), "entry_picks"),
+    (re.compile(r"^/api/leagues-classic/(\d+)/standings/?$"), "league_standings"),
+    (re.compile(r"^/v4/competitions/PL/standings/?$"), "pl_standings"),
+]
+
+
+class ReplayConfig:
+    def __init__(self, data_dir=None, latency_ms=0.0, jitter_ms=0.0, rate_429=0.0,
+                 error_rate=0.0, seed=0, players_per_team=35, current_gw=20, league_size=200):
+        self.data_dir = Path(data_dir) if data_dir else None
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.rate_429 = rate_429
+        self.error_rate = error_rate
+        self.seed = seed
+        self.players_per_team = players_per_team
+        self.current_gw = current_gw
+        self.league_size = league_size
+
+
+class ReplayState:
+    """Synthetic payloads are built once and shared by all handler threads."""
+
+    def __init__(self, config: ReplayConfig):
+        self.config = config
+        self.rng = random.Random(config.seed)
+        self.lock = threading.Lock()
+        self.counts = {}
+        self.bootstrap = synthetic.make_bootstrap(
+            players_per_team=config.players_per_team, current_gw=config.current_gw, seed=config.seed
+        )
+        self.fixtures = synthetic.make_fixtures(current_gw=config.current_gw, seed=config.seed)
+        self.elements = {el["id"]: el for el in self.bootstrap["elements"]}
+
+    def count(self, route, status):
+        with self.lock:
+            key = f"{route}:{status}"
+            self.counts[key] = self.counts.get(key, 0) + 1
+
+    def roll(self):
+        with self.lock:
+            return self.rng.random()
+
+    def recorded(self, path):
+        if self.config.data_dir is None:
+            return None
+        f = self.config.data_dir / (path.strip("/") + ".json")
+        return f.read_bytes() if f.exists() else None
+
+    def synthesize(self, route, args, query):
+        c = self.config
+        if route == "bootstrap":
+            return self.bootstrap
+        if route == "fixtures":
+            return self.fixtures
+        if route == "element_summary":
+            el = self.elements.get(int(args[0]))
+            if el is None:
+                return None
+            return synthetic.make_element_summary(el, self.fixtures, c.seed)
+        if route == "event_live":
+            return synthetic.make_event_live(args[0], self.bootstrap["elements"], self.fixtures, c.seed)
+        if route == "entry_history":
+            return synthetic.make_entry_history(args[0], c.current_gw, c.seed)
+        if route == "entry_picks":
+            return synthetic.make_entry_picks(args[0], args[1], self.bootstrap["elements"], c.seed)
+        if route == "league_standings":
+            page = int(query.get("page_standings", ["1"])[0])
+            return synthetic.make_league_standings(args[0], page, c.league_size, seed=c.seed)
+        if route == "pl_standings":
+            return synthetic.make_pl_standings(seed=c.seed)
+        return None
+
+
+def make_handler(state: ReplayState):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, fmt, *args):  # sessiz
+            pass
+
+        def _send(self, status, body=b"", headers=None):
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            for k, v in (headers or {}).items():
+                self.send_header(k, v)
+            self.end_headers()
+            if body:
+                self.wfile.write(body)
+
+        def do_GET(self):
+            c = state.config
+            parsed = urlparse(self.path)
+            route, args = None, ()
+            for pattern, name in ROUTES:
+                m = pattern.match(parsed.path)
+                if m:
+                    route, args = name, m.groups()
+                    break
+            if route is None:
+                state.count("unknown", 404)
+                return self._send(404, b'{"detail":"Not found."}')
+
+            delay = c.latency_ms + state.roll() * c.jitter_ms
+            if delay:
+                time.sleep(delay / 1000)
+
+            roll = state.roll()
+            if roll < c.rate_429:
+                state.count(route, 429)
+                return self._send(429, b'{"detail":"Too many requests."}', {"Retry-After": "1"})
+            if roll < c.rate_429 + c.error_rate:
+                state.count(route, 503)
+                return self._send(503, b'{"detail":"Service unavailable."}')
+
+            body = state.recorded(parsed.path)
+            if body is None:
+                payload = state.synthesize(route, args, parse_qs(parsed.query))
+                if payload is None:
+                    state.count(route, 404)
+                    return self._send(404, b'{"detail":"Not found."}')
+                body = json.dumps(payload).encode("utf-8")
+
+            etag = '"' + hashlib.md5(body).hexdigest() + '"'
+            if self.headers.get("If-None-Match") == etag:
+                state.count(route, 304)
+                return self._send(304, headers={"ETag": etag})
+            state.count(route, 200)
+            self._send(200, body, {"ETag": etag})
+
+    return Handler
+
+
+def serve(config: ReplayConfig, host="127.0.0.1", port=8765):
+    """Start the server in a daemon thread -> (server, state). server.shutdown() to stop."""
+    state = ReplayState(config)
+    server = ThreadingHTTPServer((host, port), make_handler(state))
+    server.daemon_threads = True
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return server, state
+
+
+def record(data_dir, players=50):
+    """Gerçek API'den yanıtları kaydet (bootstrap, fixtures, settled GW'lerin live'ı ve ilk N element-summary)."""
+    from fpl_client import FPLClient
+
+    out = Path(data_dir)
+    client = FPLClient()
+
+    def save(path, payload):
+        f = out / (path.strip("/") + ".json")
+        f.parent.mkdir(parents=True, exist_ok=True)
+        f.write_text(json.dumps(payload), encoding="utf-8")
+
+    bootstrap = client.bootstrap()
+    save("api/bootstrap-static", bootstrap)
+    save("api/fixtures", client.fixtures())
+    for event in bootstrap["events"]:
+        if event.get("finished") and event.get("data_checked"):
+            save(f"api/event/{event['id']}/live", client.event_live(event["id"]))
+    for el in bootstrap["elements"][:players]:
+        save(f"api/element-summary/{el['id']}", client.element_summary(el["id"]))
+    print(f"Kaydedildi: {out}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("command", nargs="?", default="serve", choices=["serve", "record"])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--data-dir", help="recorded responses (<data-dir>/api/bootstrap-static.json, ...)")
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    parser.add_argument("--jitter-ms", type=float, default=0.0)
+    parser.add_argument("--rate-429", type=float, default=0.0, help="fraction of requests answered with 429")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction of requests answered with 503")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--players-per-team", type=int, default=35)
+    parser.add_argument("--current-gw", type=int, default=20)
+    parser.add_argument("--league-size", type=int, default=200)
+    parser.add_argument("--players", type=int, default=50, help="record: number of element-summary payloads")
+    args = parser.parse_args(argv)
+
+    if args.command == "record":
+        if not args.data_dir:
+            parser.error("record needs --data-dir")
+        record(args.data_dir, args.players)
+        return
+
+    config = ReplayConfig(
+        data_dir=args.data_dir, latency_ms=args.latency_ms, jitter_ms=args.jitter_ms,
+        rate_429=args.rate_429, error_rate=args.error_rate, seed=args.seed,
+        players_per_team=args.players_per_team, current_gw=args.current_gw,
+        league_size=args.league_size,
+    )
+    server, state = serve(config, args.host, args.port)
+    print(f"Replay server: http://{args.host}:{args.port}  (FPL_API_BASE=http://{args.host}:{args.port}/api)")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.shutdown()
+        print(json.dumps(state.counts, indent=2, sort_keys=True))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,219 @@
+"""
+Benchmark suite for the dashboard's compute paths (no rendering).
+
+Times each case on synthetic data at 1x / 10x / 100x the current season
+size and saves the results as JSON so runs can be compared.
+
+    python -m bench.run_benchmarks --scales 1 10 100 --repeat 5
+    python -m bench.run_benchmarks --compare bench/results/a.json bench/results/b.json
+"""
+import argparse
+import json
+import logging
+import platform
+import statistics
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+import pandas as pd
+
+from bench import synthetic
+
+RESULTS_DIR = Path(__file__).resolve().parent / "results"
+
+logging.getLogger("streamlit").setLevel(logging.ERROR)
+
+
+def _unwrap(fn):
+    # st.cache_data sarmalayıcısını atla: cache'i değil hesaplamayı ölçüyoruz
+    return getattr(fn, "__wrapped__", fn)
+
+
+def build_cases(dataset, workdir, wildcard_base_url=None):
+    """-> {case_name: (callable, rows)} for one synthetic dataset."""
+    import analytics
+    import panel_tables
+    from bench import baselines
+    import visuals
+    from dataset import DatasetHandle, content_version
+    from fixture_index import FixtureIndex
+    from form_store import FormStore
+    from history_store import summarize_points
+    from player_table import build_player_table
+    from scout_index import ScoutIndex
+    from xpoints import build_projection
+
+    players = dataset["players"]
+    teams = dataset["teams"]
+    weekly_points = dataset["weekly_points"]
+    bootstrap = dataset["bootstrap"]
+    fixtures = dataset["fixtures"]
+    events = bootstrap["events"]
+
+    standings_path = Path(workdir) / "league_table.csv"
+    n_table = max(20, len(players) // 35)
+    pd.DataFrame(synthetic.make_pl_standings(n_table)["standings"][0]["table"]).to_csv(
+        standings_path, index=False, encoding="utf-8-sig"
+    )
+    compute_pl_standings = _unwrap(visuals.compute_pl_standings)
+    standings = compute_pl_standings(str(standings_path), standings_path.stat().st_mtime)
+    compute_tdr = _unwrap(visuals.compute_team_dependency_ratio)
+    selection_scatter = _unwrap(visuals.selection_scatter_spec)
+    history = weekly_points[["player_id", "total_points"]]
+    stats = summarize_points(history)
+    table_handle = DatasetHandle("player_table", build_player_table(players, teams), content_version(bootstrap))
+    scout = ScoutIndex(table_handle.frame)
+
+    current_gw = next(e["id"] for e in events if e["is_current"])
+    league = range(1, 501)
+    league_picks = {e: synthetic.make_entry_picks(e, current_gw, bootstrap["elements"]) for e in league}
+    league_histories = {e: synthetic.make_entry_history(e, current_gw) for e in league}
+
+    cases = {
+        "compute_team_dependency_ratio": (lambda: compute_tdr(table_handle), len(players)),
+        "consistency_groupby": (lambda: baselines.compute_consistency(history, players), len(history)),
+        "consistency_from_stats": (lambda: panel_tables.compute_consistency_from_stats(stats, players), len(stats)),
+        "build_fixture_difficulty": (
+            lambda: panel_tables.build_fixture_difficulty(fixtures, teams, events, gameweeks=5), len(fixtures)
+        ),
+        "selection_scatter_spec": (
+            lambda: selection_scatter(table_handle, 0.0, 100.0), len(players)
+        ),
+        "fixture_index_build": (lambda: FixtureIndex(fixtures), len(fixtures)),
+        "form_store_build": (lambda: FormStore(weekly_points), len(weekly_points)),
+        "xp_projection": (
+            lambda: build_projection(players, fixtures, weekly_points, current_gw), len(players)
+        ),
+        "compute_pl_standings": (
+            lambda: compute_pl_standings(str(standings_path), standings_path.stat().st_mtime), n_table
+        ),
+        "render_standings_html": (lambda: panel_tables.render_standings_html(standings), n_table),
+        "build_player_table": (lambda: build_player_table(players, teams), len(players)),
+        "player_advice_filter": (
+            lambda: baselines.filter_scout_players(players, teams, "All", 8.5, 200, 20, (5.0, 25.0)),
+            len(players),
+        ),
+        "scout_index_query": (
+            lambda: scout.query("All", 8.5, 200, 20, (5.0, 25.0)),
+            len(players),
+        ),
+        "chips_batch_500": (
+            lambda: analytics.evaluate_chips_batch(league_picks, league_histories, bootstrap, fixtures),
+            len(league),
+        ),
+    }
+    if wildcard_base_url:
+        cases["check_wildcard"] = (
+            lambda: analytics.check_wildcard(123456, bootstrap, fixtures), len(players)
+        )
+    return cases
+
+
+def time_case(fn, repeat):
+    fn()  # warm-up (imports, first allocations)
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+def run(scales, repeat, only=None, wildcard=True):
+    server = None
+    base_url = None
+    if wildcard:
+        from bench.replay_server import ReplayConfig, serve
+        from fpl_client import FPLClient, set_client
+
+        server, _ = serve(ReplayConfig(), port=0)
+        base_url = f"http://127.0.0.1:{server.server_address[1]}/api"
+        set_client(FPLClient(base_url=base_url))
+
+    results = []
+    try:
+        with tempfile.TemporaryDirectory() as workdir:
+            for scale in scales:
+                start = time.perf_counter()
+                dataset = synthetic.make_scaled_dataset(scale)
+                print(f"[{scale}x] dataset: {len(dataset['players'])} players, "
+                      f"{len(dataset['weekly_points'])} history rows "
+                      f"({time.perf_counter() - start:.1f} s)")
+                for name, (fn, rows) in build_cases(dataset, workdir, base_url).items():
+                    if only and name not in only:
+                        continue
+                    samples = time_case(fn, repeat)
+                    row = {
+                        "case": name,
+                        "scale": scale,
+                        "rows": rows,
+                        "repeat": repeat,
+                        "min_s": min(samples),
+                        "median_s": statistics.median(samples),
+                        "mean_s": statistics.fmean(samples),
+                    }
+                    results.append(row)
+                    print(f"  {name:32s} {row['median_s'] * 1000:10.2f} ms  (rows={rows})")
+    finally:
+        if server is not None:
+            server.shutdown()
+    return results
+
+
+def scaling_table(results) -> pd.DataFrame:
+    """Median time per case and scale, plus growth relative to the smallest scale."""
+    df = pd.DataFrame(results)
+    pivot = df.pivot_table(index="case", columns="scale", values="median_s")
+    smallest = pivot.columns.min()
+    base = pivot[smallest]
+    for col in list(pivot.columns[1:]):
+        pivot[f"{col}x / {smallest}x"] = pivot[col] / base
+    return pivot
+
+
+def compare(old_path, new_path) -> pd.DataFrame:
+    old = pd.DataFrame(json.loads(Path(old_path).read_text())["results"])
+    new = pd.DataFrame(json.loads(Path(new_path).read_text())["results"])
+    merged = old.merge(new, on=["case", "scale"], suffixes=("_old", "_new"))
+    merged["speedup"] = merged["median_s_old"] / merged["median_s_new"]
+    return merged[["case", "scale", "median_s_old", "median_s_new", "speedup"]]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scales", type=int, nargs="+", default=[1, 10, 100])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--cases", nargs="+", help="only run these cases")
+    parser.add_argument("--no-wildcard", action="store_true", help="skip check_wildcard (needs the replay server)")
+    parser.add_argument("--out", help="output JSON (default: bench/results/bench-<timestamp>.json)")
+    parser.add_argument("--compare", nargs=2, metavar=("OLD", "NEW"))
+    args = parser.parse_args(argv)
+
+    if args.compare:
+        print(compare(*args.compare).to_string(index=False))
+        return
+
+    results = run(args.scales, args.repeat, args.cases, wildcard=not args.no_wildcard)
+
+    out = Path(args.out) if args.out else RESULTS_DIR / f"bench-{datetime.now():%Y%m%d-%H%M%S}.json"
+    out.parent.mkdir(parents=True, exist_ok=True)
+    out.write_text(json.dumps({
+        "meta": {
+            "created": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "pandas": pd.__version__,
+            "machine": platform.machine(),
+            "scales": args.scales,
+        },
+        "results": results,
+    }, indent=2), encoding="utf-8")
+
+    print()
+    print(scaling_table(results).to_string(float_format=lambda v: f"{v:.4f}"))
+    print(f"\nSonuçlar: {out}")
+
+
+if __name__ == "__main__":
+    main()
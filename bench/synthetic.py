@@ -0,0 +1,525 @@
+"""
+Synthetic FPL API payloads shaped like the real endpoints.
+
+Everything is deterministic for a given seed so replay runs and benchmarks
+are comparable. Used by bench/replay_server.py and the benchmark suite.
+"""
+import random
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+import pandas as pd
+
+SEASON_START = datetime(2025, 8, 15, 19, 0, tzinfo=timezone.utc)
+
+TEAM_NAMES = [
+    ("Arsenal", "ARS"), ("Aston Villa", "AVL"), ("Burnley", "BUR"), ("Bournemouth", "BOU"),
+    ("Brentford", "BRE"), ("Brighton", "BHA"), ("Chelsea", "CHE"), ("Crystal Palace", "CRY"),
+    ("Everton", "EVE"), ("Fulham", "FUL"), ("Leeds", "LEE"), ("Liverpool", "LIV"),
+    ("Man City", "MCI"), ("Man Utd", "MUN"), ("Newcastle", "NEW"), ("Nott'm Forest", "NFO"),
+    ("Sunderland", "SUN"), ("Spurs", "TOT"), ("West Ham", "WHU"), ("Wolves", "WOL"),
+]
+
+# Kadro dağılımı: GK, DEF, MID, FWD
+SQUAD_SHAPE = [(1, 0.1), (2, 0.33), (3, 0.4), (4, 0.17)]
+
+
+def _iso(dt):
+    return dt.strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+def _team_name(i):
+    if i < len(TEAM_NAMES):
+        return TEAM_NAMES[i]
+    return f"Team {i + 1}", f"T{i + 1:02d}"
+
+
+def make_teams(n_teams=20, seed=0):
+    rng = random.Random(seed)
+    teams = []
+    for i in range(n_teams):
+        name, short = _team_name(i)
+        teams.append({
+            "id": i + 1,
+            "code": 100 + i,
+            "name": name,
+            "short_name": short,
+            "strength": rng.randint(2, 5),
+        })
+    return teams
+
+
+def make_fixtures(n_teams=20, current_gw=20, seed=0):
+    """Double round robin (circle method); rounds before current_gw are finished."""
+    rng = random.Random(seed)
+    ids = list(range(1, n_teams + 1))
+    half = []
+    for _ in range(n_teams - 1):
+        half.append([(ids[i], ids[-1 - i]) for i in range(n_teams // 2)])
+        ids = [ids[0], ids[-1]] + ids[1:-1]
+    rounds = half + [[(a, h) for h, a in rnd] for rnd in half]
+
+    strength = {t["id"]: t["strength"] for t in make_teams(n_teams, seed)}
+    fixtures = []
+    fid = 1
+    for gw, matches in enumerate(rounds, start=1):
+        kickoff = SEASON_START + timedelta(days=7 * (gw - 1))
+        finished = gw < current_gw
+        for home, away in matches:
+            h_score = rng.randint(0, 4) if finished else None
+            a_score = rng.randint(0, 3) if finished else None
+            fixtures.append({
+                "id": fid,
+                "code": 2_500_000 + fid,
+                "event": gw,
+                "kickoff_time": _iso(kickoff),
+                "team_h": home,
+                "team_a": away,
+                "team_h_difficulty": min(5, max(2, strength[away])),
+                "team_a_difficulty": min(5, max(2, strength[home] + 1)),
+                "team_h_score": h_score,
+                "team_a_score": a_score,
+                "started": finished,
+                "finished": finished,
+                "finished_provisional": finished,
+            })
+            fid += 1
+    return fixtures
+
+
+def make_events(n_events=38, current_gw=20):
+    events = []
+    for gw in range(1, n_events + 1):
+        deadline = SEASON_START + timedelta(days=7 * (gw - 1)) - timedelta(hours=1, minutes=30)
+        events.append({
+            "id": gw,
+            "name": f"Gameweek {gw}",
+            "deadline_time": _iso(deadline),
+            "finished": gw < current_gw,
+            "data_checked": gw < current_gw,
+            "is_previous": gw == current_gw - 1,
+            "is_current": gw == current_gw,
+            "is_next": gw == current_gw + 1,
+            "average_entry_score": 50,
+        })
+    return events
+
+
+def _player_rate(pid, seed):
+    # Oyuncuya özgü sabit "kalite" -> haftalık beklenen puan
+    return random.Random(seed * 1_000_003 + pid).uniform(0.5, 6.5)
+
+
+def make_elements(n_teams=20, players_per_team=35, current_gw=20, seed=0):
+    rng = random.Random(seed)
+    elements = []
+    pid = 1
+    for team in range(1, n_teams + 1):
+        for slot in range(players_per_team):
+            # pozisyonları kadro şekline göre dağıt
+            acc = 0.0
+            element_type = 4
+            for et, share in SQUAD_SHAPE:
+                acc += share
+                if slot < acc * players_per_team:
+                    element_type = et
+                    break
+            rate = _player_rate(pid, seed)
+            played = current_gw - 1
+            minutes = int(played * rng.uniform(0, 90) * min(1.0, rate / 3))
+            total_points = int(rate * played * min(1.0, minutes / (played * 60 + 1) + 0.2))
+            goals = int(total_points / 25 * (element_type / 2))
+            elements.append({
+                "id": pid,
+                "code": 400_000 + pid,
+                "first_name": f"First{pid}",
+                "second_name": f"Last{pid}",
+                "web_name": f"Player{pid}",
+                "team": team,
+                "team_code": 100 + team - 1,
+                "element_type": element_type,
+                "status": rng.choices(["a", "d", "i", "s", "u"], [0.85, 0.05, 0.05, 0.03, 0.02])[0],
+                "now_cost": int(40 + rate * 12 + rng.randint(0, 10)),
+                "total_points": total_points,
+                "event_points": rng.randint(0, 12),
+                "minutes": minutes,
+                "goals_scored": goals,
+                "assists": int(goals * rng.uniform(0.3, 1.2)),
+                "clean_sheets": rng.randint(0, played // 2),
+                "bonus": rng.randint(0, 20),
+                "form": f"{rate * rng.uniform(0.6, 1.4):.1f}",
+                "points_per_game": f"{rate:.1f}",
+                "selected_by_percent": f"{min(80.0, rng.expovariate(1 / 4)):.1f}",
+                "influence": f"{rng.uniform(0, 900):.1f}",
+                "creativity": f"{rng.uniform(0, 900):.1f}",
+                "threat": f"{rng.uniform(0, 900):.1f}",
+                "ict_index": f"{rng.uniform(0, 250):.1f}",
+                "expected_goals": f"{goals * rng.uniform(0.7, 1.3):.2f}",
+                "expected_assists": f"{rng.uniform(0, 6):.2f}",
+                "transfers_in_event": rng.randint(0, 50_000),
+                "transfers_out_event": rng.randint(0, 50_000),
+                "chance_of_playing_next_round": None,
+                "news": "",
+            })
+            pid += 1
+    return elements
+
+
+def make_bootstrap(n_teams=20, players_per_team=35, n_events=38, current_gw=20, seed=0):
+    return {
+        "events": make_events(n_events, current_gw),
+        "teams": make_teams(n_teams, seed),
+        "elements": make_elements(n_teams, players_per_team, current_gw, seed),
+        "element_types": [
+            {"id": 1, "singular_name": "Goalkeeper", "singular_name_short": "GKP"},
+            {"id": 2, "singular_name": "Defender", "singular_name_short": "DEF"},
+            {"id": 3, "singular_name": "Midfielder", "singular_name_short": "MID"},
+            {"id": 4, "singular_name": "Forward", "singular_name_short": "FWD"},
+        ],
+        "total_players": 11_000_000,
+    }
+
+
+def make_element_summary(player, fixtures, seed=0):
+    """element-summary/{id}: one history row per finished fixture of the player's team."""
+    pid = player["id"]
+    team = player["team"]
+    rate = _player_rate(pid, seed)
+    rng = random.Random(seed * 7_919 + pid)
+    history = []
+    upcoming = []
+    for f in fixtures:
+        if team not in (f["team_h"], f["team_a"]):
+            continue
+        was_home = f["team_h"] == team
+        if not f["finished"]:
+            upcoming.append({
+                "id": f["id"], "event": f["event"], "team_h": f["team_h"], "team_a": f["team_a"],
+                "is_home": was_home, "kickoff_time": f["kickoff_time"],
+                "difficulty": f["team_h_difficulty"] if was_home else f["team_a_difficulty"],
+            })
+            continue
+        minutes = rng.choice([0, 0, 15, 60, 90, 90, 90]) if rate > 1.5 else rng.choice([0, 0, 0, 20])
+        points = 0 if minutes == 0 else max(0, int(rng.gauss(rate, 2.5)))
+        goals = 1 if points >= 8 else 0
+        xg = rng.uniform(0, 0.8) if minutes else 0.0
+        xa = rng.uniform(0, 0.5) if minutes else 0.0
+        history.append({
+            "element": pid,
+            "fixture": f["id"],
+            "opponent_team": f["team_a"] if was_home else f["team_h"],
+            "total_points": points,
+            "was_home": was_home,
+            "kickoff_time": f["kickoff_time"],
+            "team_h_score": f["team_h_score"],
+            "team_a_score": f["team_a_score"],
+            "round": f["event"],
+            "modified": False,
+            "minutes": minutes,
+            "goals_scored": goals,
+            "assists": 1 if 5 <= points < 8 else 0,
+            "clean_sheets": int(minutes >= 60 and rng.random() < 0.3),
+            "goals_conceded": rng.randint(0, 3) if minutes else 0,
+            "own_goals": 0,
+            "penalties_saved": 0,
+            "penalties_missed": 0,
+            "yellow_cards": int(rng.random() < 0.1) if minutes else 0,
+            "red_cards": 0,
+            "saves": rng.randint(0, 6) if player["element_type"] == 1 and minutes else 0,
+            "bonus": min(3, max(0, points - 7)),
+            "bps": points * 3 + rng.randint(0, 8) if minutes else 0,
+            "influence": f"{points * 4.2:.1f}",
+            "creativity": f"{rng.uniform(0, 40) if minutes else 0:.1f}",
+            "threat": f"{rng.uniform(0, 50) if minutes else 0:.1f}",
+            "ict_index": f"{points * 0.9:.1f}",
+            "clearances_blocks_interceptions": rng.randint(0, 6) if minutes else 0,
+            "recoveries": rng.randint(0, 10) if minutes else 0,
+            "tackles": rng.randint(0, 4) if minutes else 0,
+            "defensive_contribution": rng.randint(0, 12) if minutes else 0,
+            "starts": int(minutes >= 60),
+            "expected_goals": f"{xg:.2f}",
+            "expected_assists": f"{xa:.2f}",
+            "expected_goal_involvements": f"{xg + xa:.2f}",
+            "expected_goals_conceded": f"{rng.uniform(0, 2) if minutes else 0:.2f}",
+            "value": player["now_cost"],
+            "transfers_balance": rng.randint(-20_000, 20_000),
+            "selected": rng.randint(1_000, 3_000_000),
+            "transfers_in": rng.randint(0, 50_000),
+            "transfers_out": rng.randint(0, 50_000),
+        })
+    return {"fixtures": upcoming, "history": history, "history_past": []}
+
+
+# event/{gw}/live stats'ında da olan history kolonları
+LIVE_STATS = (
+    "minutes", "goals_scored", "assists", "clean_sheets", "goals_conceded", "own_goals",
+    "penalties_saved", "penalties_missed", "yellow_cards", "red_cards", "saves", "bonus", "bps",
+    "influence", "creativity", "threat", "ict_index", "clearances_blocks_interceptions",
+    "recoveries", "tackles", "defensive_contribution", "starts", "expected_goals",
+    "expected_assists", "expected_goal_involvements", "expected_goals_conceded", "total_points",
+)
+
+
+def make_event_live(gw, elements, fixtures, seed=0):
+    """event/{gw}/live: per player the GW totals and a per-fixture explain, consistent with make_element_summary."""
+    gw = int(gw)
+    out = []
+    for el in elements:
+        rows = [r for r in make_element_summary(el, fixtures, seed)["history"] if r["round"] == gw]
+        stats = {}
+        for key in LIVE_STATS:
+            values = [r[key] for r in rows]
+            if values and isinstance(values[0], str):
+                stats[key] = f"{sum(float(v) for v in values):.{len(values[0].split('.')[1])}f}"
+            else:
+                stats[key] = sum(values)
+        explain = [
+            {"fixture": r["fixture"], "stats": [
+                {"identifier": "minutes", "points": int(r["minutes"] >= 60) + int(r["minutes"] > 0), "value": r["minutes"]},
+            ]}
+            for r in rows
+        ]
+        out.append({"id": el["id"], "stats": stats, "explain": explain, "modified": False})
+    return {"elements": out}
+
+
+def make_entry_history(user_id, current_gw=20, seed=0):
+    rng = random.Random(seed * 31 + int(user_id))
+    current = []
+    total = 0
+    for gw in range(1, current_gw + 1):
+        points = max(10, int(rng.gauss(52, 14)))
+        total += points
+        current.append({
+            "event": gw, "points": points, "total_points": total,
+            "rank": rng.randint(1, 11_000_000), "bank": rng.randint(0, 30),
+            "value": 1000 + gw, "event_transfers": rng.randint(0, 2),
+            "event_transfers_cost": 0, "points_on_bench": rng.randint(0, 15),
+        })
+    return {"current": current, "past": [], "chips": []}
+
+
+def make_entry_picks(user_id, gw, elements, seed=0):
+    """Valid-ish 15 man squad: 2 GK, 5 DEF, 5 MID, 3 FWD, max 3 per team."""
+    rng = random.Random(seed * 17 + int(user_id) * 131 + int(gw))
+    need = {1: 2, 2: 5, 3: 5, 4: 3}
+    per_team = {}
+    picks = []
+    for el in rng.sample(elements, len(elements)):
+        et = el["element_type"]
+        if need.get(et, 0) == 0 or per_team.get(el["team"], 0) >= 3:
+            continue
+        need[et] -= 1
+        per_team[el["team"]] = per_team.get(el["team"], 0) + 1
+        picks.append(el["id"])
+        if len(picks) == 15:
+            break
+    captain = picks[rng.randrange(min(11, len(picks)))] if picks else None
+    return {
+        "active_chip": None,
+        "entry_history": {"event": gw, "points": rng.randint(20, 90)},
+        "picks": [
+            {
+                "element": pid,
+                "position": i + 1,
+                "multiplier": 0 if i >= 11 else (2 if pid == captain else 1),
+                "is_captain": pid == captain,
+                "is_vice_captain": False,
+            }
+            for i, pid in enumerate(picks)
+        ],
+    }
+
+
+def make_league_standings(league_id, page=1, n_entries=200, page_size=50, seed=0):
+    """leagues-classic/{id}/standings/?page_standings=N"""
+    rng = random.Random(seed * 13 + int(league_id))
+    start = (page - 1) * page_size
+    stop = min(n_entries, start + page_size)
+    results = [
+        {
+            "id": start + i + 1,
+            "entry": 1_000_000 + int(league_id) * 1_000 + start + i,
+            "entry_name": f"Team {start + i + 1}",
+            "player_name": f"Manager {start + i + 1}",
+            "rank": start + i + 1,
+            "total": 1500 - (start + i) * 3 + rng.randint(0, 2),
+        }
+        for i in range(stop - start)
+    ]
+    return {
+        "league": {"id": int(league_id), "name": f"League {league_id}"},
+        "standings": {"has_next": stop < n_entries, "page": page, "results": results},
+    }
+
+
+def make_pl_standings(n_teams=20, seed=0):
+    """football-data.org v4 competitions/PL/standings shape."""
+    rng = random.Random(seed)
+    rows = []
+    for t in make_teams(n_teams, seed):
+        won, draw, lost = rng.randint(3, 14), rng.randint(2, 7), rng.randint(2, 12)
+        gf, ga = rng.randint(15, 45), rng.randint(15, 40)
+        rows.append({
+            "team": {"id": t["id"], "name": t["name"], "shortName": t["name"], "tla": t["short_name"]},
+            "playedGames": won + draw + lost, "won": won, "draw": draw, "lost": lost,
+            "points": won * 3 + draw, "goalsFor": gf, "goalsAgainst": ga, "goalDifference": gf - ga,
+        })
+    rows.sort(key=lambda r: (-r["points"], -r["goalDifference"]))
+    for i, r in enumerate(rows, start=1):
+        r["position"] = i
+    return {"standings": [{"stage": "REGULAR_SEASON", "type": "TOTAL", "table": rows}]}
+
+
+# ----------------------------------------------------------------------
+# Large-season frame generators (vectorized) for benchmarks
+# ----------------------------------------------------------------------
+ROUNDS_PER_SEASON = 38
+BASE_PLAYERS = 700
+BASE_ROUNDS = 19
+
+
+def scale_shape(scale):
+    """
+    Scale factor -> (n_players, n_rounds). Rows grow ~linearly with `scale`:
+    players and rounds each grow with sqrt(scale), rounds spill over into
+    extra seasons (38 rounds per season).
+    """
+    factor = scale ** 0.5
+    return int(round(BASE_PLAYERS * factor)), int(round(BASE_ROUNDS * factor))
+
+
+def make_players_frame(n_players, n_teams=20, seed=0):
+    """bootstrap `elements` shaped DataFrame (API string columns stay strings)."""
+    rng = np.random.default_rng(seed)
+    ids = np.arange(1, n_players + 1)
+    rate = rng.uniform(0.5, 6.5, n_players)
+    minutes = (rng.uniform(0, 1, n_players) * 1800 * np.minimum(1, rate / 3)).astype(int)
+    total_points = (rate * 19 * np.minimum(1, minutes / 1200 + 0.2)).astype(int)
+    element_type = rng.choice([1, 2, 3, 4], n_players, p=[0.1, 0.33, 0.4, 0.17])
+    goals = (total_points / 25 * element_type / 2).astype(int)
+
+    df = pd.DataFrame({
+        "id": ids,
+        "code": 400_000 + ids,
+        "first_name": [f"First{i}" for i in ids],
+        "second_name": [f"Last{i}" for i in ids],
+        "web_name": [f"Player{i}" for i in ids],
+        "team": (ids - 1) % n_teams + 1,
+        "element_type": element_type,
+        "status": rng.choice(["a", "d", "i", "s", "u"], n_players, p=[0.85, 0.05, 0.05, 0.03, 0.02]),
+        "now_cost": (40 + rate * 12 + rng.integers(0, 10, n_players)).astype(int),
+        "total_points": total_points,
+        "event_points": rng.integers(0, 12, n_players),
+        "minutes": minutes,
+        "goals_scored": goals,
+        "assists": (goals * rng.uniform(0.3, 1.2, n_players)).astype(int),
+        "bonus": rng.integers(0, 20, n_players),
+        "form": np.char.mod("%.1f", rate * rng.uniform(0.6, 1.4, n_players)),
+        "points_per_game": np.char.mod("%.1f", rate),
+        "selected_by_percent": np.char.mod("%.1f", np.minimum(80, rng.exponential(4, n_players))),
+        "ict_index": np.char.mod("%.1f", rng.uniform(0, 250, n_players)),
+        "expected_goals": np.char.mod("%.2f", goals * rng.uniform(0.7, 1.3, n_players)),
+        "expected_assists": np.char.mod("%.2f", rng.uniform(0, 6, n_players)),
+    })
+    # bootstrap'te ~100 kolon var; geri kalanını sayısal dolgu kolonlarıyla temsil et
+    for i in range(100 - len(df.columns)):
+        df[f"stat_{i}"] = rng.integers(0, 500, n_players)
+    return df
+
+
+def make_teams_frame(n_teams=20, seed=0):
+    return pd.DataFrame(make_teams(n_teams, seed))
+
+
+def make_weekly_points_frame(n_players, n_rounds, n_teams=20, seed=0):
+    """weekly_points.csv shaped DataFrame: one row per player per round (+ season)."""
+    rng = np.random.default_rng(seed + 1)
+    pid = np.repeat(np.arange(1, n_players + 1), n_rounds)
+    rnd = np.tile(np.arange(1, n_rounds + 1), n_players)
+    n = len(pid)
+    rate = np.random.default_rng(seed).uniform(0.5, 6.5, n_players)[pid - 1]
+
+    minutes = rng.choice([0, 0, 15, 60, 90, 90, 90], n)
+    played = minutes > 0
+    points = np.where(played, np.maximum(0, rng.normal(rate, 2.5)).astype(int), 0)
+    xg = np.where(played, rng.uniform(0, 0.8, n), 0)
+    xa = np.where(played, rng.uniform(0, 0.5, n), 0)
+    team = (pid - 1) % n_teams + 1
+    kickoff = SEASON_START + pd.to_timedelta((rnd - 1) * 7, unit="D")
+
+    df = pd.DataFrame({
+        "element": pid,
+        "fixture": (rnd - 1) * (n_teams // 2) + (team - 1) // 2 + 1,
+        "opponent_team": (team % n_teams) + 1,
+        "total_points": points,
+        "was_home": (team + rnd) % 2 == 0,
+        "kickoff_time": kickoff.strftime("%Y-%m-%dT%H:%M:%SZ"),
+        "team_h_score": rng.integers(0, 5, n).astype(float),
+        "team_a_score": rng.integers(0, 4, n).astype(float),
+        "round": (rnd - 1) % ROUNDS_PER_SEASON + 1,
+        "modified": False,
+        "minutes": minutes,
+        "goals_scored": (points >= 8).astype(int),
+        "assists": ((points >= 5) & (points < 8)).astype(int),
+        "clean_sheets": (played & (rng.random(n) < 0.3)).astype(int),
+        "goals_conceded": np.where(played, rng.integers(0, 4, n), 0),
+        "own_goals": 0,
+        "penalties_saved": 0,
+        "penalties_missed": 0,
+        "yellow_cards": (played & (rng.random(n) < 0.1)).astype(int),
+        "red_cards": 0,
+        "saves": 0,
+        "bonus": np.clip(points - 7, 0, 3),
+        "bps": np.where(played, points * 3 + rng.integers(0, 9, n), 0),
+        "influence": np.round(points * 4.2, 1),
+        "creativity": np.round(np.where(played, rng.uniform(0, 40, n), 0), 1),
+        "threat": np.round(np.where(played, rng.uniform(0, 50, n), 0), 1),
+        "ict_index": np.round(points * 0.9, 1),
+        "clearances_blocks_interceptions": np.where(played, rng.integers(0, 7, n), 0),
+        "recoveries": np.where(played, rng.integers(0, 11, n), 0),
+        "tackles": np.where(played, rng.integers(0, 5, n), 0),
+        "defensive_contribution": np.where(played, rng.integers(0, 13, n), 0),
+        "starts": (minutes >= 60).astype(int),
+        "expected_goals": np.round(xg, 2),
+        "expected_assists": np.round(xa, 2),
+        "expected_goal_involvements": np.round(xg + xa, 2),
+        "expected_goals_conceded": np.round(np.where(played, rng.uniform(0, 2, n), 0), 2),
+        "value": (40 + rate * 12).astype(int),
+        "transfers_balance": rng.integers(-20_000, 20_000, n),
+        "selected": rng.integers(1_000, 3_000_000, n),
+        "transfers_in": rng.integers(0, 50_000, n),
+        "transfers_out": rng.integers(0, 50_000, n),
+        "player_id": pid,
+        "season": (rnd - 1) // ROUNDS_PER_SEASON,
+    })
+    return df
+
+
+def make_scaled_dataset(scale=1, n_teams=20, seed=0):
+    """-> dict(players, teams, weekly_points, bootstrap, fixtures) at `scale`x the current size."""
+    n_players, n_rounds = scale_shape(scale)
+    players = make_players_frame(n_players, n_teams, seed)
+    teams = make_teams_frame(n_teams, seed)
+    weekly_points = make_weekly_points_frame(n_players, n_rounds, n_teams, seed)
+    current_gw = min(n_rounds, ROUNDS_PER_SEASON - 5)
+    bootstrap = {
+        "elements": players.to_dict("records"),
+        "teams": teams.to_dict("records"),
+        "events": make_events(ROUNDS_PER_SEASON, current_gw),
+    }
+    fixtures = []
+    seasons = (n_rounds - 1) // ROUNDS_PER_SEASON + 1
+    for season in range(seasons):
+        for f in make_fixtures(n_teams, current_gw, seed + season):
+            # eski sezonların fixture'ları event'siz (arşiv) olarak dursun
+            if season < seasons - 1:
+                f = dict(f, event=None, id=f["id"] + 10_000 * (season + 1))
+            fixtures.append(f)
+    return {
+        "players": players,
+        "teams": teams,
+        "weekly_points": weekly_points,
+        "bootstrap": bootstrap,
+        "fixtures": fixtures,
+    }
@@ -0,0 +1,75 @@
+import json
+import os
+import shutil
+from pathlib import Path
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.feather as feather
+
+from paths import DATA_DIR
+
+# Oyuncu başı element-summary history'leri, geldikçe diske:
+#   ingest_checkpoint/run.json              -> {"season": ...}
+#   ingest_checkpoint/player=<id>.arrow     -> o oyuncunun history'si (boş olabilir)
+CHECKPOINT_DIR = DATA_DIR / "ingest_checkpoint"
+RUN_FILE = "run.json"
+
+
+class HistoryCheckpoint:
+    """
+    Per-player checkpoint of a full history ingest.
+
+    - save(pid, df): written atomically as soon as the player is fetched, so
+      a crash loses at most the requests in flight
+    - done(): player ids already on disk; a resumed run fetches the rest
+    - read(player_ids): the merged history, streamed from the memory-mapped
+      checkpoint files in `player_ids` order
+    A checkpoint belongs to one season; opening it for another season (or
+    without resume) starts from an empty directory.
+    """
+
+    def __init__(self, season, resume=False, root=CHECKPOINT_DIR):
+        self.root = Path(root)
+        self.season = season
+        run_file = self.root / RUN_FILE
+        previous = json.loads(run_file.read_text(encoding="utf-8")) if run_file.exists() else {}
+        if not resume or previous.get("season") != season:
+            shutil.rmtree(self.root, ignore_errors=True)
+        self.root.mkdir(parents=True, exist_ok=True)
+        run_file.write_text(json.dumps({"season": season}), encoding="utf-8")
+
+    def _path(self, pid) -> Path:
+        return self.root / f"player={int(pid)}.arrow"
+
+    def save(self, pid, history: pd.DataFrame) -> None:
+        path = self._path(pid)
+        tmp = path.with_suffix(".arrow.tmp")
+        table = pa.Table.from_pandas(history.reset_index(drop=True), preserve_index=False)
+        feather.write_feather(table, tmp, compression="uncompressed")
+        os.replace(tmp, path)
+
+    def done(self) -> set:
+        return {int(p.stem.split("=", 1)[1]) for p in self.root.glob("player=*.arrow")}
+
+    def read(self, player_ids) -> pd.DataFrame:
+        """
+        Checkpoint'leri tek tabloya birleştirir: her dosya memory-map edilir,
+        Arrow tabloları (kopyasız) uç uca eklenir ve pandas'a bir kez çevrilir.
+        Boş history'ler atlanır; hiç satır yoksa boş DataFrame döner.
+        """
+        tables = []
+        for pid in player_ids:
+            path = self._path(pid)
+            if not path.exists():
+                continue
+            table = feather.read_table(path, memory_map=True)
+            if table.num_rows:
+                tables.append(table)
+        if not tables:
+            return pd.DataFrame()
+        # Oyuncular arası tip farkları (tamamen null kolon, int/float) birleştirilir
+        return pa.concat_tables(tables, promote_options="permissive").to_pandas()
+
+    def clear(self) -> None:
+        shutil.rmtree(self.root, ignore_errors=True)
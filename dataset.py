@@ -0,0 +1,42 @@
+import hashlib
+import json
+import os
+
+
+class DatasetHandle:
+    """
+    A frame plus a cheap version id (JSON içeriğinin hash'i veya dosya mtime'ı).
+
+    Cached compute functions take handles instead of DataFrames and use
+    HASH_FUNCS, so the cache key is the version string rather than a hash of
+    the whole frame on every rerun. Treat `frame` as read-only: a changed
+    frame needs a new handle with a new version.
+    """
+
+    __slots__ = ("name", "frame", "version")
+
+    def __init__(self, name: str, frame, version: str):
+        self.name = name
+        self.frame = frame
+        self.version = version
+
+    def __repr__(self):
+        return f"DatasetHandle({self.name!r}, version={self.version!r}, rows={len(self.frame)})"
+
+
+# st.cache_data(hash_funcs=HASH_FUNCS): handle -> "name@version"
+HASH_FUNCS = {DatasetHandle: lambda h: f"{h.name}@{h.version}"}
+
+
+def content_version(data) -> str:
+    """Content id of a JSON payload, e.g. bootstrap-static (computed once per load, not per rerun)."""
+    payload = json.dumps(data, sort_keys=True, separators=(",", ":")).encode("utf-8")
+    return hashlib.blake2b(payload, digest_size=8).hexdigest()
+
+
+def file_version(path) -> str:
+    """Version id of a file on disk: its modification time (0 if missing)."""
+    try:
+        return str(os.stat(path).st_mtime_ns)
+    except FileNotFoundError:
+        return "0"
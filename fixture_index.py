@@ -0,0 +1,116 @@
+import threading
+
+import numpy as np
+import pandas as pd
+
+
+class FixtureIndex:
+    """
+    fixtures JSON'unun takım × gameweek dizilerine çevrilmiş hali.
+
+    - count[team, gw]: number of fixtures (0 = blank, 2+ = double GW)
+    - opponent / difficulty / is_home [team, gw, slot]: one slot per fixture,
+      in fixtures order; unused slots are 0 / 0 / False
+    Fixtures without an `event` (not yet scheduled) are skipped.
+    """
+
+    def __init__(self, fixtures):
+        scheduled = [f for f in fixtures if f.get("event")]
+        n_teams = max((max(f["team_h"], f["team_a"]) for f in scheduled), default=0)
+        n_gws = max((f["event"] for f in scheduled), default=0)
+
+        count = np.zeros((n_teams + 1, n_gws + 1), dtype=np.int8)
+        for f in scheduled:
+            count[f["team_h"], f["event"]] += 1
+            count[f["team_a"], f["event"]] += 1
+        slots = max(int(count.max()) if count.size else 0, 1)
+
+        self.opponent = np.zeros((n_teams + 1, n_gws + 1, slots), dtype=np.int16)
+        self.difficulty = np.zeros((n_teams + 1, n_gws + 1, slots), dtype=np.int8)
+        self.is_home = np.zeros((n_teams + 1, n_gws + 1, slots), dtype=bool)
+
+        filled = np.zeros_like(count)
+        for f in scheduled:
+            gw = f["event"]
+            for team, opp, diff, home in (
+                (f["team_h"], f["team_a"], f["team_h_difficulty"], True),
+                (f["team_a"], f["team_h"], f["team_a_difficulty"], False),
+            ):
+                slot = filled[team, gw]
+                self.opponent[team, gw, slot] = opp
+                self.difficulty[team, gw, slot] = diff
+                self.is_home[team, gw, slot] = home
+                filled[team, gw] += 1
+
+        self.count = count
+        self.n_teams = n_teams
+        self.n_gws = n_gws
+
+    def _window(self, gw_start, gw_end):
+        # [gw_start, gw_end) dizinin sınırlarına kırpılır
+        lo = min(max(int(gw_start), 0), self.n_gws + 1)
+        hi = min(max(int(gw_end), lo), self.n_gws + 1)
+        return slice(lo, hi)
+
+    def _rows(self, team_ids):
+        team_ids = np.asarray(team_ids, dtype=np.int64)
+        # Bilinmeyen takım id'leri fikstürsüz satıra (0) düşer
+        return np.where((team_ids >= 0) & (team_ids <= self.n_teams), team_ids, 0)
+
+    def counts(self, team_ids, gw) -> np.ndarray:
+        """Fixtures per team in `gw` (0 = blank, 2+ = double)."""
+        if not 0 <= gw <= self.n_gws:
+            return np.zeros(len(team_ids), dtype=np.int8)
+        return self.count[self._rows(team_ids), gw]
+
+    def mean_difficulty(self, team_ids, gw_start, gw_end) -> np.ndarray:
+        """Average FDR over every fixture of each team in [gw_start, gw_end); NaN if none."""
+        window = self._window(gw_start, gw_end)
+        rows = self._rows(team_ids)
+        n = self.count[rows, window].sum(axis=1)
+        total = self.difficulty[rows, window].sum(axis=(1, 2), dtype=np.int64)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return np.where(n > 0, total / np.maximum(n, 1), np.nan)
+
+    def to_frame(self, gw_start, gw_end) -> pd.DataFrame:
+        """Long format rows (team, opponent, gw, difficulty, venue) for [gw_start, gw_end)."""
+        window = self._window(gw_start, gw_end)
+        count = self.count[:, window]
+        slot_used = np.arange(self.opponent.shape[2]) < count[..., None]
+        team, gw_offset, slot = np.nonzero(slot_used)
+        gws = gw_offset + window.start
+        return pd.DataFrame({
+            "team": team,
+            "opponent": self.opponent[team, gws, slot],
+            "gw": gws,
+            "difficulty": self.difficulty[team, gws, slot],
+            "venue": np.where(self.is_home[team, gws, slot], "H", "A"),
+        })
+
+
+def fixtures_version(fixtures) -> int:
+    """Cheap content key of the fields the index uses."""
+    return hash(tuple(
+        (f.get("id"), f.get("event"), f["team_h"], f["team_a"], f["team_h_difficulty"], f["team_a_difficulty"])
+        for f in fixtures
+    ))
+
+
+_MAX_INDEXES = 4
+_indexes = {}
+_indexes_lock = threading.Lock()
+
+
+def get_fixture_index(fixtures) -> FixtureIndex:
+    """Shared FixtureIndex, built once per fixtures version (process-wide)."""
+    key = fixtures_version(fixtures)
+    with _indexes_lock:
+        index = _indexes.get(key)
+    if index is not None:
+        return index
+    index = FixtureIndex(fixtures)
+    with _indexes_lock:
+        _indexes[key] = index
+        while len(_indexes) > _MAX_INDEXES:
+            _indexes.pop(next(iter(_indexes)))
+    return index
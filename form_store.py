@@ -0,0 +1,106 @@
+import numpy as np
+import pandas as pd
+
+# Rolling pencereleri hesaplanan weekly_points kolonları
+FORM_COLUMNS = (
+    "total_points",
+    "minutes",
+    "expected_goals",
+    "expected_assists",
+    "ict_index",
+    "bps",
+    "defensive_contribution",
+)
+WINDOWS = (3, 5, 8)
+
+
+class FormStore:
+    """
+    Per-player rolling 3/5/8-GW sums and means of FORM_COLUMNS, built once
+    from weekly_points.
+
+    Rows are first summed per (player, round), so a double gameweek counts
+    as one GW with both fixtures. The data is laid out as a dense
+    player × round × column array (NaN = no fixture that round) and every
+    window is a difference of cumulative sums along the round axis, so the
+    value ending at any round is available without recomputing.
+
+    - games: rounds with a fixture inside the window (0-minute rounds included)
+    - appearances: rounds in the window with minutes > 0 (= games without
+      a minutes column)
+    - <col>_sum: sum over the window; <col>_mean: sum / games
+    Treat the arrays as read-only.
+    """
+
+    def __init__(self, weekly_points: pd.DataFrame, columns=FORM_COLUMNS, windows=WINDOWS):
+        self.columns = tuple(c for c in columns if c in weekly_points.columns)
+        self.windows = tuple(windows)
+
+        df = weekly_points.dropna(subset=["player_id", "round"])
+        values = df[list(self.columns)].apply(pd.to_numeric, errors="coerce").astype("float64")
+        per_round = values.groupby([df["player_id"].astype("int64"), df["round"].astype("int64")]).sum()
+
+        self.player_ids = per_round.index.get_level_values(0).unique().sort_values().to_numpy()
+        n_rounds = int(per_round.index.get_level_values(1).max()) if len(per_round) else 0
+        self.rounds = np.arange(1, n_rounds + 1)
+
+        rows = np.searchsorted(self.player_ids, per_round.index.get_level_values(0))
+        cols = per_round.index.get_level_values(1).to_numpy() - 1
+        dense = np.zeros((len(self.player_ids), n_rounds, len(self.columns)))
+        played = np.zeros((len(self.player_ids), n_rounds))
+        dense[rows, cols] = per_round.to_numpy()
+        played[rows, cols] = 1.0
+        if "minutes" in self.columns:
+            appeared = (dense[:, :, self.columns.index("minutes")] > 0).astype("float64")
+        else:
+            appeared = played
+
+        # Başa sıfır eklenmiş kümülatif toplamlar: pencere = csum[r] - csum[r - w]
+        csum = np.concatenate([np.zeros_like(dense[:, :1]), dense.cumsum(axis=1)], axis=1)
+        cplayed = np.concatenate([np.zeros_like(played[:, :1]), played.cumsum(axis=1)], axis=1)
+        cappeared = np.concatenate([np.zeros_like(appeared[:, :1]), appeared.cumsum(axis=1)], axis=1)
+        end = np.arange(1, n_rounds + 1)
+        self.sums = {}
+        self.games = {}
+        self.appearances = {}
+        for w in self.windows:
+            start = np.maximum(end - w, 0)
+            self.sums[w] = csum[:, end] - csum[:, start]
+            self.games[w] = cplayed[:, end] - cplayed[:, start]
+            self.appearances[w] = cappeared[:, end] - cappeared[:, start]
+        self._row = {int(pid): i for i, pid in enumerate(self.player_ids)}
+
+    @property
+    def last_round(self) -> int:
+        return int(self.rounds[-1]) if len(self.rounds) else 0
+
+    def _round_index(self, as_of):
+        as_of = self.last_round if as_of is None else min(int(as_of), self.last_round)
+        return as_of - 1
+
+    def features(self, window, as_of=None, player_ids=None) -> pd.DataFrame:
+        """One row per player: games, appearances and <col>_sum / <col>_mean over the `window` GWs ending at `as_of` (default: last round)."""
+        if window not in self.sums:
+            raise ValueError(f"window must be one of {self.windows}")
+        if not len(self.rounds):
+            return pd.DataFrame(columns=["player_id", "games", "appearances"])
+        r = self._round_index(as_of)
+        rows = slice(None) if player_ids is None else [self._row[p] for p in player_ids if p in self._row]
+        sums = self.sums[window][rows, r]
+        games = self.games[window][rows, r]
+        out = {
+            "player_id": self.player_ids[rows],
+            "games": games.astype("int64"),
+            "appearances": self.appearances[window][rows, r].astype("int64"),
+        }
+        with np.errstate(invalid="ignore", divide="ignore"):
+            means = np.where(games[:, None] > 0, sums / np.maximum(games, 1)[:, None], np.nan)
+        for i, col in enumerate(self.columns):
+            out[f"{col}_sum"] = sums[:, i]
+            out[f"{col}_mean"] = means[:, i]
+        return pd.DataFrame(out)
+
+    def player(self, player_id, as_of=None) -> pd.DataFrame:
+        """All windows of one player: index = window, columns = games, appearances + <col>_sum/_mean."""
+        frames = [self.features(w, as_of, [player_id]).assign(window=w) for w in self.windows]
+        return pd.concat(frames, ignore_index=True).drop(columns="player_id").set_index("window")
@@ -0,0 +1,215 @@
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from dataset import content_version
+from http_cache import HTTPCache
+from refresher import BackgroundRefresher
+from singleflight import SingleFlightCache
+
+FPL_API_BASE = os.getenv("FPL_API_BASE", "https://fantasy.premierleague.com/api")
+# entry_context() sonuçlarının bellekte tutulma süresi (saniye)
+ENTRY_TTL = float(os.getenv("FPL_ENTRY_TTL", "300"))
+# bootstrap / fixtures arka planda bu aralıkla yenilenir (saniye)
+REFRESH_INTERVAL = float(os.getenv("FPL_REFRESH_INTERVAL", "300"))
+
+
+class EntryContext:
+    """
+    picks (for `gw`) + history of one FPL entry, fetched together.
+    A failed part is kept and re-raised when accessed, so callers handle
+    errors the same way as with the direct endpoint calls.
+    """
+
+    def __init__(self, user_id, gw, picks, history):
+        self.user_id = user_id
+        self.gw = gw
+        self._picks = picks
+        self._history = history
+
+    @staticmethod
+    def _value(part):
+        if isinstance(part, Exception):
+            raise part
+        return part
+
+    def picks(self) -> dict:
+        return self._value(self._picks)
+
+    def history(self) -> dict:
+        return self._value(self._history)
+
+    @property
+    def complete(self) -> bool:
+        return not isinstance(self._picks, Exception) and not isinstance(self._history, Exception)
+
+
+class FPLClient:
+    """
+    Tek bir keep-alive `requests.Session` üzerinden FPL API erişimi.
+
+    - Connection pooling (`pool_size`), per-request timeout and retries with
+      backoff on 429/5xx.
+    - element-summary and event/{gw}/live (weekly ingest) go through
+      `ingest_session`, which has no urllib3 retries: the ingest retries
+      them with ratelimit.retry_with_backoff, and two retry layers would
+      multiply the attempts during a 429 storm.
+    - bootstrap-static, fixtures, element-summary and event live go through the shared
+      disk cache (conditional GETs); entry endpoints are user specific and
+      are fetched directly.
+    - bootstrap() / fixtures() are loaded lazily on first use. After that
+      they are served from memory and revalidated in a background thread
+      once older than `memo_ttl` seconds (stale-while-revalidate, see
+      refresher.BackgroundRefresher); start_background_refresh() refreshes
+      them on a schedule instead.
+    - entry_context() fetches an entry's picks and history concurrently,
+      once per (user_id, gw) within `entry_ttl`; concurrent identical
+      requests (farklı session'lardan) share one fetch.
+    """
+
+    def __init__(self, base_url=FPL_API_BASE, timeout=15, retries=3, pool_size=16,
+                 memo_ttl=REFRESH_INTERVAL, cache=None, entry_ttl=ENTRY_TTL):
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+        self.memo_ttl = memo_ttl
+
+        self.session = requests.Session()
+        retry = Retry(
+            total=retries,
+            backoff_factor=0.5,
+            status_forcelist=(429, 500, 502, 503, 504),
+            allowed_methods=("GET",),
+            respect_retry_after_header=True,
+            raise_on_status=False,
+        )
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        # Tek retry katmanı: element-summary tekrarlarını çağıran yapar
+        self.ingest_session = requests.Session()
+        ingest_adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=0)
+        self.ingest_session.mount("https://", ingest_adapter)
+        self.ingest_session.mount("http://", ingest_adapter)
+
+        self.cache = cache if cache is not None else HTTPCache(session=self.session)
+        self._bootstrap = BackgroundRefresher(
+            "bootstrap", lambda: self.get_json("bootstrap-static/"), memo_ttl, version=content_version
+        )
+        self._fixtures = BackgroundRefresher(
+            "fixtures", lambda: self.get_json("fixtures/"), memo_ttl, version=content_version
+        )
+        # Başarısız parçası olan context'ler cache'lenmez, bir sonraki istekte tekrar denenir
+        self._entries = SingleFlightCache(entry_ttl, should_cache=lambda ctx: ctx.complete)
+        self._entry_pool = ThreadPoolExecutor(max_workers=max(2, pool_size // 2), thread_name_prefix="fpl-entry")
+
+    def url(self, path: str) -> str:
+        return f"{self.base_url}/{path.lstrip('/')}"
+
+    def get_json(self, path: str, cached=True, session=None, stale_on_error=True):
+        """GET `path` (relative to base_url) and decode JSON."""
+        session = session or self.session
+        if cached:
+            return self.cache.get_json(self.url(path), timeout=self.timeout, session=session,
+                                       stale_on_error=stale_on_error)
+        r = session.get(self.url(path), timeout=self.timeout)
+        r.raise_for_status()
+        return r.json()
+
+    # ------------------------------------------------------------------
+    def bootstrap_snapshot(self, refresh=False):
+        """Last good bootstrap-static snapshot (.value, .version, .loaded_at); refresh=True loads now."""
+        return self._bootstrap.refresh() if refresh else self._bootstrap.get()
+
+    def fixtures_snapshot(self, refresh=False):
+        return self._fixtures.refresh() if refresh else self._fixtures.get()
+
+    def bootstrap(self, refresh=False) -> dict:
+        return self.bootstrap_snapshot(refresh).value
+
+    def fixtures(self, refresh=False) -> list:
+        return self.fixtures_snapshot(refresh).value
+
+    def start_background_refresh(self):
+        """Refresh bootstrap and fixtures every `memo_ttl` seconds in daemon threads."""
+        self._bootstrap.start()
+        self._fixtures.start()
+
+    def element_summary(self, player_id) -> dict:
+        """
+        Single attempt (no urllib3 retries, no stale fallback); wrap in
+        ratelimit.retry_with_backoff. A player that still fails keeps its
+        stored rows and is retried by the next run.
+        """
+        return self.get_json(f"element-summary/{player_id}/", session=self.ingest_session, stale_on_error=False)
+
+    def event_live(self, gw) -> dict:
+        """event/{gw}/live: every player's stats for one gameweek. Same retry contract as element_summary."""
+        return self.get_json(f"event/{int(gw)}/live/", session=self.ingest_session, stale_on_error=False)
+
+    def entry_history(self, user_id) -> dict:
+        return self.get_json(f"entry/{user_id}/history/", cached=False)
+
+    def entry_picks(self, user_id, gw) -> dict:
+        return self.get_json(f"entry/{user_id}/event/{gw}/picks/", cached=False)
+
+    def entry_context(self, user_id, gw) -> EntryContext:
+        """Picks + history of `user_id` for `gw` (TTL cached, single-flight)."""
+        user_id = str(user_id).strip()
+        gw = int(gw)
+
+        def load():
+            picks = self._entry_pool.submit(self.entry_picks, user_id, gw)
+            history = self._entry_pool.submit(self.entry_history, user_id)
+            parts = []
+            for future in (picks, history):
+                try:
+                    parts.append(future.result())
+                except Exception as e:
+                    parts.append(e)
+            return EntryContext(user_id, gw, *parts)
+
+        return self._entries.get((user_id, gw), load)
+
+    def league_standings(self, league_id, page=1) -> dict:
+        return self.get_json(f"leagues-classic/{league_id}/standings/?page_standings={int(page)}", cached=False)
+
+    def league_entries(self, league_id, max_pages=20) -> list:
+        """All standings rows of a classic league (50 per page) -> [{entry, entry_name, player_name, ...}]."""
+        rows = []
+        for page in range(1, max_pages + 1):
+            standings = self.league_standings(league_id, page)["standings"]
+            rows.extend(standings["results"])
+            if not standings.get("has_next"):
+                break
+        return rows
+
+    def close(self):
+        self._bootstrap.stop()
+        self._fixtures.stop()
+        self._entry_pool.shutdown(wait=False)
+        self.session.close()
+        self.ingest_session.close()
+
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_client() -> FPLClient:
+    """Process-wide shared client (created on first use)."""
+    global _client
+    with _client_lock:
+        if _client is None:
+            _client = FPLClient()
+        return _client
+
+
+def set_client(client: FPLClient) -> None:
+    """Replace the shared client (e.g. one pointed at the local replay server)."""
+    global _client
+    with _client_lock:
+        _client = client
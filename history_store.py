@@ -0,0 +1,262 @@
+import os
+from pathlib import Path
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.feather as feather
+import pyarrow.ipc as ipc
+
+from paths import DATA_DIR
+from schema import WEEKLY_POINTS_SCHEMA, apply_schema
+
+# Season -> round partitioned Arrow IPC (Feather v2) archive of weekly_points:
+#   history/season=2025-26/round=1.arrow, round=2.arrow, ...
+#   history/season=2025-26/consistency_stats.arrow
+# Dosyalar sıkıştırılmadan yazılır ki okurken memory-map edilebilsin.
+# weekly_points.csv her sezon üzerine yazılır; arşiv eski sezonları saklar.
+ARCHIVE_DIR = DATA_DIR / "history"
+
+# API'den string olarak gelen ama aslında sayısal olan kolonlar
+# (influence, creativity, expected_goals, ...)
+_TEXT_COLUMNS = {"kickoff_time"}
+
+
+def _partition_path(root: Path, rnd: int) -> Path:
+    return root / f"round={int(rnd)}.arrow"
+
+
+def _partition_round(path: Path) -> int:
+    return int(path.stem.split("=", 1)[1])
+
+
+def _coerce_numeric(df: pd.DataFrame) -> pd.DataFrame:
+    df = df.copy()
+    for col in df.columns:
+        if col in _TEXT_COLUMNS or df[col].dtype != object:
+            continue
+        converted = pd.to_numeric(df[col], errors="coerce")
+        # Sadece tamamen sayıya çevrilebilen kolonları değiştir
+        if converted.notna().sum() == df[col].notna().sum():
+            df[col] = converted
+    return df
+
+
+def season_from_events(events) -> str:
+    """bootstrap `events` -> season label, e.g. '2025-26' (from the first deadline)."""
+    first = min(events, key=lambda e: e["id"])
+    year = int(str(first["deadline_time"])[:4])
+    return f"{year}-{(year + 1) % 100:02d}"
+
+
+def season_dir(season: str, archive=ARCHIVE_DIR) -> Path:
+    return Path(archive) / f"season={season}"
+
+
+def list_seasons(archive=ARCHIVE_DIR) -> list[str]:
+    archive = Path(archive)
+    if not archive.exists():
+        return []
+    return sorted(p.name.split("=", 1)[1] for p in archive.glob("season=*") if p.is_dir())
+
+
+def current_season(archive=ARCHIVE_DIR):
+    """Latest season in the archive (None if empty)."""
+    seasons = list_seasons(archive)
+    return seasons[-1] if seasons else None
+
+
+def write_round_partitions(history_df: pd.DataFrame, root, rounds=None) -> None:
+    """
+    Write `history_df` as one Arrow IPC file per round.
+    - rounds: only (re)write these rounds; None rewrites every round and
+      removes partitions of rounds that no longer exist.
+    """
+    root = Path(root)
+    root.mkdir(parents=True, exist_ok=True)
+    # Kompakt tipler (int8/int16/float32, gerçek datetime) dosyaya da yazılır
+    df = apply_schema(_coerce_numeric(history_df), WEEKLY_POINTS_SCHEMA)
+
+    present = set(df["round"].astype(int).unique())
+    targets = present if rounds is None else set(int(r) for r in rounds)
+
+    for rnd in sorted(targets):
+        path = _partition_path(root, rnd)
+        part = df[df["round"] == rnd]
+        if part.empty:
+            if path.exists():
+                path.unlink()
+            continue
+        table = pa.Table.from_pandas(part.reset_index(drop=True), preserve_index=False)
+        tmp = path.with_suffix(".arrow.tmp")
+        feather.write_feather(table, tmp, compression="uncompressed")
+        os.replace(tmp, path)
+
+    if rounds is None:
+        for path in root.glob("round=*.arrow"):
+            if _partition_round(path) not in present:
+                path.unlink()
+
+
+def list_partitions(root, rounds=None) -> list[Path]:
+    root = Path(root)
+    if not root.exists():
+        return []
+    paths = sorted(root.glob("round=*.arrow"), key=_partition_round)
+    if rounds is not None:
+        wanted = set(int(r) for r in rounds)
+        paths = [p for p in paths if _partition_round(p) in wanted]
+    return paths
+
+
+def partitions_mtime(root) -> float:
+    """Latest modification time of any partition (cache key for readers)."""
+    return max((p.stat().st_mtime for p in list_partitions(root)), default=0.0)
+
+
+def _read_partition(path: Path, columns):
+    if columns is None:
+        return feather.read_table(path, memory_map=True)
+    # Eski partition'larda olmayan kolonlar (ör. player_code) atlanır, concat'ta null olur
+    with pa.memory_map(str(path)) as source:
+        available = set(ipc.open_file(source).schema.names)
+    return feather.read_table(path, columns=[c for c in columns if c in available], memory_map=True)
+
+
+def read_history(root, columns=None, rounds=None) -> pd.DataFrame:
+    """
+    Memory-map the round partitions of one season and read only `columns` (None -> all).
+    """
+    tables = [_read_partition(p, list(columns) if columns else None) for p in list_partitions(root, rounds)]
+    if not tables:
+        return pd.DataFrame(columns=list(columns) if columns else None)
+    # Partition'lar arasında genişlemiş int tiplerini (int8 -> int16) birleştir
+    df = pa.concat_tables(tables, promote_options="permissive").to_pandas()
+    if columns:
+        for col in columns:
+            if col not in df.columns:
+                df[col] = float("nan")
+        df = df[list(columns)]
+    return df
+
+
+def archive_mtime(seasons=None, archive=ARCHIVE_DIR) -> float:
+    seasons = list_seasons(archive) if seasons is None else seasons
+    return max((partitions_mtime(season_dir(s, archive)) for s in seasons), default=0.0)
+
+
+def query_history(seasons=None, rounds=None, columns=None, archive=ARCHIVE_DIR) -> pd.DataFrame:
+    """
+    Cross-season query: read only the given seasons (None -> all), rounds and
+    columns. Sadece istenen sezon klasörleri açılır; tek sezon okumak arşiv
+    büyüdükçe yavaşlamaz. A `season` column is added.
+    """
+    seasons = list_seasons(archive) if seasons is None else list(seasons)
+    frames = []
+    for season in seasons:
+        df = read_history(season_dir(season, archive), columns=columns, rounds=rounds)
+        df["season"] = season
+        frames.append(df)
+    if not frames:
+        return pd.DataFrame(columns=(list(columns) if columns else []) + ["season"])
+    out = pd.concat(frames, ignore_index=True)
+    out["season"] = out["season"].astype("category")
+    return out
+
+
+# ----------------------------------------------------------------------
+# Per-player running statistics of weekly total_points (consistency panel)
+# count / mean / M2 (Welford); iki parça Chan et al. formülüyle birleştirilir.
+# ----------------------------------------------------------------------
+STATS_COLUMNS = ["player_id", "count", "mean", "m2", "max_points"]
+
+
+def summarize_points(history_df: pd.DataFrame) -> pd.DataFrame:
+    """One pass over history rows -> player_id, count, mean, m2, max_points."""
+    if history_df.empty:
+        return pd.DataFrame(columns=STATS_COLUMNS)
+    points = history_df["total_points"].astype("float64")
+    grouped = points.groupby(history_df["player_id"])
+    stats = pd.DataFrame({
+        "count": grouped.count(),
+        "mean": grouped.mean(),
+        # M2 = sum((x - mean)^2) = var(ddof=0) * n
+        "m2": grouped.var(ddof=0) * grouped.count(),
+        "max_points": grouped.max(),
+    })
+    return stats.rename_axis("player_id").reset_index()[STATS_COLUMNS]
+
+
+def merge_stats(base: pd.DataFrame, new: pd.DataFrame) -> pd.DataFrame:
+    """Combine two per-player summaries (parallel Welford update)."""
+    if base.empty:
+        return new.reset_index(drop=True)
+    if new.empty:
+        return base.reset_index(drop=True)
+    m = base.merge(new, on="player_id", how="outer", suffixes=("_a", "_b"))
+    for col in ["count", "m2"]:
+        m[f"{col}_a"] = m[f"{col}_a"].fillna(0)
+        m[f"{col}_b"] = m[f"{col}_b"].fillna(0)
+    m["mean_a"] = m["mean_a"].fillna(0.0)
+    m["mean_b"] = m["mean_b"].fillna(0.0)
+
+    n = m["count_a"] + m["count_b"]
+    delta = m["mean_b"] - m["mean_a"]
+    out = pd.DataFrame({
+        "player_id": m["player_id"],
+        "count": n,
+        "mean": m["mean_a"] + delta * m["count_b"] / n,
+        "m2": m["m2_a"] + m["m2_b"] + delta ** 2 * m["count_a"] * m["count_b"] / n,
+        "max_points": m[["max_points_a", "max_points_b"]].max(axis=1),
+    })
+    return out.sort_values("player_id").reset_index(drop=True)
+
+
+def consistency_stats_path(root) -> Path:
+    """Per-season sidecar next to the round partitions (player ids are per season)."""
+    return Path(root) / "consistency_stats.arrow"
+
+
+def read_consistency_stats(path) -> pd.DataFrame:
+    path = Path(path)
+    if not path.exists():
+        return pd.DataFrame(columns=STATS_COLUMNS)
+    return feather.read_table(path, memory_map=True).to_pandas()
+
+
+def write_consistency_stats(stats: pd.DataFrame, path) -> None:
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    table = pa.Table.from_pandas(stats[STATS_COLUMNS].reset_index(drop=True), preserve_index=False)
+    tmp = path.with_suffix(".arrow.tmp")
+    feather.write_feather(table, tmp, compression="uncompressed")
+    os.replace(tmp, path)
+
+
+def update_consistency_stats(stored: pd.DataFrame, fresh: pd.DataFrame, path) -> pd.DataFrame:
+    """
+    Incremental update after refetching some players.
+    - stored: history rows before the refresh (at least player_id, fixture, total_points)
+    - fresh: newly fetched full histories of the refreshed players
+    Players whose existing rows are unchanged only fold in their new
+    fixtures; players with corrected rows are recomputed from `fresh`.
+    """
+    stats = read_consistency_stats(path)
+    if stats.empty:
+        return pd.DataFrame(columns=STATS_COLUMNS)
+
+    keys = ["player_id", "fixture"]
+    old = stored.loc[stored["player_id"].isin(fresh["player_id"].unique()), keys + ["total_points"]]
+    check = old.merge(fresh[keys + ["total_points"]], on=keys, how="left", suffixes=("_old", "_new"))
+    changed = set(check.loc[check["total_points_old"] != check["total_points_new"], "player_id"])
+
+    recompute = fresh[fresh["player_id"].isin(changed)]
+    appended = fresh[~fresh["player_id"].isin(changed)].merge(
+        old[keys], on=keys, how="left", indicator=True
+    )
+    appended = appended[appended["_merge"] == "left_only"]
+
+    stats = stats[~stats["player_id"].isin(changed)]
+    stats = merge_stats(stats, summarize_points(appended))
+    stats = merge_stats(stats, summarize_points(recompute))
+    write_consistency_stats(stats, path)
+    return stats
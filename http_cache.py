@@ -0,0 +1,180 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from pathlib import Path
+
+import requests
+
+from paths import DATA_DIR
+
+# Disk üzerinde paylaşılan HTTP cache (bootstrap-static, fixtures, element-summary ...)
+CACHE_DIR = Path(os.getenv("FPL_HTTP_CACHE_DIR", DATA_DIR / ".http_cache"))
+CACHE_MAX_BYTES = int(float(os.getenv("FPL_HTTP_CACHE_MAX_MB", "256")) * 1024 * 1024)
+# Eviction limit aşılınca toplam bu orana inene kadar siler (her put'ta tekrar taramamak için)
+EVICT_TO = 0.9
+
+
+class HTTPCache:
+    """
+    Disk-backed response cache with conditional GETs.
+
+    Each URL is stored as `<key>.body` (raw bytes) and `<key>.json`
+    (url, ETag, Last-Modified, size, fetched_at). A request sends
+    If-None-Match / If-Modified-Since when a copy exists and returns the
+    cached bytes on 304. Least recently used entries are evicted once the
+    total body size exceeds `max_bytes`, down to EVICT_TO of it.
+
+    The total is a running counter: the directory is scanned once on the
+    first write and again only when the limit is exceeded (the scan also
+    corrects drift from other processes sharing the directory).
+    """
+
+    def __init__(self, directory=CACHE_DIR, max_bytes=CACHE_MAX_BYTES, session=None):
+        self.directory = Path(directory)
+        self.max_bytes = int(max_bytes)
+        self.session = session
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "stale": 0, "evictions": 0}
+        self._size_lock = threading.Lock()
+        self._total = None
+
+    # ------------------------------------------------------------------
+    def _paths(self, url):
+        key = hashlib.sha256(url.encode("utf-8")).hexdigest()
+        return self.directory / f"{key}.body", self.directory / f"{key}.json"
+
+    def _count(self, name, n=1):
+        with self._lock:
+            self._stats[name] += n
+
+    def stats(self) -> dict:
+        with self._lock:
+            stats = dict(self._stats)
+        total = stats["hits"] + stats["misses"]
+        stats["hit_rate"] = stats["hits"] / total if total else 0.0
+        return stats
+
+    def _read(self, url):
+        body_path, meta_path = self._paths(url)
+        try:
+            meta = json.loads(meta_path.read_text(encoding="utf-8"))
+            body = body_path.read_bytes()
+        except (OSError, ValueError):
+            return None, None
+        return meta, body
+
+    def _write(self, url, response):
+        self.directory.mkdir(parents=True, exist_ok=True)
+        body_path, meta_path = self._paths(url)
+        try:
+            old_size = body_path.stat().st_size
+        except OSError:
+            old_size = 0
+        meta = {
+            "url": url,
+            "etag": response.headers.get("ETag"),
+            "last_modified": response.headers.get("Last-Modified"),
+            "size": len(response.content),
+            "fetched_at": time.time(),
+        }
+        # önce body, sonra meta: yarım yazılmış bir kayıt asla okunmaz
+        for path, payload in ((body_path, response.content),
+                              (meta_path, json.dumps(meta).encode("utf-8"))):
+            tmp = path.with_name(f"{path.name}.{threading.get_ident()}.tmp")
+            tmp.write_bytes(payload)
+            os.replace(tmp, path)
+        self._grow(meta["size"] - old_size)
+        return meta
+
+    def _touch(self, url):
+        body_path, _ = self._paths(url)
+        try:
+            os.utime(body_path)
+        except OSError:
+            pass
+
+    def _scan(self):
+        bodies = []
+        for path in self.directory.glob("*.body"):
+            try:
+                info = path.stat()
+            except OSError:
+                continue
+            bodies.append((info.st_mtime, info.st_size, path))
+        return bodies
+
+    def _grow(self, delta):
+        with self._size_lock:
+            if self._total is None:
+                self._total = sum(size for _, size, _ in self._scan())
+            else:
+                self._total += delta
+            if self._total > self.max_bytes:
+                self._evict()
+
+    def _evict(self):
+        """LRU eviction down to EVICT_TO * max_bytes; caller holds _size_lock."""
+        bodies = self._scan()
+        total = sum(size for _, size, _ in bodies)
+        target = self.max_bytes * EVICT_TO
+        for _, size, path in sorted(bodies):
+            if total <= target:
+                break
+            for p in (path, path.with_suffix(".json")):
+                try:
+                    p.unlink()
+                except OSError:
+                    pass
+            total -= size
+            self._count("evictions")
+        self._total = total
+
+    # ------------------------------------------------------------------
+    def get(self, url, headers=None, timeout=15, max_age=0, session=None, stale_on_error=True) -> bytes:
+        """
+        Return the response body for `url`.
+        - max_age: seconds a cached copy is served without revalidation
+        - On a network error or a 5xx response (after the session's retries)
+          the cached copy (if any) is served as stale; stale_on_error=False
+          raises instead (the caller retries on its own)
+        """
+        meta, body = self._read(url)
+        if meta is not None and max_age and time.time() - meta["fetched_at"] < max_age:
+            self._count("hits")
+            self._touch(url)
+            return body
+
+        req_headers = dict(headers or {})
+        if meta is not None:
+            if meta.get("etag"):
+                req_headers["If-None-Match"] = meta["etag"]
+            if meta.get("last_modified"):
+                req_headers["If-Modified-Since"] = meta["last_modified"]
+
+        http = session or self.session or requests
+        try:
+            response = http.get(url, headers=req_headers, timeout=timeout)
+        except requests.RequestException:
+            if meta is None or not stale_on_error:
+                raise
+            self._count("stale")
+            return body
+
+        if response.status_code == 304 and meta is not None:
+            self._count("hits")
+            self._touch(url)
+            return body
+        if response.status_code >= 500 and meta is not None and stale_on_error:
+            self._count("stale")
+            return body
+
+        response.raise_for_status()
+        self._count("misses")
+        self._write(url, response)
+        return response.content
+
+    def get_json(self, url, **kwargs):
+        return json.loads(self.get(url, **kwargs))
+
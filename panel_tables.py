@@ -0,0 +1,180 @@
+import ast
+import textwrap
+
+import numpy as np
+import pandas as pd
+
+from fixture_index import get_fixture_index
+
+# Dashboard panelleri ve weekly job'ın snapshot aşaması bu saf tablo
+# fonksiyonlarını paylaşır; UI (streamlit/altair/matplotlib) import edilmez.
+
+
+def team_dependency_leaders(players: pd.DataFrame) -> pd.DataFrame:
+    """
+    Returns one row per team: the player with the highest Team Dependency Ratio (TDR).
+    `players` is the enriched player table (team_name / team_short_name).
+    """
+    # Column selection gives a new frame; the shared player table is never written to
+    p = players[[
+        "id", "first_name", "second_name", "web_name",
+        "team", "team_name", "team_short_name", "goals_scored", "assists"
+    ]].rename(columns={"team_name": "name", "team_short_name": "short_name"})
+
+    # Contribution = goals + assists
+    p["contribution"] = p["goals_scored"].fillna(0) + p["assists"].fillna(0)
+
+    # Team total goals (based on goals_scored; simple and consistent with your current logic)
+    team_goals = (
+        p.groupby("team", as_index=False)["goals_scored"]
+         .sum()
+         .rename(columns={"team": "team_id", "goals_scored": "team_total_goals"})
+    )
+
+    merged = p.merge(team_goals, left_on="team", right_on="team_id", how="left")
+
+    # Avoid division by zero
+    merged["team_total_goals"] = merged["team_total_goals"].fillna(0)
+
+    merged["TDR"] = (merged["contribution"] / merged["team_total_goals"].replace(0, pd.NA)).astype("Float64")
+
+    # Keep only teams where we can compute a meaningful ratio
+    merged = merged.dropna(subset=["TDR"])
+
+    # Pick the top TDR player per team
+    team_leaders = (
+        merged.sort_values("TDR", ascending=False)
+              .drop_duplicates(subset=["team"])
+              .reset_index(drop=True)
+    )
+
+    # Keep only columns we need downstream
+    out = team_leaders[[
+        "first_name", "second_name", "web_name",
+        "name", "short_name",
+        "goals_scored", "assists", "contribution",
+        "team_total_goals", "TDR"
+    ]].copy()
+
+    return out
+
+def compute_consistency_from_stats(stats: pd.DataFrame, players: pd.DataFrame) -> pd.DataFrame:
+    """Per-player mean/std of weekly points from the count/mean/M2 table (O(players)), merged with player info and filtered for the panel."""
+    consistency = stats[["player_id", "mean"]].copy()
+    # sample std (ddof=1) like pandas; tek maçlık oyuncularda NaN
+    consistency["std"] = np.sqrt(stats["m2"] / (stats["count"] - 1).where(stats["count"] > 1))
+
+    # 4. Stability score
+    consistency["consistency_index"] = consistency["mean"] / consistency["std"].replace(0, 1)
+
+    consistency = consistency.merge(
+    players[["id", "first_name", "second_name", "team", "web_name", "total_points"]],
+    left_on="player_id", right_on="id", how="left"
+    )
+    
+    max_point = stats["max_points"].max()
+
+    consistency = consistency[consistency["total_points"] > max_point/3]
+
+    consistency = consistency.dropna(subset=["consistency_index"])
+    return consistency
+
+def parse_pl_standings(df: pd.DataFrame) -> pd.DataFrame:
+    """football-data.org table rows -> display columns sorted by position."""
+    df = df.copy()
+    # team kolonu string json/dict formatındaysa parse et
+    df["team"] = df["team"].apply(lambda x: ast.literal_eval(x) if isinstance(x, str) else x)
+
+    # dict içinden alanları çıkar
+    df["team_name"] = df["team"].apply(lambda t: t.get("name") if isinstance(t, dict) else t)
+    df["short_name"] = df["team"].apply(lambda t: t.get("shortName") if isinstance(t, dict) else t)
+
+    standings = (
+        df[[
+            "position", "team_name", "playedGames", "won", "draw", "lost",
+            "goalsFor", "goalsAgainst", "goalDifference", "points"
+        ]]
+        .sort_values("position")
+        .reset_index(drop=True)
+    )
+    return standings
+
+def render_standings_html(df: pd.DataFrame) -> str:
+    html = textwrap.dedent("""\
+    <style>
+    @import url('https://fonts.googleapis.com/css2?family=Roboto:wght@400;500;700&display=swap');
+
+    table.pl-table {
+        width: 100%;
+        border-collapse: collapse;
+        font-size: 14px;
+        font-family: 'Roboto', sans-serif;
+    }
+    table.pl-table th {
+        background-color: #222;
+        color: #fff;
+        padding: 6px;
+        text-align: center;
+        font-weight: 500;
+    }
+    table.pl-table td {
+        border-bottom: 1px solid #ddd;
+        padding: 6px;
+        text-align: center;
+    }
+    /* Points: yeşil */
+    table.pl-table td.points { font-weight: 700; color: #1a7f37; }
+    /* Goal Difference: pozitif yeşil, negatif kırmızı */
+    table.pl-table td.gd-pos { color: #1a7f37; }
+    table.pl-table td.gd-neg { color: #d73a49; }
+    </style>
+    <table class="pl-table">
+      <thead>
+        <tr>
+          <th>Pos</th><th>Team</th><th>Pld</th><th>W</th><th>D</th><th>L</th>
+          <th>GF</th><th>GA</th><th>GD</th><th>Pts</th>
+        </tr>
+      </thead>
+      <tbody>
+    """)
+    for _, row in df.iterrows():
+        gd_class = "gd-pos" if row["goalDifference"] >= 0 else "gd-neg"
+        html += f"""
+        <tr>
+          <td>{row['position']}</td>
+          <td style="text-align:left">{row['team_name']}</td>
+          <td>{row['playedGames']}</td>
+          <td>{row['won']}</td>
+          <td>{row['draw']}</td>
+          <td>{row['lost']}</td>
+          <td>{row['goalsFor']}</td>
+          <td>{row['goalsAgainst']}</td>
+          <td class="{gd_class}">{row['goalDifference']}</td>
+          <td class="points">{row['points']}</td>
+        </tr>
+        """
+    html += "</tbody></table>"
+    return html
+
+def build_fixture_difficulty(fixtures, teams, events, gameweeks=5):
+    # Just take the next X weeks
+    current_gw = next(e["id"] for e in events if e["is_current"]) + 1
+
+    # Home ve away satırları paylaşılan fikstür index'inden (takım × GW dizileri)
+    df = get_fixture_index(fixtures).to_frame(current_gw, current_gw + gameweeks)
+    if df.empty:
+        return pd.DataFrame(), pd.DataFrame()
+    df = df.merge(teams, left_on="team", right_on="id").drop("id", axis=1)
+    df = df.merge(teams, left_on="opponent", right_on="id", suffixes=("", "_opp")).drop("id", axis=1)
+
+    # Average difficulty per team
+    avg_df = df.groupby("name").agg({"difficulty":"mean"}).reset_index().sort_values("difficulty")
+    avg_df.rename(columns={"difficulty":"Avg Difficulty (next %d GWs)" % gameweeks}, inplace=True)
+
+    return avg_df, df
+
+def fixture_pivot(fixture_df: pd.DataFrame) -> pd.DataFrame:
+    """Team × GW table of "OPP (difficulty)" cells."""
+    fixture_df = fixture_df.copy()
+    fixture_df["opp_info"] = fixture_df["short_name_opp"] + " (" + fixture_df["difficulty"].astype(str) + ")"
+    return fixture_df.pivot_table(index="name", columns="gw", values="opp_info", aggfunc="first")
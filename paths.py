@@ -5,5 +5,3 @@ BASE_DIR = Path(__file__).resolve().parent
 
 # CSV'lerin bulunduğu yer
 DATA_DIR = BASE_DIR
-
-print("Veri dizini:", DATA_DIR)
\ No newline at end of file
@@ -0,0 +1,32 @@
+import pandas as pd
+
+POSITION_MAP = {
+    1: "Goalkeeper",
+    2: "Defence",
+    3: "Midfielder",
+    4: "Forward",
+}
+
+
+def build_player_table(players: pd.DataFrame, teams: pd.DataFrame) -> pd.DataFrame:
+    """
+    bootstrap `players` + panellerin türettiği kolonlar, tek seferde:
+    - team_name / team_short_name (teams tablosundan)
+    - position_name (element_type -> Goalkeeper/Defence/Midfielder/Forward)
+    - cost_million (now_cost / 10)
+    - selected_by_percent as a number
+    - display_name ("first second")
+    Panels read this table as is and never modify it (pandas >= 3 copy-on-write
+    makes an accidental write copy instead of changing the shared table).
+    """
+    team_info = teams.set_index("id")
+    first = players["first_name"].astype("string").fillna("")
+    second = players["second_name"].astype("string").fillna("")
+    return players.reset_index(drop=True).assign(
+        team_name=players["team"].map(team_info["name"]).to_numpy(),
+        team_short_name=players["team"].map(team_info["short_name"]).to_numpy(),
+        position_name=players["element_type"].map(POSITION_MAP).to_numpy(),
+        cost_million=(players["now_cost"] / 10).to_numpy(),
+        selected_by_percent=pd.to_numeric(players["selected_by_percent"], errors="coerce").to_numpy(),
+        display_name=(first + " " + second).str.strip().to_numpy(),
+    )
@@ -0,0 +1,239 @@
+import cProfile
+import hmac
+import io
+import json
+import os
+import pstats
+import threading
+import time
+import tracemalloc
+from collections import deque
+from functools import wraps
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+# Açmak için: FPL_PROFILE=1 (sadece süre), cprofile, tracemalloc veya all.
+# URL'deki ?profile=cprofile ... sadece FPL_PROFILE açıkken ya da
+# ?profile_key=<FPL_PROFILE_KEY> ile (admin anahtarı) dikkate alınır.
+PROFILE_ENV = "FPL_PROFILE"
+PROFILE_KEY_ENV = "FPL_PROFILE_KEY"
+PROFILE_QUERY_PARAM = "profile"
+PROFILE_KEY_QUERY_PARAM = "profile_key"
+PROFILE_DUMP_ENV = "FPL_PROFILE_DUMP"
+MAX_SAMPLES = 500
+
+_MODES = {
+    "1": set(), "true": set(), "time": set(),
+    "cprofile": {"cprofile"},
+    "tracemalloc": {"tracemalloc"},
+    "all": {"cprofile", "tracemalloc"},
+}
+
+
+class _Registry:
+    """Process-wide samples (all reruns and sessions share the same process)."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._samples = {}
+        self._kinds = {}
+        self._profiles = {}
+        self._memory = {}
+
+    def record(self, name, kind, wall, cpu, profile_text=None, peak_bytes=None):
+        with self._lock:
+            self._samples.setdefault(name, deque(maxlen=MAX_SAMPLES)).append((time.time(), wall, cpu))
+            self._kinds[name] = kind
+            if profile_text is not None:
+                self._profiles[name] = profile_text
+            if peak_bytes is not None:
+                self._memory.setdefault(name, deque(maxlen=MAX_SAMPLES)).append(peak_bytes)
+
+    def summary(self) -> pd.DataFrame:
+        with self._lock:
+            rows = []
+            for name, samples in self._samples.items():
+                wall = np.array([s[1] for s in samples])
+                cpu = np.array([s[2] for s in samples])
+                mem = self._memory.get(name)
+                rows.append({
+                    "name": name,
+                    "kind": self._kinds[name],
+                    "count": len(wall),
+                    "p50_s": float(np.percentile(wall, 50)),
+                    "p95_s": float(np.percentile(wall, 95)),
+                    "max_s": float(wall.max()),
+                    "last_s": float(wall[-1]),
+                    "cpu_p50_s": float(np.percentile(cpu, 50)),
+                    "peak_mem_p95_mb": float(np.percentile(list(mem), 95)) / 1e6 if mem else None,
+                })
+        columns = ["name", "kind", "count", "p50_s", "p95_s", "max_s", "last_s", "cpu_p50_s", "peak_mem_p95_mb"]
+        return pd.DataFrame(rows, columns=columns).sort_values("p95_s", ascending=False)
+
+    def profile_text(self, name):
+        with self._lock:
+            return self._profiles.get(name)
+
+    def profiled_names(self):
+        with self._lock:
+            return sorted(self._profiles)
+
+    def clear(self):
+        with self._lock:
+            self._samples.clear()
+            self._kinds.clear()
+            self._profiles.clear()
+            self._memory.clear()
+
+
+registry = _Registry()
+_local = threading.local()
+# tracemalloc süreç geneli: aynı anda tek ölçüm, yoksa peak'ler birbirini ezer
+_trace_lock = threading.Lock()
+
+
+def _query_allowed(query_params, env_value) -> bool:
+    """The ?profile= param is honoured only if FPL_PROFILE is on or ?profile_key= matches FPL_PROFILE_KEY."""
+    if env_value in _MODES:
+        return True
+    key = os.getenv(PROFILE_KEY_ENV, "")
+    given = query_params.get(PROFILE_KEY_QUERY_PARAM, "")
+    return bool(key) and hmac.compare_digest(given.encode(), key.encode())
+
+
+def _mode():
+    """None when profiling is off, else the set of extra collectors."""
+    value = os.getenv(PROFILE_ENV, "").strip().lower()
+    try:
+        query_params = st.query_params
+        if PROFILE_QUERY_PARAM in query_params and _query_allowed(query_params, value):
+            value = query_params[PROFILE_QUERY_PARAM].strip().lower()
+    except Exception:
+        # Streamlit runtime dışında (weekly job, benchmark) query param yok
+        pass
+    return _MODES.get(value)
+
+
+def enabled() -> bool:
+    return _mode() is not None
+
+
+def fragment_rerun() -> bool:
+    """True while Streamlit reruns only fragment(s), not the whole script."""
+    try:
+        from streamlit.runtime.scriptrunner import get_script_run_ctx
+
+        ctx = get_script_run_ctx()
+    except Exception:
+        return False
+    return bool(ctx is not None and ctx.fragment_ids_this_run)
+
+
+def timed(name: str, kind: str = "panel"):
+    """
+    Panel / data load süresini ölç. Profiling kapalıyken fonksiyon doğrudan
+    çağrılır. Açıkken wall + CPU süresi, istenirse cProfile çıktısı ve
+    tracemalloc peak kaydedilir (iç içe çağrılarda sadece en dıştaki).
+    tracemalloc runs one measurement at a time: a call that finds another
+    one running records no peak instead of sharing the process-wide counter,
+    and tracing is stopped again if this call started it.
+    """
+    def decorator(fn):
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            mode = _mode()
+            if mode is None:
+                return fn(*args, **kwargs)
+
+            outermost = not getattr(_local, "active", False)
+            profiler = cProfile.Profile() if outermost and "cprofile" in mode else None
+            # Kilit alınamazsa (başka session ölçüyor) bekleme yok, peak kaydedilmez
+            trace_mem = outermost and "tracemalloc" in mode and _trace_lock.acquire(blocking=False)
+            started_trace = False
+            if outermost:
+                _local.active = True
+            if trace_mem:
+                if not tracemalloc.is_tracing():
+                    tracemalloc.start()
+                    started_trace = True
+                tracemalloc.reset_peak()
+
+            start, cpu_start = time.perf_counter(), time.process_time()
+            if profiler is not None:
+                profiler.enable()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                if profiler is not None:
+                    profiler.disable()
+                wall = time.perf_counter() - start
+                cpu = time.process_time() - cpu_start
+                peak = None
+                if trace_mem:
+                    peak = tracemalloc.get_traced_memory()[1]
+                    if started_trace:
+                        tracemalloc.stop()
+                    _trace_lock.release()
+                if outermost:
+                    _local.active = False
+
+                text = None
+                if profiler is not None:
+                    buf = io.StringIO()
+                    pstats.Stats(profiler, stream=buf).sort_stats("cumulative").print_stats(25)
+                    text = buf.getvalue()
+                registry.record(name, kind, wall, cpu, text, peak)
+
+                if kind == "panel":
+                    try:
+                        st.caption(f"⏱️ {name}: {wall:.2f} s")
+                    except Exception:
+                        pass
+        return wrapper
+    return decorator
+
+
+def dump_json(path=None) -> str:
+    """Aggregated timings as JSON; also written to `path` when given."""
+    payload = {
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "pid": os.getpid(),
+        "entries": registry.summary().to_dict("records"),
+    }
+    text = json.dumps(payload, indent=2)
+    if path:
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(text)
+    return text
+
+
+def profiling_panel():
+    """Admin panel: p50/p95 per panel and data load, cProfile output, JSON export."""
+    st.title("🛠️ Performance (admin)")
+    summary = registry.summary()
+    if summary.empty:
+        st.info("No samples yet. Interact with the dashboard to collect timings.")
+        return
+
+    st.dataframe(
+        summary.style.format({
+            "p50_s": "{:.3f}", "p95_s": "{:.3f}", "max_s": "{:.3f}",
+            "last_s": "{:.3f}", "cpu_p50_s": "{:.3f}", "peak_mem_p95_mb": "{:.1f}",
+        }, na_rep="-"),
+        use_container_width=True,
+        hide_index=True,
+    )
+
+    names = registry.profiled_names()
+    if names:
+        selected = st.selectbox("cProfile (last run)", names)
+        st.code(registry.profile_text(selected), language="text")
+
+    col1, col2 = st.columns(2)
+    with col1:
+        st.download_button("Download JSON", dump_json(), file_name="fpl_profile.json", mime="application/json")
+    with col2:
+        if st.button("Reset samples"):
+            registry.clear()
@@ -0,0 +1,72 @@
+import random
+import threading
+import time
+
+import requests
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket.
+    - rate: tokens added per second (ortalama istek/saniye)
+    - capacity: maximum burst size (default: rate, at least 1)
+    """
+
+    def __init__(self, rate: float, capacity: float | None = None):
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        self.rate = float(rate)
+        self.capacity = float(capacity) if capacity is not None else max(1.0, self.rate)
+        self._tokens = self.capacity
+        self._last = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self, tokens: float = 1.0) -> None:
+        """Block until `tokens` are available, then consume them."""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._last) * self.rate)
+                self._last = now
+                if self._tokens >= tokens:
+                    self._tokens -= tokens
+                    return
+                wait = (tokens - self._tokens) / self.rate
+            time.sleep(wait)
+
+
+def is_retryable(exc: BaseException) -> bool:
+    """429 / 5xx responses, timeouts and connection errors are worth retrying; 404 etc. are not."""
+    if isinstance(exc, requests.HTTPError):
+        status = exc.response.status_code if exc.response is not None else None
+        return status == 429 or (status is not None and status >= 500)
+    return isinstance(exc, (requests.ConnectionError, requests.Timeout))
+
+
+def retry_after(exc: BaseException) -> float | None:
+    """Seconds from a Retry-After header (delta-seconds form) of an HTTPError, else None."""
+    response = getattr(exc, "response", None)
+    if response is None:
+        return None
+    try:
+        return max(0.0, float(response.headers.get("Retry-After", "")))
+    except ValueError:
+        return None
+
+
+def retry_with_backoff(fn, retries=5, base=1.0, cap=60.0, retryable=is_retryable, sleep=time.sleep):
+    """
+    Call `fn()`; on a retryable error wait and try again, up to `retries` more times.
+    Bekleme süresi exponential backoff + full jitter: uniform(0, min(cap, base * 2**attempt)),
+    böylece aynı anda 429 alan worker'lar aynı anda tekrar denemez. A Retry-After
+    header raises the wait to at least that many seconds (still capped at `cap`).
+    `fn` should not retry on its own (see FPLClient.element_summary).
+    """
+    for attempt in range(retries + 1):
+        try:
+            return fn()
+        except Exception as e:
+            if attempt == retries or not retryable(e):
+                raise
+            wait = random.uniform(0, min(cap, base * 2 ** attempt))
+            sleep(min(cap, max(wait, retry_after(e) or 0.0)))
@@ -0,0 +1,125 @@
+import logging
+import threading
+import time
+
+log = logging.getLogger(__name__)
+
+
+class Snapshot:
+    """One loaded value: `version` (content id), `loaded_at` (time.time())."""
+
+    __slots__ = ("value", "version", "loaded_at")
+
+    def __init__(self, value, version, loaded_at):
+        self.value = value
+        self.version = version
+        self.loaded_at = loaded_at
+
+    @property
+    def age(self) -> float:
+        return time.time() - self.loaded_at
+
+
+class BackgroundRefresher:
+    """
+    Stale-while-revalidate holder of one remote resource (bootstrap, fixtures).
+
+    - get(): returns the last good snapshot right away. Only the very first
+      call (nothing loaded yet) waits for the loader.
+    - Once the snapshot is older than `max_age`, get() starts one refresh in
+      a worker thread and still returns the stale snapshot.
+    - start(): also refresh every `max_age` seconds in a daemon thread, so
+      nobody has to hit an expired snapshot at all.
+    - A failed refresh keeps the stale snapshot (API down -> eski veri) and is
+      retried after `retry_after` seconds.
+    The new snapshot replaces the old one with a single assignment, so a
+    reader sees either the old or the new value, never a mix.
+    """
+
+    def __init__(self, name, loader, max_age, version=None, retry_after=60.0):
+        self.name = name
+        self.loader = loader
+        self.max_age = max_age
+        self.version = version
+        self.retry_after = retry_after
+        self.snapshot = None
+        self.last_error = None
+        self.refreshes = 0
+        self.failures = 0
+        self._next_attempt = 0.0
+        self._lock = threading.Lock()
+        self._inflight = None
+        self._stop = threading.Event()
+        self._scheduler = None
+
+    def _load(self) -> Snapshot:
+        value = self.loader()
+        version = self.version(value) if self.version else str(self.refreshes + 1)
+        snap = Snapshot(value, version, time.time())
+        self.snapshot = snap
+        self.refreshes += 1
+        self.last_error = None
+        return snap
+
+    def _background(self):
+        try:
+            self._load()
+        except Exception as e:
+            self.failures += 1
+            self.last_error = e
+            self._next_attempt = time.monotonic() + self.retry_after
+            log.warning("%s refresh failed, serving stale data: %s", self.name, e)
+        finally:
+            with self._lock:
+                self._inflight = None
+
+    def refresh_async(self) -> bool:
+        """Start a background refresh unless one is running (-> True if started)."""
+        with self._lock:
+            if self._inflight is not None:
+                return False
+            self._inflight = threading.Thread(target=self._background, name=f"refresh-{self.name}", daemon=True)
+            self._inflight.start()
+            return True
+
+    def refresh(self) -> Snapshot:
+        """Load now on the calling thread; errors are raised (stale snapshot stays)."""
+        return self._load()
+
+    def get(self) -> Snapshot:
+        snap = self.snapshot
+        if snap is None:
+            # İlk yükleme: gösterilecek eski veri yok, beklemek zorunda
+            with self._lock:
+                if self.snapshot is None:
+                    return self._load()
+                snap = self.snapshot
+        if snap.age >= self.max_age and time.monotonic() >= self._next_attempt:
+            self.refresh_async()
+        return snap
+
+    def start(self):
+        """Refresh every `max_age` seconds in a daemon thread (idempotent)."""
+        if self._scheduler is not None:
+            return
+        self._stop.clear()
+
+        def loop():
+            while True:
+                snap = self.snapshot
+                if self.last_error is not None:
+                    wait = self.retry_after
+                else:
+                    wait = self.max_age - snap.age if snap is not None else 0
+                if self._stop.wait(max(wait, 1.0)):
+                    return
+                snap = self.snapshot
+                if snap is None or snap.age >= self.max_age - 1 or self.last_error is not None:
+                    self.refresh_async()
+
+        self._scheduler = threading.Thread(target=loop, name=f"refresh-{self.name}-schedule", daemon=True)
+        self._scheduler.start()
+
+    def stop(self):
+        self._stop.set()
+        self._scheduler = None
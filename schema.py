@@ -0,0 +1,176 @@
+import numpy as np
+import pandas as pd
+
+# Haftalık history (weekly_points) için sabit tipler.
+# "datetime" -> UTC datetime64, "bool" -> bool, "category" -> categorical
+WEEKLY_POINTS_SCHEMA = {
+    "element": "int16",
+    "fixture": "int16",
+    "opponent_team": "int8",
+    "total_points": "int8",
+    "was_home": "bool",
+    "kickoff_time": "datetime",
+    "team_h_score": "float32",
+    "team_a_score": "float32",
+    "round": "int8",
+    "modified": "bool",
+    "minutes": "int16",
+    "goals_scored": "int8",
+    "assists": "int8",
+    "clean_sheets": "int8",
+    "goals_conceded": "int8",
+    "own_goals": "int8",
+    "penalties_saved": "int8",
+    "penalties_missed": "int8",
+    "yellow_cards": "int8",
+    "red_cards": "int8",
+    "saves": "int8",
+    "bonus": "int8",
+    "bps": "int16",
+    "influence": "float32",
+    "creativity": "float32",
+    "threat": "float32",
+    "ict_index": "float32",
+    "clearances_blocks_interceptions": "int8",
+    "recoveries": "int8",
+    "tackles": "int8",
+    "defensive_contribution": "int8",
+    "starts": "int8",
+    "expected_goals": "float32",
+    "expected_assists": "float32",
+    "expected_goal_involvements": "float32",
+    "expected_goals_conceded": "float32",
+    "value": "int16",
+    "transfers_balance": "int32",
+    "selected": "int32",
+    "transfers_in": "int32",
+    "transfers_out": "int32",
+    "player_id": "int16",
+    # sezonlar arası sabit oyuncu kimliği (bootstrap `code`)
+    "player_code": "int32",
+}
+
+# bootstrap `elements` (players) frame'inin sık kullanılan kolonları.
+# Şemada olmayan kolonlar compact_remaining ile otomatik küçültülür.
+PLAYERS_SCHEMA = {
+    "id": "int16",
+    "code": "int32",
+    "team": "int8",
+    "team_code": "int16",
+    "element_type": "int8",
+    "status": "category",
+    "now_cost": "int16",
+    "cost_change_event": "int8",
+    "cost_change_start": "int16",
+    "total_points": "int16",
+    "event_points": "int16",
+    "minutes": "int16",
+    "goals_scored": "int8",
+    "assists": "int8",
+    "clean_sheets": "int8",
+    "goals_conceded": "int16",
+    "bonus": "int16",
+    "bps": "int16",
+    "starts": "int8",
+    "form": "float32",
+    "points_per_game": "float32",
+    "selected_by_percent": "float32",
+    "influence": "float32",
+    "creativity": "float32",
+    "threat": "float32",
+    "ict_index": "float32",
+    "expected_goals": "float32",
+    "expected_assists": "float32",
+    "expected_goal_involvements": "float32",
+    "expected_goals_conceded": "float32",
+    "transfers_in_event": "int32",
+    "transfers_out_event": "int32",
+    "transfers_in": "int32",
+    "transfers_out": "int32",
+    "chance_of_playing_next_round": "float32",
+    "chance_of_playing_this_round": "float32",
+    "news_added": "datetime",
+}
+
+_INT_ORDER = ["int8", "int16", "int32", "int64"]
+
+
+def _fit_int(values: pd.Series, dtype: str) -> pd.Series:
+    """Cast to `dtype`, widening if the data doesn't fit; NaN -> float32."""
+    if values.isna().any():
+        return values.astype("float32")
+    if values.empty:
+        return values.astype(dtype)
+    lo, hi = values.min(), values.max()
+    for candidate in _INT_ORDER[_INT_ORDER.index(dtype):]:
+        info = np.iinfo(candidate)
+        if info.min <= lo and hi <= info.max:
+            return values.astype(candidate)
+    return values
+
+
+def _to_bool(values: pd.Series) -> pd.Series:
+    if values.dtype == bool:
+        return values
+    return values.astype(str).str.strip().str.lower().isin(["true", "1"])
+
+
+def _compact_column(values: pd.Series) -> pd.Series:
+    """Şemada olmayan kolonlar için: sayıları küçült, sayısal metinleri çevir, tekrar eden metinleri kategori yap."""
+    if pd.api.types.is_bool_dtype(values) or pd.api.types.is_datetime64_any_dtype(values):
+        return values
+    if pd.api.types.is_integer_dtype(values):
+        return _fit_int(values, "int8")
+    if pd.api.types.is_float_dtype(values):
+        return values.astype("float32")
+    if values.dtype == object or pd.api.types.is_string_dtype(values):
+        non_null = values.notna().sum()
+        converted = pd.to_numeric(values, errors="coerce")
+        if non_null and converted.notna().sum() == non_null:
+            return converted.astype("float32")
+        if non_null and values.nunique(dropna=True) <= max(1, len(values) // 20):
+            return values.astype("category")
+    return values
+
+
+def apply_schema(df: pd.DataFrame, schema: dict, compact_remaining=False) -> pd.DataFrame:
+    """Return a copy of `df` with the declared compact dtypes applied."""
+    out = df.copy()
+    for col in out.columns:
+        dtype = schema.get(col)
+        values = out[col]
+        if dtype is None:
+            if compact_remaining:
+                out[col] = _compact_column(values)
+        elif dtype == "datetime":
+            out[col] = pd.to_datetime(values, utc=True, errors="coerce")
+        elif dtype == "bool":
+            out[col] = _to_bool(values)
+        elif dtype == "category":
+            out[col] = values.astype("category")
+        elif dtype.startswith("int"):
+            out[col] = _fit_int(pd.to_numeric(values, errors="coerce"), dtype)
+        else:
+            out[col] = pd.to_numeric(values, errors="coerce").astype(dtype)
+    return out
+
+
+def frame_bytes(df: pd.DataFrame) -> int:
+    return int(df.memory_usage(deep=True).sum())
+
+
+def memory_report(name: str, before: pd.DataFrame, after: pd.DataFrame) -> dict:
+    """Before/after bytes of a frame (deep memory usage)."""
+    b, a = frame_bytes(before), frame_bytes(after)
+    return {
+        "frame": name,
+        "rows": len(after),
+        "before_bytes": b,
+        "after_bytes": a,
+        "ratio": b / a if a else float("nan"),
+    }
+
+
+def format_memory_report(report: dict) -> str:
+    return (f"{report['frame']}: {report['before_bytes'] / 1e6:.2f} MB -> "
+            f"{report['after_bytes'] / 1e6:.2f} MB ({report['ratio']:.1f}x, {report['rows']} rows)")
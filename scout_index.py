@@ -0,0 +1,89 @@
+import numpy as np
+import pandas as pd
+
+from player_table import POSITION_MAP
+
+# Slider'ların filtrelediği kolonlar (aralıklar iki uçta da dahil)
+RANGE_COLUMNS = ("cost_million", "minutes", "total_points", "selected_by_percent")
+
+
+class ScoutIndex:
+    """
+    Scout Assistant'ın filtre yapısı, veri versiyonu başına bir kez kurulur.
+
+    - frame: the player table (player_table.build_player_table) columns the
+      panel shows, plus value_ratio, sorted by value_ratio (descending)
+    - for each range column: the row ranks sorted by that column and the
+      sorted values, so a [lo, hi] slider range is two binary searches
+    - per position: the ranks of its players
+    A query intersects the candidate ranks and returns them in rank order,
+    i.e. already sorted by value_ratio. Treat `frame` as read-only.
+    """
+
+    def __init__(self, table: pd.DataFrame):
+        ply = table[[
+            "id", "web_name", "team_name", "position_name", "cost_million",
+            "minutes", "total_points", "selected_by_percent",
+        ]]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            ply = ply.assign(value_ratio=(ply["total_points"] / ply["cost_million"]).round(2))
+
+        self.frame = ply.sort_values("value_ratio", ascending=False, kind="mergesort").reset_index(drop=True)
+
+        self._ranks = {}
+        self._sorted = {}
+        self._columns = {}
+        for col in RANGE_COLUMNS:
+            # NaN'lar sona dizilir, searchsorted onları hiçbir aralığa almaz.
+            # Float kolonlar kendi dtype'ında kalır (selected_by_percent float32):
+            # sınırlar da o dtype'a çevrilir, eski pandas maskesi gibi 10.3 == 10.3 olur
+            values = self.frame[col].to_numpy()
+            if not np.issubdtype(values.dtype, np.floating):
+                values = values.astype("float64")
+            order = np.argsort(values, kind="stable")
+            self._columns[col] = values
+            self._ranks[col] = order
+            self._sorted[col] = values[order]
+
+        self._position = self.frame["position_name"].to_numpy()
+        self._position_ranks = {name: np.flatnonzero(self._position == name) for name in POSITION_MAP.values()}
+
+    def __len__(self):
+        return len(self.frame)
+
+    def _bounds(self, col, lo, hi):
+        """Slider bounds in the column's dtype, so a value on a bound compares equal."""
+        dtype = self._columns[col].dtype
+        return dtype.type(lo), dtype.type(hi)
+
+    def _range(self, col, lo, hi) -> np.ndarray:
+        """Ranks with lo <= col <= hi: two binary searches, a view (no copy, no scan)."""
+        values = self._sorted[col]
+        start = np.searchsorted(values, lo, side="left")
+        stop = np.searchsorted(values, hi, side="right")
+        return self._ranks[col][start:stop]
+
+    def query(self, position, cost_limit, min_minutes, min_points, sel_range) -> pd.DataFrame:
+        """Rows matching every slider, sorted by value_ratio (descending)."""
+        bounds = {
+            "cost_million": (-np.inf, cost_limit),
+            "minutes": (min_minutes, np.inf),
+            "total_points": (min_points, np.inf),
+            "selected_by_percent": (sel_range[0], sel_range[1]),
+        }
+        bounds = {col: self._bounds(col, lo, hi) for col, (lo, hi) in bounds.items()}
+        candidates = [(self._range(col, lo, hi), col) for col, (lo, hi) in bounds.items()]
+        if position != "All":
+            candidates.append((self._position_ranks.get(position, np.empty(0, dtype=np.int64)), "position"))
+
+        # En küçük aday kümesinden başla, diğer koşulları sadece onun üzerinde kontrol et
+        ranks, smallest = min(candidates, key=lambda c: len(c[0]))
+        keep = np.ones(len(ranks), dtype=bool)
+        for col, (lo, hi) in bounds.items():
+            if col != smallest:
+                values = self._columns[col][ranks]
+                keep &= (values >= lo) & (values <= hi)
+        if position != "All" and smallest != "position":
+            keep &= self._position[ranks] == position
+        # Rank sırası = value_ratio sırası
+        return self.frame.iloc[np.sort(ranks[keep])]
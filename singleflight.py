@@ -0,0 +1,59 @@
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+
+
+class SingleFlightCache:
+    """
+    Thread-safe TTL cache that merges concurrent loads of the same key.
+    - ttl: seconds a loaded value is served from memory
+    - maxsize: least recently used keys are dropped above this
+    - should_cache: predicate on the loaded value (e.g. skip partial failures)
+    Aynı anahtar için eşzamanlı gelen çağrılar tek bir loader çağrısını bekler.
+    """
+
+    def __init__(self, ttl: float, maxsize: int = 256, should_cache=None):
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self.should_cache = should_cache
+        self._values = OrderedDict()
+        self._inflight = {}
+        self._lock = threading.Lock()
+        self.loads = 0
+
+    def get(self, key, loader):
+        with self._lock:
+            hit = self._values.get(key)
+            if hit is not None and time.monotonic() - hit[1] < self.ttl:
+                self._values.move_to_end(key)
+                return hit[0]
+            call = self._inflight.get(key)
+            leader = call is None
+            if leader:
+                call = self._inflight[key] = Future()
+
+        if not leader:
+            return call.result()
+
+        try:
+            value = loader()
+        except BaseException as e:
+            with self._lock:
+                del self._inflight[key]
+            call.set_exception(e)
+            raise
+        with self._lock:
+            self.loads += 1
+            del self._inflight[key]
+            if self.should_cache is None or self.should_cache(value):
+                self._values[key] = (value, time.monotonic())
+                self._values.move_to_end(key)
+                while len(self._values) > self.maxsize:
+                    self._values.popitem(last=False)
+        call.set_result(value)
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._values.clear()
@@ -0,0 +1,120 @@
+import json
+import os
+import shutil
+import time
+import uuid
+from pathlib import Path
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.feather as feather
+
+from paths import DATA_DIR
+
+# Weekly job'ın önceden hesapladığı dashboard çıktıları:
+#   snapshots/<version>/manifest.json, standings.html, tdr.arrow, ...
+#   snapshots/CURRENT  -> aktif version adı (atomik olarak değiştirilir)
+SNAPSHOT_ROOT = DATA_DIR / "snapshots"
+CURRENT_FILE = "CURRENT"
+MANIFEST_FILE = "manifest.json"
+KEEP_SNAPSHOTS = 3
+
+
+def _write_table(df: pd.DataFrame, path: Path) -> None:
+    # Arrow kolon isimleri string olmalı (ör. fixture pivot'taki GW numaraları)
+    df = df.rename(columns=str)
+    table = pa.Table.from_pandas(df.reset_index(drop=True), preserve_index=False)
+    feather.write_feather(table, path, compression="uncompressed")
+
+
+def build_snapshot(artifacts: dict, meta: dict | None = None, root=SNAPSHOT_ROOT, activate=True) -> str:
+    """
+    Write `artifacts` (name -> DataFrame or str) as a new snapshot version and
+    make it current (activate=False: only write it, see activate_snapshot).
+    DataFrames go to <name>.arrow, strings to <name>.html.
+    The directory is filled under a temporary name and renamed, then CURRENT
+    is swapped, so readers never see a half-written snapshot.
+    Version names are unique (timestamp with microseconds + random suffix),
+    so a build never replaces an existing version directory, least of all
+    the one CURRENT points to.
+    """
+    root = Path(root)
+    root.mkdir(parents=True, exist_ok=True)
+    now = time.time()
+    version = time.strftime("%Y%m%dT%H%M%S", time.localtime(now))
+    version += f".{int(now * 1e6) % 1_000_000:06d}-{uuid.uuid4().hex[:6]}"
+    if meta and meta.get("gw") is not None:
+        version += f"-gw{int(meta['gw']):02d}"
+
+    tmp = root / f".tmp-{version}"
+    tmp.mkdir()
+    try:
+        files = {}
+        for name, value in artifacts.items():
+            if isinstance(value, pd.DataFrame):
+                files[name] = f"{name}.arrow"
+                _write_table(value, tmp / files[name])
+            else:
+                files[name] = f"{name}.html"
+                (tmp / files[name]).write_text(str(value), encoding="utf-8")
+
+        manifest = {
+            "version": version,
+            "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            **(meta or {}),
+            "artifacts": files,
+        }
+        (tmp / MANIFEST_FILE).write_text(json.dumps(manifest, indent=2), encoding="utf-8")
+
+        # Benzersiz isim: mevcut bir version dizininin üzerine yazılmaz
+        os.rename(tmp, root / version)
+    except BaseException:
+        # Yarım kalan geçici dizin bırakılmaz
+        shutil.rmtree(tmp, ignore_errors=True)
+        raise
+
+    if activate:
+        activate_snapshot(version, root)
+    return version
+
+
+def activate_snapshot(version: str, root=SNAPSHOT_ROOT) -> None:
+    """Point CURRENT at `version` (atomic rename), then prune old versions."""
+    root = Path(root)
+    pointer = root / f"{CURRENT_FILE}.tmp"
+    pointer.write_text(version, encoding="utf-8")
+    os.replace(pointer, root / CURRENT_FILE)
+    prune_snapshots(root)
+
+
+def prune_snapshots(root=SNAPSHOT_ROOT, keep=KEEP_SNAPSHOTS) -> None:
+    """Remove all but the newest `keep` versions (never the current one)."""
+    root = Path(root)
+    current = current_version(root)
+    versions = sorted(p for p in root.iterdir() if p.is_dir() and not p.name.startswith("."))
+    for path in versions[:-keep] if keep else versions:
+        if path.name != current:
+            shutil.rmtree(path, ignore_errors=True)
+
+
+def current_version(root=SNAPSHOT_ROOT):
+    """Active snapshot version (None if no snapshot was built yet)."""
+    path = Path(root) / CURRENT_FILE
+    if not path.exists():
+        return None
+    return path.read_text(encoding="utf-8").strip() or None
+
+
+def read_manifest(version: str, root=SNAPSHOT_ROOT) -> dict:
+    return json.loads((Path(root) / version / MANIFEST_FILE).read_text(encoding="utf-8"))
+
+
+def read_artifact(version: str, name: str, root=SNAPSHOT_ROOT):
+    """DataFrame (memory-mapped Arrow) or str (HTML) artifact; None if not in the snapshot."""
+    files = read_manifest(version, root)["artifacts"]
+    if name not in files:
+        return None
+    path = Path(root) / version / files[name]
+    if path.suffix == ".arrow":
+        return feather.read_table(path, memory_map=True).to_pandas()
+    return path.read_text(encoding="utf-8")
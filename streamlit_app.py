@@ -1,3 +1,4 @@
+import os
 from pathlib import Path
 
 import pandas as pd
@@ -8,14 +9,28 @@ import streamlit.components.v1 as components
 from analytics import chip_suggestion
 from visuals import (
     consistency_index,
+    load_player_table,
     fixture_difficulty_analysis,
     graphics_selected_vs_points,
     graphics_value_vs_points,
+    in_form_players,
+    multi_season_consistency,
     player_advice,
     show_player_stats,
     show_table,
     team_dependency_ratio,
 )
+from dataset import DatasetHandle
+from fpl_client import get_client
+from schema import PLAYERS_SCHEMA, apply_schema
+from profiling import (
+    PROFILE_DUMP_ENV,
+    dump_json,
+    enabled as profiling_enabled,
+    fragment_rerun,
+    profiling_panel,
+    timed,
+)
 
 # -------------------------------------------------------------------
 # Page configuration
@@ -87,21 +102,40 @@ st.markdown(
 )
 
 
-@st.cache_data(ttl=3600)
-def load_fpl_data():
-    """Load core Fantasy Premier League bootstrap data."""
-    url = "https://fantasy.premierleague.com/api/bootstrap-static/"
-    response = requests.get(url, timeout=15)
-    response.raise_for_status()
-    data = response.json()
+@st.cache_resource
+def start_background_refresh():
+    """Bootstrap/fixtures arka planda yenilenir: process başına bir kez başlatılır."""
+    get_client().start_background_refresh()
+
 
+@st.cache_resource(max_entries=2)
+def _fpl_frames(version: str, _data: dict):
+    """
+    Frames of one bootstrap snapshot, built once per version.
+    cache_resource: her rerun'da pickle kopyası yerine tüm session'lar aynı
+    (salt okunur) nesneleri paylaşır.
+    """
     return (
-        pd.DataFrame(data["elements"]),
-        pd.DataFrame(data["teams"]),
-        data["events"],
+        # Kompakt tipler: int8/int16/float32, kategoriler, gerçek datetime
+        apply_schema(pd.DataFrame(_data["elements"]), PLAYERS_SCHEMA, compact_remaining=True),
+        pd.DataFrame(_data["teams"]),
+        _data["events"],
+        version,
     )
 
 
+@timed("load_fpl_data", kind="load")
+def load_fpl_data():
+    """
+    Load core Fantasy Premier League bootstrap data (+ its version id).
+    Serves the client's last good snapshot; refreshing happens in the
+    background, so only the very first load of the process waits for the API.
+    """
+    start_background_refresh()
+    snapshot = get_client().bootstrap_snapshot()
+    return _fpl_frames(snapshot.version, snapshot.value)
+
+
 # -------------------------------------------------------------------
 # Header
 # -------------------------------------------------------------------
@@ -129,71 +163,69 @@ st.markdown(
 # Data loading
 # -------------------------------------------------------------------
 try:
-    players, teams, events = load_fpl_data()
+    players_df, teams_df, events, data_version = load_fpl_data()
 except requests.RequestException as exc:
     st.error("FPL API data could not be loaded. Please try again later.")
     st.exception(exc)
     st.stop()
 
+# Panellere handle geçer: cache'li hesaplar DataFrame'i değil version'ı hash'ler.
+# players = takım adı, pozisyon, fiyat vb. eklenmiş ortak oyuncu tablosu.
+teams = DatasetHandle("teams", teams_df, data_version)
+players = load_player_table(DatasetHandle("players", players_df, data_version), teams)
+
 
 # -------------------------------------------------------------------
 # Dashboard layout
 # -------------------------------------------------------------------
-rows = [st.columns(3) for _ in range(3)]
-
-# Row 1
-with rows[0][0]:
-    with st.container():
-        st.markdown('<div class="card">', unsafe_allow_html=True)
-        graphics_value_vs_points()
-        st.markdown("</div>", unsafe_allow_html=True)
-
-with rows[0][1]:
-    with st.container():
-        st.markdown('<div class="card">', unsafe_allow_html=True)
-        graphics_selected_vs_points(players)
-        st.markdown("</div>", unsafe_allow_html=True)
-
-with rows[0][2]:
-    with st.container():
-        st.markdown('<div class="card">', unsafe_allow_html=True)
-        player_advice(players, teams)
-        st.markdown("</div>", unsafe_allow_html=True)
-
-# Row 2
-with rows[1][0]:
-    with st.container():
-        st.markdown('<div class="card">', unsafe_allow_html=True)
-        team_dependency_ratio(players, teams)
-        st.markdown("</div>", unsafe_allow_html=True)
-
-with rows[1][1]:
-    with st.container():
-        st.markdown('<div class="card">', unsafe_allow_html=True)
-        consistency_index(players)
-        st.markdown("</div>", unsafe_allow_html=True)
-
-with rows[1][2]:
+@st.fragment
+def render_card(panel, *args):
+    """
+    Her kart ayrı bir fragment: kartın içindeki bir widget değişince sadece
+    o kart yeniden çalışır, diğer kartlar ve veri yükleme tekrar edilmez.
+    """
     with st.container():
         st.markdown('<div class="card">', unsafe_allow_html=True)
-        show_table()
+        if fragment_rerun():
+            # Tek kartlık etkileşim süresi (profiling açıkken)
+            timed(f"rerun:{panel.__name__}", kind="rerun")(panel)(*args)
+        else:
+            panel(*args)
         st.markdown("</div>", unsafe_allow_html=True)
 
-# Row 3
-with rows[2][0]:
-    with st.container():
-        st.markdown('<div class="card">', unsafe_allow_html=True)
-        fixture_difficulty_analysis(teams, events)
-        st.markdown("</div>", unsafe_allow_html=True)
 
-with rows[2][1]:
-    with st.container():
-        st.markdown('<div class="card">', unsafe_allow_html=True)
-        chip_suggestion()
-        st.markdown("</div>", unsafe_allow_html=True)
+@timed("rerun:full", kind="rerun")
+def render_dashboard():
+    rows = [st.columns(3) for _ in range(4)]
+    cards = [
+        # Row 1
+        (graphics_value_vs_points,),
+        (graphics_selected_vs_points, players),
+        (player_advice, players, events),
+        # Row 2
+        (team_dependency_ratio, players),
+        (consistency_index, players),
+        (show_table,),
+        # Row 3
+        (fixture_difficulty_analysis, teams, events),
+        (chip_suggestion, players),
+        (show_player_stats, players),
+        # Row 4
+        (multi_season_consistency, players),
+        (in_form_players, players, events),
+    ]
+    for i, (panel, *args) in enumerate(cards):
+        with rows[i // 3][i % 3]:
+            render_card(panel, *args)
+
+
+render_dashboard()
 
-with rows[2][2]:
-    with st.container():
-        st.markdown('<div class="card">', unsafe_allow_html=True)
-        show_player_stats(players, teams)
-        st.markdown("</div>", unsafe_allow_html=True)
+# -------------------------------------------------------------------
+# Performance admin panel (FPL_PROFILE=1, or ?profile=1&profile_key=<FPL_PROFILE_KEY>)
+# -------------------------------------------------------------------
+if profiling_enabled():
+    with st.expander("🛠️ Performance (admin)", expanded=False):
+        profiling_panel()
+    if os.getenv(PROFILE_DUMP_ENV):
+        dump_json(os.getenv(PROFILE_DUMP_ENV))
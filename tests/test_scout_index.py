@@ -0,0 +1,62 @@
+import numpy as np
+import pandas as pd
+
+from scout_index import ScoutIndex
+
+
+def _table():
+    # selected_by_percent float32, schema.PLAYERS_SCHEMA ile aynı
+    return pd.DataFrame({
+        "id": [1, 2, 3, 4, 5],
+        "web_name": ["Low", "High", "Inside", "Over", "Cheap"],
+        "team_name": ["A", "B", "C", "D", "E"],
+        "position_name": ["Midfielder", "Midfielder", "Defence", "Forward", "Goalkeeper"],
+        "cost_million": [5.0, 10.3, 7.5, 12.0, 4.0],
+        "minutes": [200, 900, 450, 1000, 199],
+        "total_points": [20, 80, 45, 100, 19],
+        "selected_by_percent": np.array([5.0, 10.3, 7.7, 10.4, 4.9], dtype="float32"),
+    })
+
+
+def _mask(table, position, cost_limit, min_minutes, min_points, sel_range):
+    """The filter the panel used before ScoutIndex (inclusive on both ends)."""
+    mask = (
+        (table["cost_million"] <= cost_limit)
+        & (table["minutes"] >= min_minutes)
+        & (table["total_points"] >= min_points)
+        & (table["selected_by_percent"] >= sel_range[0])
+        & (table["selected_by_percent"] <= sel_range[1])
+    )
+    if position != "All":
+        mask &= table["position_name"] == position
+    return set(table.loc[mask, "id"])
+
+
+def test_players_on_every_bound_are_kept():
+    table = _table()
+    index = ScoutIndex(table)
+    args = ("All", 10.3, 200, 20, (5.0, 10.3))
+
+    result = set(index.query(*args)["id"])
+
+    # Low: minutes/points/sel alt sınırda, High: cost/sel üst sınırda
+    assert result == {1, 2, 3}
+    assert result == _mask(table, *args)
+
+
+def test_matches_mask_for_positions_and_ranges():
+    table = _table()
+    index = ScoutIndex(table)
+    for args in [
+        ("Midfielder", 10.3, 200, 20, (5.0, 10.3)),
+        ("Forward", 12.0, 0, 0, (10.4, 10.4)),
+        ("All", 4.0, 199, 19, (4.9, 4.9)),
+        ("All", 15.0, 0, 0, (0.0, 100.0)),
+        ("Defence", 7.4, 0, 0, (0.0, 100.0)),
+    ]:
+        assert set(index.query(*args)["id"]) == _mask(table, *args)
+
+
+def test_result_sorted_by_value_ratio():
+    result = ScoutIndex(_table()).query("All", 15.0, 0, 0, (0.0, 100.0))
+    assert list(result["value_ratio"]) == sorted(result["value_ratio"], reverse=True)
@@ -1,45 +1,207 @@
 import streamlit as st
 import os
-import requests
 import pandas as pd
-import matplotlib
-matplotlib.use("Agg")
-import matplotlib.pyplot as plt
 import altair as alt
-import ast
 from paths import DATA_DIR
-import time
-from functools import wraps
+from dataset import HASH_FUNCS, DatasetHandle, file_version
+from fixture_index import fixtures_version
+from form_store import FORM_COLUMNS, WINDOWS, FormStore
+from fpl_client import get_client
+from history_store import (
+    archive_mtime,
+    consistency_stats_path,
+    current_season,
+    list_partitions,
+    list_seasons,
+    partitions_mtime,
+    query_history,
+    read_consistency_stats,
+    read_history,
+    season_dir,
+    summarize_points,
+)
+from panel_tables import (
+    build_fixture_difficulty,
+    compute_consistency_from_stats,
+    fixture_pivot,
+    parse_pl_standings,
+    render_standings_html,
+    team_dependency_leaders,
+)
+from player_table import build_player_table
+from profiling import timed
+from scout_index import ScoutIndex
+from schema import WEEKLY_POINTS_SCHEMA, apply_schema
+from snapshot import current_version, read_artifact, read_manifest
+from xpoints import RATE_COLUMNS, XP_HORIZON, Projection, build_projection, horizon_start
+
+# Altair'in 5000 satır limiti kalksın (geniş aralıktaki scatter); global ayar,
+# import'ta bir kez yapılır, cache miss'e ya da session'a göre değişmez
+alt.data_transformers.enable("default", max_rows=None)
 
 @st.cache_data
 def _read_csv_cached(path: str, mtime: float) -> pd.DataFrame:
     return pd.read_csv(path)
 
+@timed("load_csv", kind="load")
 def load_csv(path) -> pd.DataFrame:
     # path: str veya Path olabilir
     path_str = str(path)
     return _read_csv_cached(path_str, os.path.getmtime(path_str))
 
-# def timed(name: str):
-#     def decorator(fn):
-#         @wraps(fn)
-#         def wrapper(*args, **kwargs):
-#             start = time.perf_counter()
-#             result = fn(*args, **kwargs)
-#             duration = time.perf_counter() - start
-#             st.caption(f"⏱️ {name}: {duration:.2f} s")
-#             return result
-#         return wrapper
-#     return decorator
-
-# @timed("graphics_selected_vs_points")
-def graphics_selected_vs_points(players):
-    ply = players.copy()
-    ply["selected_by_percent"] = pd.to_numeric(
-        ply["selected_by_percent"],
-        errors="coerce"
+@st.cache_data
+def _read_columnar_cached(path: str, mtime: float, columns: tuple) -> pd.DataFrame:
+    return apply_schema(read_history(path, columns=list(columns)), WEEKLY_POINTS_SCHEMA)
+
+def load_columnar(path, columns) -> pd.DataFrame:
+    """
+    load_csv'nin kolon formatlı karşılığı: round partition'larını memory-map
+    eder ve sadece istenen kolonları okur.
+    """
+    path_str = str(path)
+    return _read_columnar_cached(path_str, partitions_mtime(path_str), tuple(columns))
+
+@st.cache_data
+def _read_consistency_stats_cached(path: str, mtime: str) -> pd.DataFrame:
+    return read_consistency_stats(path)
+
+@timed("load_consistency_stats", kind="load")
+def load_consistency_stats() -> DatasetHandle:
+    """Per-player count/mean/M2 of the current season; version = sidecar dosyasının mtime'ı."""
+    season = current_season()
+    path = consistency_stats_path(season_dir(season)) if season else None
+    if path is None or not path.exists():
+        return DatasetHandle("consistency_stats", pd.DataFrame(), "0")
+    version = file_version(path)
+    return DatasetHandle("consistency_stats", _read_consistency_stats_cached(str(path), version), version)
+
+@timed("load_weekly_points", kind="load")
+def load_weekly_points(columns) -> pd.DataFrame:
+    """Current season only; arşivdeki diğer sezonlar okunmaz."""
+    season = current_season()
+    # Kolon formatı yoksa (eski kurulum) CSV'ye düş
+    if season and list_partitions(season_dir(season)):
+        return load_columnar(season_dir(season), columns)
+    return apply_schema(load_csv(DATA_DIR / "weekly_points.csv")[list(columns)], WEEKLY_POINTS_SCHEMA)
+
+def weekly_points_version() -> str:
+    """Version id of what load_weekly_points reads (partition veya CSV mtime'ı)."""
+    season = current_season()
+    if season and list_partitions(season_dir(season)):
+        return f"{season}@{partitions_mtime(season_dir(season))}"
+    return file_version(DATA_DIR / "weekly_points.csv")
+
+@st.cache_resource(max_entries=2)
+def _form_store_cached(version: str) -> FormStore:
+    return FormStore(load_weekly_points(["player_id", "round", *FORM_COLUMNS]))
+
+@timed("load_form_store", kind="load")
+def load_form_store() -> FormStore:
+    """Rolling-form feature store, built once per weekly_points version and shared by all sessions."""
+    return _form_store_cached(weekly_points_version())
+
+@st.cache_resource(max_entries=4, hash_funcs=HASH_FUNCS)
+def _projection_cached(players: DatasetHandle, fixtures_key: int, _fixtures, points_version: str,
+                       gw: int, horizon: int) -> Projection:
+    # _fixtures hash'lenmez: anahtar, aynı listeden hesaplanan fixtures_key
+    projection = build_projection(players.frame, _fixtures, load_weekly_points(RATE_COLUMNS), gw, horizon)
+    projection.version = f"{players.version}:{fixtures_key}:{points_version}:gw{gw}+{horizon}"
+    return projection
+
+@timed("load_projection", kind="load")
+def load_projection(players: DatasetHandle, events, horizon=XP_HORIZON, gw=None) -> Projection:
+    """
+    players × next `horizon` GW expected points (xpoints.Projection), from the
+    first GW whose deadline has not passed (xpoints.horizon_start) unless `gw` is given.
+    (bootstrap, fixtures, weekly_points) versiyonu başına bir kez hesaplanır;
+    chip önerileri, Scout Assistant ve form paneli aynı nesneyi paylaşır.
+    """
+    gw = horizon_start(events) if gw is None else int(gw)
+    # Anahtar ve projeksiyon aynı fixtures snapshot'ından (arka plan yenilemesi araya girse de)
+    fixtures = load_fixtures()
+    return _projection_cached(players, fixtures_version(fixtures), fixtures, weekly_points_version(), gw, horizon)
+
+@st.cache_data
+def _query_history_cached(seasons: tuple, columns: tuple, mtime: float) -> pd.DataFrame:
+    return apply_schema(query_history(list(seasons), columns=list(columns)), WEEKLY_POINTS_SCHEMA)
+
+@timed("load_history_archive", kind="load")
+def load_history_archive(seasons, columns) -> pd.DataFrame:
+    """Cross-season rows for `seasons`, only `columns`; cache key = seçili sezonların mtime'ı."""
+    seasons = tuple(seasons)
+    return _query_history_cached(seasons, tuple(columns), archive_mtime(seasons))
+
+@st.cache_data
+def _read_snapshot_manifest_cached(version: str) -> dict:
+    return read_manifest(version)
+
+@st.cache_data
+def _read_snapshot_artifact_cached(version: str, name: str):
+    return read_artifact(version, name)
+
+def load_snapshot_artifact(name, gw=None):
+    """
+    Weekly job'ın önceden hesapladığı artifact (DataFrame veya HTML), version başına bir kez okunur.
+    - gw: for GW dependent artifacts; None is returned if the snapshot was built for another GW
+    Returns None when no snapshot has it, so the panel computes it live.
+    """
+    version = current_version()
+    if version is None:
+        return None
+    try:
+        if gw is not None and _read_snapshot_manifest_cached(version).get("gw") != gw:
+            return None
+        return _read_snapshot_artifact_cached(version, name)
+    except FileNotFoundError:
+        # Snapshot bu arada temizlenmiş olabilir
+        return None
+
+@st.cache_resource(max_entries=4, hash_funcs=HASH_FUNCS)
+def _player_table_cached(players: DatasetHandle, teams: DatasetHandle) -> pd.DataFrame:
+    return build_player_table(players.frame, teams.frame)
+
+def load_player_table(players: DatasetHandle, teams: DatasetHandle) -> DatasetHandle:
+    """
+    Enriched player table (player_table.build_player_table), bootstrap version
+    başına bir kez kurulur ve tüm session'lar aynı nesneyi okur (kopya yok).
+    """
+    return DatasetHandle("player_table", _player_table_cached(players, teams), players.version)
+
+@st.cache_data(max_entries=64, hash_funcs=HASH_FUNCS)
+def selection_scatter_spec(players: DatasetHandle, min_sel: float, max_sel: float):
+    """
+    Vega-Lite spec of the selection rate scatter, cached per (data version, min_sel, max_sel).
+    İsimler ayrı bir text katmanı olarak çizilir; satır başına Python döngüsü yok.
+    Returns None if no player matches.
+    """
+    df = players.frame
+    sel = df["selected_by_percent"]
+    mask = (sel >= min_sel) & (sel <= max_sel) & (df["total_points"] > 0)
+    filtered = pd.DataFrame({
+        "web_name": df.loc[mask, "web_name"].astype(str),
+        "selected_by_percent": sel[mask].astype(float),
+        "total_points": df.loc[mask, "total_points"].astype(int),
+    })
+    if filtered.empty:
+        return None
+
+    base = alt.Chart(filtered).encode(
+        x=alt.X("selected_by_percent:Q", title="Selection Rate (%)"),
+        y=alt.Y("total_points:Q", title="Total Points"),
     )
+    points = base.mark_circle(size=40).encode(
+        tooltip=[
+            alt.Tooltip("web_name:N", title="Player"),
+            alt.Tooltip("selected_by_percent:Q", title="Selected (%)", format=".1f"),
+            alt.Tooltip("total_points:Q", title="Points"),
+        ]
+    )
+    labels = base.mark_text(align="left", dx=4, dy=-4, fontSize=8).encode(text="web_name:N")
+    chart = (points + labels).properties(height=450, title="Selection Rate vs Total Points")
+    return chart.to_dict()
 
+@timed("graphics_selected_vs_points")
+def graphics_selected_vs_points(players):
     st.title("👥 Selection Rate vs Total Points")
     st.markdown("Displaying players based on their selection rates. You can examine less-preferred players with good ratings or more-preferred players with ineffective scores.")
     st.markdown("Y-Axis: Total Points | X-Axis: Selection Rate (%)")
@@ -47,45 +209,21 @@ def graphics_selected_vs_points(players):
     min_sel = st.slider("Min selection rate (%)", 0.0, 100.0, 3.0)
     max_sel = st.slider("Max selection rate (%)", 0.0, 100.0, 10.0)
 
-    filtered = ply[
-        (ply["selected_by_percent"] >= min_sel) &
-        (ply["selected_by_percent"] <= max_sel) &
-        (ply["total_points"] > 0)
-    ].copy()
-
-    if filtered.empty:
+    spec = selection_scatter_spec(players, min_sel, max_sel)
+    if spec is None:
         st.warning("No players found for the selected filters.")
         return
 
-    fig, ax = plt.subplots(figsize=(10, 6))
-
-    ax.scatter(
-        filtered["selected_by_percent"],
-        filtered["total_points"]
-    )
+    st.vega_lite_chart(spec, use_container_width=True)
 
-    for _, row in filtered.iterrows():
-        ax.text(
-            row["selected_by_percent"],
-            row["total_points"],
-            row["web_name"],
-            fontsize=8
-        )
-
-    ax.set_xlabel("Selection Rate (%)")
-    ax.set_ylabel("Total Points")
-    ax.set_title("Selection Rate vs Total Points")
-    ax.grid(True, alpha=0.3)
-
-    st.pyplot(fig, clear_figure=True)
-    plt.close(fig)
-
-# @timed("graphics_value_vs_points")
+@timed("graphics_value_vs_points")
 def graphics_value_vs_points():
     
     #df = pd.read_csv("./player_stats.csv")
     # df  = pd.read_csv(DATA_DIR / "player_stats.csv")
-    df = load_csv(DATA_DIR / "player_stats.csv")
+    df = load_snapshot_artifact("value_table")
+    if df is None:
+        df = load_csv(DATA_DIR / "player_stats.csv")
 
     st.title("📈 FPL Efficiency Analysis")
     st.markdown("Examining players with the highest ratings relative to their value. Of course, everyone knows about Salah or Haaland")
@@ -140,8 +278,13 @@ def graphics_value_vs_points():
 
     st.dataframe(table_df, height=900)
 
-# @timed("player_advice")
-def player_advice(players, teams):
+@st.cache_resource(max_entries=4, hash_funcs=HASH_FUNCS)
+def scout_index(players: DatasetHandle) -> ScoutIndex:
+    """ScoutIndex built once per bootstrap version, shared by every session (read-only)."""
+    return ScoutIndex(players.frame)
+
+@timed("player_advice")
+def player_advice(players, events):
     st.title("🧭 Scout Assistant - Advised Players")
     st.markdown("Here you can perform a detailed search for each position, including the player's playing time, value and selection rate in your search.")
     
@@ -151,45 +294,11 @@ def player_advice(players, teams):
     min_points = st.slider("Minimum points", 0, 250, 20)
     sel_range = st.slider("Selection Rate (%)", 0.0, 100.0, (5.0, 25.0))
 
-    position_map = {
-        1: "Goalkeeper",
-        2: "Defence",
-        3: "Midfielder",
-        4: "Forward"
-    }
-
-    ply = players.copy()
-
-    ply["cost_million"] = ply["now_cost"] / 10
-    ply["position_name"] = ply["element_type"].map(position_map)
-    ply["selected_by_percent"] = pd.to_numeric(ply["selected_by_percent"], errors="coerce")
-
-    # Takım adını ekle
-    team_lookup = teams[["id", "name"]].rename(columns={
-        "id": "team",
-        "name": "team_name"
-    })
-
-    ply = ply.merge(team_lookup, on="team", how="left")
-
-    filtered_players = ply[
-        (ply["cost_million"] <= cost_limit) &
-        (ply["minutes"] >= min_minutes) &
-        (ply["total_points"] >= min_points) &
-        (ply["selected_by_percent"] >= sel_range[0]) &
-        (ply["selected_by_percent"] <= sel_range[1])
-    ].copy()
-
-    if position != "All":
-        filtered_players = filtered_players[
-            filtered_players["position_name"] == position
-        ]
-
-    filtered_players["value_ratio"] = (
-        filtered_players["total_points"] / filtered_players["cost_million"]
-    ).round(2)
-
-    filtered_players = filtered_players.sort_values("value_ratio", ascending=False)
+    filtered_players = scout_index(players).query(
+        position, cost_limit, min_minutes, min_points, sel_range
+    )
+    projection = load_projection(players, events)
+    filtered_players = filtered_players.assign(xp=projection.total(filtered_players["id"]).round(2))
 
     table_df = (
         filtered_players[[
@@ -199,7 +308,8 @@ def player_advice(players, teams):
             "cost_million",
             "total_points",
             "selected_by_percent",
-            "value_ratio"
+            "value_ratio",
+            "xp"
         ]]
         .rename(columns={
             "web_name": "Player",
@@ -208,7 +318,8 @@ def player_advice(players, teams):
             "cost_million": "Value",
             "total_points": "Total Points",
             "selected_by_percent": "Selected By (%)",
-            "value_ratio": "Points / Value"
+            "value_ratio": "Points / Value",
+            "xp": f"xP (next {projection.horizon})"
         })
         .reset_index(drop=True)
     )
@@ -217,67 +328,22 @@ def player_advice(players, teams):
 
     st.dataframe(table_df, height=600)
 
-@st.cache_data(ttl=3600)
-def compute_team_dependency_ratio(players: pd.DataFrame, teams: pd.DataFrame) -> pd.DataFrame:
-    """
-    Returns one row per team: the player with the highest Team Dependency Ratio (TDR).
-    Cached because it involves groupby + merge.
-    """
-    # Work on a copy to avoid mutating the shared DataFrame across reruns
-    p = players[[
-        "id", "first_name", "second_name", "web_name",
-        "team", "goals_scored", "assists"
-    ]].copy()
-
-    # Contribution = goals + assists
-    p["contribution"] = p["goals_scored"].fillna(0) + p["assists"].fillna(0)
-
-    # Team total goals (based on goals_scored; simple and consistent with your current logic)
-    team_goals = (
-        p.groupby("team", as_index=False)["goals_scored"]
-         .sum()
-         .rename(columns={"team": "team_id", "goals_scored": "team_total_goals"})
-    )
-
-    t = teams[["id", "name", "short_name"]].copy()
-
-    merged = (
-        p.merge(t, left_on="team", right_on="id", how="left", suffixes=("", "_team"))
-         .merge(team_goals, left_on="team", right_on="team_id", how="left")
-    )
-
-    # Avoid division by zero
-    merged["team_total_goals"] = merged["team_total_goals"].fillna(0)
-
-    merged["TDR"] = (merged["contribution"] / merged["team_total_goals"].replace(0, pd.NA)).astype("Float64")
-
-    # Keep only teams where we can compute a meaningful ratio
-    merged = merged.dropna(subset=["TDR"])
-
-    # Pick the top TDR player per team
-    team_leaders = (
-        merged.sort_values("TDR", ascending=False)
-              .drop_duplicates(subset=["team"])
-              .reset_index(drop=True)
-    )
-
-    # Keep only columns we need downstream
-    out = team_leaders[[
-        "first_name", "second_name", "web_name",
-        "name", "short_name",
-        "goals_scored", "assists", "contribution",
-        "team_total_goals", "TDR"
-    ]].copy()
+@st.cache_data(ttl=3600, hash_funcs=HASH_FUNCS)
+def compute_team_dependency_ratio(players: DatasetHandle) -> pd.DataFrame:
+    """Cached team_dependency_leaders (groupby + merge), keyed by the bootstrap version."""
+    return team_dependency_leaders(players.frame)
 
-    return out
 
-# @timed("team_dependency_ratio")
-def team_dependency_ratio(players: pd.DataFrame, teams: pd.DataFrame) -> None:
+@timed("team_dependency_ratio")
+def team_dependency_ratio(players: DatasetHandle) -> None:
     st.title("🏟️ Team Dependency Ratio (TDR) Analysis")
     st.markdown("The player who contributed the most points to each team is listed in this panel.")
     st.markdown("Sometimes a player takes the scoring load off their team. If you think that team will win the week, you should definitely check it out!")
 
-    team_leaders = compute_team_dependency_ratio(players, teams)
+    # Weekly snapshot varsa hazır tablo, yoksa canlı hesap
+    team_leaders = load_snapshot_artifact("tdr")
+    if team_leaders is None:
+        team_leaders = compute_team_dependency_ratio(players)
 
     # Chart
     chart = (
@@ -341,36 +407,29 @@ def team_dependency_ratio(players: pd.DataFrame, teams: pd.DataFrame) -> None:
     height=500
 ) 
 
-# @timed("consistency_index")    
+
+@st.cache_data(max_entries=8, hash_funcs=HASH_FUNCS)
+def compute_consistency_table(stats: DatasetHandle, players: DatasetHandle) -> pd.DataFrame:
+    """Cached compute_consistency_from_stats, keyed by (stats version, bootstrap version)."""
+    return compute_consistency_from_stats(stats.frame, players.frame)
+
+@timed("consistency_index")
 def consistency_index(players):
     #history_df = pd.read_csv("./weekly_exec/weekly_points.csv")
     # history_df = pd.read_csv(DATA_DIR / "weekly_points.csv")
-    history_df = load_csv(DATA_DIR / "weekly_points.csv")
-
-    consistency = (
-        history_df.groupby("player_id")["total_points"]
-        .agg(["mean", "std"])
-        .reset_index()
-    )
-
-    # 4. Stability score
-    consistency["consistency_index"] = consistency["mean"] / consistency["std"].replace(0, 1)
+    # Önce weekly snapshot, sonra weekly job'ın tuttuğu oyuncu başı özet (count/mean/M2)
+    consistency = load_snapshot_artifact("consistency")
+    if consistency is None:
+        stats = load_consistency_stats()
+        if stats.frame.empty:
+            history_df = load_weekly_points(["player_id", "total_points"])
+            consistency = compute_consistency_from_stats(summarize_points(history_df), players.frame)
+        else:
+            consistency = compute_consistency_table(stats, players)
 
     st.title("🔄 Consistency Index Analysis")
     st.markdown("Examining a player's weekly points distribution to show how stable or surprising their profile is.")
     st.markdown("Does a player consistently score the same, or does he fly for a week and then go quiet for a long time? Here we go!")
-    
-
-    consistency = consistency.merge(
-    players[["id", "first_name", "second_name", "team", "web_name", "total_points"]],
-    left_on="player_id", right_on="id", how="left"
-    )
-    
-    max_point = history_df["total_points"].max()
-
-    consistency = consistency[consistency["total_points"] > max_point/3]
-
-    consistency = consistency.dropna(subset=["consistency_index"])
 
     # -----------------------------
     # 6. Scatterplot
@@ -440,6 +499,167 @@ def consistency_index(players):
 
     st.dataframe(table_df, height=500)
 
+def compute_multi_season_consistency(history_df: pd.DataFrame, players: pd.DataFrame) -> pd.DataFrame:
+    """
+    Per-player consistency across seasons, keyed by `player_code` (element id
+    sezondan sezona değişir). One row per current player with all-seasons
+    games/mean/std/consistency_index and the mean points of each season.
+    """
+    df = history_df.dropna(subset=["player_code"])
+    df = df[df["minutes"] > 0]
+    if df.empty:
+        return pd.DataFrame()
+    points = df["total_points"].astype("float64")
+    codes = df["player_code"].astype("int64")
+
+    overall = points.groupby(codes).agg(["count", "mean", "std"])
+    overall.columns = ["games", "mean", "std"]
+    overall["consistency_index"] = overall["mean"] / overall["std"].replace(0, 1)
+
+    per_season = points.groupby([codes, df["season"].astype(str)]).mean().unstack("season")
+    per_season.columns = [f"avg {s}" for s in per_season.columns]
+
+    out = overall.join(per_season).rename_axis("code").reset_index()
+    out = out.merge(players[["code", "web_name", "team"]], on="code", how="inner")
+    return out.dropna(subset=["consistency_index"])
+
+@st.cache_data(max_entries=16, hash_funcs=HASH_FUNCS)
+def multi_season_table(seasons: tuple, mtime: float, players: DatasetHandle) -> pd.DataFrame:
+    """compute_multi_season_consistency, cached per (seasons, archive mtime, bootstrap version)."""
+    history_df = load_history_archive(seasons, ["player_code", "total_points", "minutes"])
+    return compute_multi_season_consistency(history_df, players.frame)
+
+@timed("multi_season_consistency")
+def multi_season_consistency(players):
+    st.title("📚 Multi-Season Consistency & Form")
+    st.markdown("Consistency and average points of current players across the seasons kept in the history archive.")
+
+    seasons = list_seasons()
+    if not seasons:
+        st.info("No history archive yet. Run the weekly job to build it.")
+        return
+
+    selected = st.multiselect("Seasons", seasons, default=seasons)
+    if not selected:
+        st.info("Select at least one season.")
+        return
+    min_games = st.slider("Min games played (all selected seasons)", 1, 38 * len(selected), min(10, 38 * len(selected)))
+
+    table = multi_season_table(tuple(selected), archive_mtime(selected), players)
+    if table.empty:
+        st.info("No player_code column in the archive yet. Re-run the weekly job.")
+        return
+    table = table[table["games"] >= min_games]
+
+    season_cols = [c for c in table.columns if c.startswith("avg ")]
+    table_df = (
+        table[["web_name", "games", "mean", "std", "consistency_index"] + season_cols]
+        .sort_values("consistency_index", ascending=False)
+        .head(50)
+        .reset_index(drop=True)
+        .rename(columns={"web_name": "player", "consistency_index": "consistency index"})
+    )
+    table_df.index = table_df.index + 1
+
+    # Sezon bazlı form: en tutarlı 10 oyuncunun sezon ortalamaları
+    if len(season_cols) > 1:
+        form = table_df.head(10).melt(
+            id_vars="player", value_vars=season_cols, var_name="season", value_name="avg points"
+        )
+        form["season"] = form["season"].str.replace("avg ", "", regex=False)
+        chart = (
+            alt.Chart(form)
+            .mark_line(point=True)
+            .encode(
+                x=alt.X("season:N", title="Season"),
+                y=alt.Y("avg points:Q", title="Average Points"),
+                color="player:N",
+                tooltip=["player:N", "season:N", alt.Tooltip("avg points:Q", format=".2f")],
+            )
+            .properties(height=300)
+        )
+        st.altair_chart(chart, use_container_width=True)
+
+    st.dataframe(
+        table_df.style.format({c: "{:.2f}" for c in ["mean", "std", "consistency index"] + season_cols}, na_rep="-"),
+        height=500,
+    )
+
+@timed("in_form_players")
+def in_form_players(players, events):
+    st.title("🔥 In-Form Players")
+    st.markdown("Who is hot right now? Players ranked by their average per gameweek over the last few gameweeks, from the weekly history.")
+
+    METRIC_ALIASES = {
+        "Points": "total_points",
+        "Expected Goals (xG)": "expected_goals",
+        "Expected Assists (xA)": "expected_assists",
+        "ICT Index": "ict_index",
+        "BPS": "bps",
+        "Defensive Contribution": "defensive_contribution",
+        "Minutes": "minutes",
+    }
+
+    store = load_form_store()
+    if not store.last_round:
+        st.info("No weekly history yet. Run the weekly job to build it.")
+        return
+
+    window = st.radio("Last N gameweeks", list(WINDOWS), index=1, horizontal=True)
+    metric_label = st.selectbox("Rank by (average per GW)", list(METRIC_ALIASES.keys()))
+    position = st.selectbox("Position", ["All", "Goalkeeper", "Defence", "Midfielder", "Forward"], key="in_form_position")
+    metric = METRIC_ALIASES[metric_label]
+
+    # Pencereler store'da hazır: burada sadece dilimleme + oyuncu tablosuyla eşleme
+    form = store.features(window)
+    min_games = max(1, window // 2)
+    # Sadece sahaya çıktığı GW'ler sayılır (0 dakikalık fikstürler değil)
+    form = form[form["appearances"] >= min_games]
+    table = players.frame[["id", "web_name", "team_short_name", "position_name", "cost_million"]]
+    form = form.merge(table, left_on="player_id", right_on="id", how="inner")
+    if position != "All":
+        form = form[form["position_name"] == position]
+    top = form.nlargest(20, f"{metric}_mean")
+    if top.empty:
+        st.warning("No players found for the selected filters.")
+        return
+    projection = load_projection(players, events)
+
+    chart = (
+        alt.Chart(top.head(10))
+        .mark_bar()
+        .encode(
+            x=alt.X(f"{metric}_mean:Q", title=f"{metric_label} per GW (last {window})"),
+            y=alt.Y("web_name:N", sort="-x", title=None),
+            color=alt.Color("position_name:N", title="Position"),
+            tooltip=[
+                alt.Tooltip("web_name:N", title="Player"),
+                alt.Tooltip("team_short_name:N", title="Team"),
+                alt.Tooltip(f"{metric}_mean:Q", title="Per GW", format=".2f"),
+                alt.Tooltip("appearances:Q", title="GWs played"),
+            ],
+        )
+        .properties(height=300)
+    )
+    st.altair_chart(chart, use_container_width=True)
+
+    table_df = pd.DataFrame({
+        "Player": top["web_name"].to_numpy(),
+        "Team": top["team_short_name"].to_numpy(),
+        "Position": top["position_name"].to_numpy(),
+        "Value": top["cost_million"].to_numpy(),
+        "GWs played": top["appearances"].to_numpy(),
+        f"{metric_label} / GW": top[f"{metric}_mean"].to_numpy(),
+        "Points / GW": top["total_points_mean"].to_numpy(),
+        f"xG (last {window})": top["expected_goals_sum"].to_numpy(),
+        f"xA (last {window})": top["expected_assists_sum"].to_numpy(),
+        f"xP (next {projection.horizon})": projection.total(top["player_id"]),
+    })
+    table_df.index = table_df.index + 1
+    st.caption(f"Through GW {store.last_round}; played (minutes > 0) in at least {min_games} of the last {window} gameweeks. "
+               "Per-GW averages include gameweeks with a fixture but no minutes.")
+    st.dataframe(table_df.style.format(precision=2), height=500)
+
 # def read_pl_table():
 #     # df  = pd.read_csv(DATA_DIR / "league_table.csv")
 #     df = load_csv(DATA_DIR / "league_table.csv")
@@ -458,103 +678,30 @@ def consistency_index(players):
 
 @st.cache_data
 def compute_pl_standings(path: str, mtime: float) -> pd.DataFrame:
-    df = pd.read_csv(path)
+    return parse_pl_standings(pd.read_csv(path))
 
-    # team kolonu string json/dict formatındaysa parse et
-    df["team"] = df["team"].apply(lambda x: ast.literal_eval(x) if isinstance(x, str) else x)
-
-    # dict içinden alanları çıkar
-    df["team_name"] = df["team"].apply(lambda t: t.get("name") if isinstance(t, dict) else t)
-    df["short_name"] = df["team"].apply(lambda t: t.get("shortName") if isinstance(t, dict) else t)
-
-    standings = (
-        df[[
-            "position", "team_name", "playedGames", "won", "draw", "lost",
-            "goalsFor", "goalsAgainst", "goalDifference", "points"
-        ]]
-        .sort_values("position")
-        .reset_index(drop=True)
-    )
-    return standings
 
 def read_pl_table() -> pd.DataFrame:
     path = str(DATA_DIR / "league_table.csv")
     return compute_pl_standings(path, os.path.getmtime(path))
 
- 
-import textwrap
-def render_standings_html(df: pd.DataFrame) -> str:
-    html = textwrap.dedent("""\
-    <style>
-    @import url('https://fonts.googleapis.com/css2?family=Roboto:wght@400;500;700&display=swap');
-
-    table.pl-table {
-        width: 100%;
-        border-collapse: collapse;
-        font-size: 14px;
-        font-family: 'Roboto', sans-serif;
-    }
-    table.pl-table th {
-        background-color: #222;
-        color: #fff;
-        padding: 6px;
-        text-align: center;
-        font-weight: 500;
-    }
-    table.pl-table td {
-        border-bottom: 1px solid #ddd;
-        padding: 6px;
-        text-align: center;
-    }
-    /* Points: yeşil */
-    table.pl-table td.points { font-weight: 700; color: #1a7f37; }
-    /* Goal Difference: pozitif yeşil, negatif kırmızı */
-    table.pl-table td.gd-pos { color: #1a7f37; }
-    table.pl-table td.gd-neg { color: #d73a49; }
-    </style>
-    <table class="pl-table">
-      <thead>
-        <tr>
-          <th>Pos</th><th>Team</th><th>Pld</th><th>W</th><th>D</th><th>L</th>
-          <th>GF</th><th>GA</th><th>GD</th><th>Pts</th>
-        </tr>
-      </thead>
-      <tbody>
-    """)
-    for _, row in df.iterrows():
-        gd_class = "gd-pos" if row["goalDifference"] >= 0 else "gd-neg"
-        html += f"""
-        <tr>
-          <td>{row['position']}</td>
-          <td style="text-align:left">{row['team_name']}</td>
-          <td>{row['playedGames']}</td>
-          <td>{row['won']}</td>
-          <td>{row['draw']}</td>
-          <td>{row['lost']}</td>
-          <td>{row['goalsFor']}</td>
-          <td>{row['goalsAgainst']}</td>
-          <td class="{gd_class}">{row['goalDifference']}</td>
-          <td class="points">{row['points']}</td>
-        </tr>
-        """
-    html += "</tbody></table>"
-    return html
 
 import streamlit.components.v1 as components
 
-# @timed("show_table") 
+@timed("show_table")
 def show_table():
     st.title("🏆 Premier League Table")
-    standings = read_pl_table()
-    html = render_standings_html(standings)  
+    html = load_snapshot_artifact("standings_html")
+    if html is None:
+        standings = read_pl_table()
+        html = render_standings_html(standings)
     components.html(html, height=950, scrolling=True)
 
-@st.cache_data
+@timed("load_fixtures", kind="load")
 def load_fixtures():
-    url = "https://fantasy.premierleague.com/api/fixtures/"
     #r = requests.get(url)
-    r = requests.get(url, timeout=15); r.raise_for_status()
-    return r.json()
+    # Client'ın son iyi snapshot'ı (arka planda yenilenir); cache_data kopyası yok
+    return get_client().fixtures()
 
 # @st.cache_data
 # def load_teams():
@@ -564,53 +711,22 @@ def load_fixtures():
 #     return teams[["id", "name", "short_name", "code"]], r["events"]
 
 
-def build_fixture_difficulty(fixtures, teams, events, gameweeks=5):
-    # Just take the next X weeks
-    current_gw = next(e["id"] for e in events if e["is_current"]) + 1
-
-    upcoming = [f for f in fixtures if f["event"] and current_gw <= f["event"] < current_gw+gameweeks]
-
-    # Home and Away are processed separately
-    data = []
-    for f in upcoming:
-        # Home
-        data.append({
-            "team": f["team_h"],
-            "opponent": f["team_a"],
-            "gw": f["event"],
-            "difficulty": f["team_h_difficulty"],
-            "venue": "H"
-        })
-        # Away
-        data.append({
-            "team": f["team_a"],
-            "opponent": f["team_h"],
-            "gw": f["event"],
-            "difficulty": f["team_a_difficulty"],
-            "venue": "A"
-        })
-
-    df = pd.DataFrame(data)
-    if df.empty:
-        return pd.DataFrame(), pd.DataFrame()
-    df = df.merge(teams, left_on="team", right_on="id").drop("id", axis=1)
-    df = df.merge(teams, left_on="opponent", right_on="id", suffixes=("", "_opp")).drop("id", axis=1)
-
-    # Average difficulty per team
-    avg_df = df.groupby("name").agg({"difficulty":"mean"}).reset_index().sort_values("difficulty")
-    avg_df.rename(columns={"difficulty":"Avg Difficulty (next %d GWs)" % gameweeks}, inplace=True)
-
-    return avg_df, df
-
-# @timed("fixture_difficulty_analysis") 
+@timed("fixture_difficulty_analysis")
 def fixture_difficulty_analysis(teams, events):
     st.title("📊 Fixture Difficulty Analysis")
 
-    fixtures = load_fixtures()
     #teams, events = load_teams()
-
-    avg_df, fixture_df = build_fixture_difficulty(fixtures, teams, events, gameweeks=5)
-    if avg_df.empty or fixture_df.empty:
+    # Snapshot aynı GW için üretildiyse hazır tablolar, değilse canlı hesap
+    current_gw = next(e["id"] for e in events if e["is_current"])
+    avg_df = load_snapshot_artifact("fixture_avg", gw=current_gw)
+    pivot = load_snapshot_artifact("fixture_pivot", gw=current_gw)
+    if avg_df is not None and pivot is not None:
+        pivot = pivot.set_index("name")
+    else:
+        fixtures = load_fixtures()
+        avg_df, fixture_df = build_fixture_difficulty(fixtures, teams.frame, events, gameweeks=5)
+        pivot = fixture_pivot(fixture_df) if not fixture_df.empty else pd.DataFrame()
+    if avg_df.empty or pivot.empty:
         st.warning("Fixture difficulty datası şu anda üretilemedi. Muhtemelen önümüzdeki gameweek fixture datası henüz API'de yok.")
         return
 
@@ -625,12 +741,23 @@ def fixture_difficulty_analysis(teams, events):
 
     # Detailed table (competitor name + difficulty)
     st.write("### Fixture Difficulty Detailed")
-    fixture_df["opp_info"] = fixture_df["short_name_opp"] + " (" + fixture_df["difficulty"].astype(str) + ")"
-    pivot = fixture_df.pivot_table(index="name", columns="gw", values="opp_info", aggfunc="first")
     st.dataframe(pivot, use_container_width=True)
 
-# @timed("show_player_stats") 
-def show_player_stats(players, teams):
+@st.cache_data(max_entries=32, hash_funcs=HASH_FUNCS)
+def player_ranking(players: DatasetHandle, metric: str, ascending: bool) -> pd.DataFrame:
+    """Top 50 players by `metric` (Player, Team, metric), cached per bootstrap version."""
+    table = players.frame
+    # Price: now_cost 10x gelir, tabloda hazır cost_million kullanılır
+    column = "cost_million" if metric == "now_cost" else metric
+    top = table.sort_values(column, ascending=ascending).head(50)
+    return pd.DataFrame({
+        "Player": top["display_name"].to_numpy(),
+        "Team": top["team_name"].to_numpy(),
+        metric: top[column].to_numpy(),
+    })
+
+@timed("show_player_stats")
+def show_player_stats(players):
     st.title("📊 Player Statistics – Dynamic Ranking")
 
     # Kullanıcıya görünen isim -> DataFrame kolon adı
@@ -656,25 +783,7 @@ def show_player_stats(players, teams):
     order_choice = st.radio("Sort direction:", ["Descending", "Ascending"], index=0)
     ascending = (order_choice == "Ascending")
 
-    merged_players = players.merge(
-        teams[["id", "name"]],
-        left_on="team",
-        right_on="id",
-        how="left"
-    )
-
-    # İsteğe bağlı: price'ı düzgün göstermek (now_cost çoğu zaman 10x)
-    if metric_choice == "now_cost":
-        merged_players["now_cost"] = merged_players["now_cost"] / 10
-
-    sorted_df = merged_players.sort_values(metric_choice, ascending=ascending)
-
-    # Player adını birleştir
-    sorted_df["Player"] = (sorted_df["first_name"].fillna("") + " " + sorted_df["second_name"].fillna("")).str.strip()
-
-    # Ekranda kolon başlığı alias görünsün
-    out = sorted_df[["Player", "name", metric_choice]].head(50).rename(columns={
-        "name": "Team",
+    out = player_ranking(players, metric_choice, ascending).rename(columns={
         metric_choice: metric_label
     })
 
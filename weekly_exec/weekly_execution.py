@@ -1,54 +1,546 @@
+import argparse
+import json
+import os
 import requests
+import shutil
 import pandas as pd
 import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from contextlib import contextmanager
+from pathlib import Path
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
 from paths import DATA_DIR
-
-# Get data from FPL API
-url = "https://fantasy.premierleague.com/api/bootstrap-static/"
-response = requests.get(url)
-data = response.json()
-
-# Export data to DataFrame
-players = pd.DataFrame(data['elements'])
-teams = pd.DataFrame(data['teams'])
-
-def get_fpl_players_history():
+from checkpoint import HistoryCheckpoint
+from fpl_client import get_client
+from history_store import (
+    ARCHIVE_DIR,
+    consistency_stats_path,
+    read_consistency_stats,
+    season_dir,
+    season_from_events,
+    summarize_points,
+    update_consistency_stats,
+    write_consistency_stats,
+    write_round_partitions,
+)
+from player_table import build_player_table
+from ratelimit import TokenBucket, retry_with_backoff
+from schema import (
+    PLAYERS_SCHEMA,
+    WEEKLY_POINTS_SCHEMA,
+    apply_schema,
+    format_memory_report,
+    memory_report,
+)
+from panel_tables import (
+    build_fixture_difficulty,
+    compute_consistency_from_stats,
+    fixture_pivot,
+    parse_pl_standings,
+    render_standings_html,
+    team_dependency_leaders,
+)
+from snapshot import activate_snapshot, build_snapshot
+
+# football-data.org (Premier League puan tablosu); yerel replay server için değiştirilebilir
+FOOTBALL_DATA_API_BASE = os.getenv("FOOTBALL_DATA_API_BASE", "https://api.football-data.org/v4")
+FOOTBALL_DATA_TOKEN = os.getenv("FOOTBALL_DATA_TOKEN", "8df16e10df3c45a08707dfdc1c76ef29")
+
+# Incremental mod için hangi round'ların settled olarak saklandığını tutar
+HISTORY_META_FILE = "weekly_points.meta.json"
+# Aynı anda iki çalıştırma olmasın (elle + daemon, iki daemon, ...)
+LOCK_FILE = ".weekly_job.lock"
+# Daemon modunun en son işlediği settled round'lar
+DAEMON_STATE_FILE = "weekly_job.state.json"
+DAEMON_POLL_INTERVAL = float(os.getenv("FPL_DAEMON_POLL", "600"))
+# Aşamalar çıktılarını buraya yazar; hepsi + snapshot başarılı olunca birlikte yayınlanır
+STAGING_DIR = DATA_DIR / ".weekly_staging"
+# Her aşamanın staging'e yazdığı yollar (DATA_DIR'e göre)
+STAGE_OUTPUTS = {
+    "history": ("weekly_points.csv", HISTORY_META_FILE, "history"),
+    "value_table": ("player_stats.csv",),
+    "standings": ("league_table.csv",),
+}
+
+
+class JobLocked(RuntimeError):
+    """Another weekly job run holds the lock."""
+
+
+@contextmanager
+def job_lock(path=None):
+    """
+    Exclusive, non-blocking file lock for one run of the job. Raises
+    JobLocked if another process holds it; the OS releases it if the
+    process dies, so a crashed run never leaves a stale lock behind.
+    """
+    path = path or DATA_DIR / LOCK_FILE
+    f = open(path, "a+")
+    try:
+        try:
+            if fcntl is not None:
+                fcntl.flock(f, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            else:
+                msvcrt.locking(f.fileno(), msvcrt.LK_NBLCK, 1)
+        except OSError:
+            raise JobLocked(f"weekly job already running ({path})") from None
+        yield
+    finally:
+        f.close()
+
+def write_csv_atomic(df, path):
+    """to_csv into a temp file next to `path`, then rename: readers see the old or the new file, never half of it."""
+    path = Path(path)
+    tmp = path.with_name(f".{path.name}.tmp")
+    df.to_csv(tmp, index=False, encoding='utf-8-sig')
+    os.replace(tmp, path)
+
+def _write_json_atomic(obj, path):
+    path = Path(path)
+    tmp = path.with_name(f".{path.name}.tmp")
+    tmp.write_text(json.dumps(obj, indent=2), encoding="utf-8")
+    os.replace(tmp, path)
+
+def _staged(name):
+    """Staging path of a published file (parent created)."""
+    path = STAGING_DIR / name
+    path.parent.mkdir(parents=True, exist_ok=True)
+    return path
+
+def _latest(name):
+    """The staged copy of a published path if this run produced one, else the published one."""
+    staged = STAGING_DIR / name
+    return staged if staged.exists() else DATA_DIR / name
+
+def _staged_season_dir(season, copy=True):
+    """
+    Staging copy of a season's archive dir. copy=True starts from the
+    published partitions (incremental writes only the touched rounds);
+    a full ingest rewrites every round and starts empty.
+    """
+    staged = season_dir(season, archive=STAGING_DIR / "history")
+    if not staged.exists():
+        published = season_dir(season)
+        if copy and published.exists():
+            shutil.copytree(published, staged)
+        else:
+            staged.mkdir(parents=True)
+    return staged
+
+def _clear_staged(stage):
+    for name in STAGE_OUTPUTS[stage]:
+        path = STAGING_DIR / name
+        if path.is_dir():
+            shutil.rmtree(path)
+        elif path.exists():
+            path.unlink()
+
+def publish_staged():
+    """
+    Move every staged output into place: files with os.replace, season
+    dirs by swapping the directory. Called once all stages succeeded.
+    """
+    if not STAGING_DIR.exists():
+        return
+    staged_archive = STAGING_DIR / "history"
+    if staged_archive.exists():
+        ARCHIVE_DIR.mkdir(parents=True, exist_ok=True)
+        for staged in staged_archive.iterdir():
+            target = ARCHIVE_DIR / staged.name
+            old = ARCHIVE_DIR / f".old-{staged.name}"
+            shutil.rmtree(old, ignore_errors=True)
+            if target.exists():
+                os.rename(target, old)
+            os.rename(staged, target)
+            shutil.rmtree(old, ignore_errors=True)
+    for names in STAGE_OUTPUTS.values():
+        for name in names:
+            path = STAGING_DIR / name
+            if path.is_file():
+                os.replace(path, DATA_DIR / name)
+    shutil.rmtree(STAGING_DIR, ignore_errors=True)
+
+def load_bootstrap():
+    """Get data from FPL API -> (data, players, teams). Import anında değil, çağrıldığında yüklenir."""
+    data = get_client().bootstrap()
+
+    # Export data to DataFrame
+    players = pd.DataFrame(data['elements'])
+    teams = pd.DataFrame(data['teams'])
+    return data, players, teams
+
+def get_fpl_players_history(resume=False):
     """
     Tüm oyuncuların 'element-summary' datasını çekip
     history (GW performansları) datasını tek bir DataFrame olarak döner.
+    Her oyuncu geldiği anda diske checkpoint'lenir; resume=True ise sadece
+    eksik/başarısız oyuncular çekilir.
     """
     print("get_fpl_players_history executed")
+    data, players, _ = load_bootstrap()
+    client = get_client()
     # 1. Önce bootstrap'ten tüm oyuncuların id'lerini al
     player_ids = players["id"].tolist()
+    checkpoint = HistoryCheckpoint(season_from_events(data["events"]), resume=resume)
+    done = checkpoint.done()
 
-    all_history = []
-
-    # 2. Her oyuncu için element-summary çek
+    # 2. Her oyuncu için element-summary çek (429/5xx -> backoff + jitter ile tekrar)
+    failed = []
     for pid in player_ids:
+        if pid in done:
+            continue
         try:
-            url = f"https://fantasy.premierleague.com/api/element-summary/{pid}/"
-            player_data = requests.get(url).json()
-
+            player_data = retry_with_backoff(lambda: client.element_summary(pid))
             history = pd.DataFrame(player_data["history"])
-            if not history.empty:
-                history["player_id"] = pid
-                all_history.append(history)
+            history["player_id"] = pid
+            checkpoint.save(pid, history)
 
             # FPL API'yi zorlamamak için küçük bekleme
             time.sleep(0.2)
 
         except Exception as e:
             print(f"⚠️ Player {pid} için hata: {e}")
+            failed.append(pid)
+
+    # 3. Checkpoint'lerden birleştir
+    history_df = _save_checkpointed_history(checkpoint, data, players, failed)
 
-    # 3. Tüm history'leri birleştir
+    return history_df, players
+
+def _save_checkpointed_history(checkpoint, data, players, failed):
+    """
+    Merge the checkpoints in bootstrap order and save; the checkpoint is kept if players are missing.
+    Also writes the incremental meta, so the next incremental run starts from this full ingest.
+    """
+    history_df = checkpoint.read(players["id"].tolist())
+    if history_df.empty:
+        # Hiç veri yoksa yayınlanmış weekly_points.csv'ye dokunma
+        raise RuntimeError(f"No player history could be fetched ({len(failed)} failed); "
+                           "previous data is kept, rerun with --resume")
+    history_df = _save_history([history_df], data, players)
+    _save_history_meta({
+        "season": season_from_events(data["events"]),
+        "settled_rounds": _settled_rounds(data["events"]),
+        "missing_players": sorted(int(pid) for pid in failed),
+    })
+    if failed:
+        print(f"⚠️ {len(failed)} oyuncu çekilemedi; sadece onları çekmek için --resume ile tekrar çalıştırın")
+    else:
+        checkpoint.clear()
+    return history_df
+
+def _save_history(all_history, data, players, rounds=None):
+    """
+    weekly_points.csv (sadece bu sezon) + sezon arşivindeki round partition'ları.
+    Arşiv history/season=YYYY-YY/ altında tutulur; önceki sezonlara dokunulmaz.
+    """
     history_df = pd.concat(all_history, ignore_index=True)
+    # Sezonlar arası eşleştirme için sabit oyuncu kodu (element id her sezon değişir)
+    history_df["player_code"] = history_df["player_id"].map(players.set_index("id")["code"])
 
     #history_df.to_csv("./weekly_points.csv", index=False, encoding='utf-8-sig')
-    history_df.to_csv(DATA_DIR / "weekly_points.csv", index=False, encoding='utf-8-sig')
+    write_csv_atomic(history_df, _staged("weekly_points.csv"))
+
+    # Dashboard'un hızlı okuması için round bazlı kolon formatı (Arrow IPC, kompakt tipler)
+    season = season_from_events(data["events"])
+    root = _staged_season_dir(season, copy=rounds is not None)
+    write_round_partitions(history_df, root, rounds=rounds)
+    if rounds is None:
+        # Tam indirmede oyuncu başı count/mean/M2 özetini baştan kur
+        write_consistency_stats(summarize_points(history_df), consistency_stats_path(root))
+    print(format_memory_report(memory_report(
+        "weekly_points", history_df, apply_schema(history_df, WEEKLY_POINTS_SCHEMA)
+    )))
+
+    return history_df
+
+def get_fpl_players_history_concurrent(max_workers=8, rate=10.0, burst=None, resume=False):
+    """
+    get_fpl_players_history ile aynı çıktıyı üretir, fakat element-summary
+    isteklerini paylaşılan (pooled) bir Session üzerinden en fazla
+    `max_workers` paralel istekle atar. Sabit sleep yerine token bucket
+    (`rate` istek/saniye, `burst` kapasite) ile hız sınırlanır.
+    Sonuçlar geldikçe checkpoint'lenir; resume=True sadece eksikleri çeker.
+    """
+    print(f"get_fpl_players_history_concurrent executed (workers={max_workers}, rate={rate}/s)")
+    data, players, _ = load_bootstrap()
+    player_ids = players["id"].tolist()
+    checkpoint = HistoryCheckpoint(season_from_events(data["events"]), resume=resume)
+    done = checkpoint.done()
+    todo = [pid for pid in player_ids if pid not in done]
+    if done:
+        print(f"Checkpoint'ten devam: {len(done)} oyuncu hazır, {len(todo)} çekilecek")
+
+    results = _fetch_histories(todo, max_workers, rate, burst, sink=checkpoint.save)
+    failed = [pid for pid in todo if pid not in results]
+
+    # Sıralı sürümle aynı satır sırası için bootstrap sırasına göre birleştir
+    history_df = _save_checkpointed_history(checkpoint, data, players, failed)
+
+    return history_df, players
+
+def _fetch_histories(player_ids, max_workers=8, rate=10.0, burst=None, sink=None):
+    """
+    Fetch element-summary history for `player_ids` concurrently -> {pid: DataFrame}.
+    İstekler FPLClient'in pooled Session'ı üzerinden gider (pool_size >= max_workers olmalı).
+    - 429/5xx and connection errors are retried with exponential backoff + jitter
+    - sink(pid, df): called as each player arrives (e.g. checkpoint to disk);
+      the returned dict then maps the pid to None instead of holding the frame
+    """
+    client = get_client()
+    bucket = TokenBucket(rate, burst)
+
+    def fetch(pid):
+        def request():
+            # Her deneme token bucket'tan geçer: tekrarlar da hız limitine dahil
+            bucket.acquire()
+            return client.element_summary(pid)
+        return pd.DataFrame(retry_with_backoff(request)["history"])
+
+    results = {}
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        futures = {pool.submit(fetch, pid): pid for pid in player_ids}
+        for future in as_completed(futures):
+            pid = futures[future]
+            try:
+                history = future.result()
+            except Exception as e:
+                print(f"⚠️ Player {pid} için hata: {e}")
+                continue
+            history["player_id"] = pid
+            if sink is not None:
+                sink(pid, history)
+                results[pid] = None
+            elif not history.empty:
+                results[pid] = history
+    elapsed = time.perf_counter() - start
+
+    if player_ids:
+        print(f"{len(player_ids)} istek {elapsed:.1f} s içinde tamamlandı "
+              f"({len(player_ids) / max(elapsed, 1e-9):.1f} istek/s)")
+
+    return results
+
+def _load_history_meta():
+    path = DATA_DIR / HISTORY_META_FILE
+    if not path.exists():
+        return {}
+    return json.loads(path.read_text(encoding="utf-8"))
+
+def _save_history_meta(meta):
+    _write_json_atomic(meta, _staged(HISTORY_META_FILE))
+
+def plan_incremental_refresh(stored, players, events, fixtures, known_settled=None, missing=()):
+    """
+    Mevcut history'e bakarak hangi round'ların event/{gw}/live ile, hangi
+    oyuncuların element-summary ile yeniden çekilmesi gerektiğini belirler.
+    Returns (dirty_rounds, player_ids).
+
+    - A round is settled once bootstrap `events` marks it finished and
+      data_checked. Settled rounds not yet stored as settled are dirty and
+      are fetched with one event/{gw}/live request each (see _live_rows).
+    - known_settled: rounds already stored after they settled (from the
+      sidecar meta). Without it, every stored round except the latest one
+      is assumed final, since the latest could have been stored mid-GW.
+    - player_ids: players whose element-summary is refetched. These are
+      players with a row flagged `modified`, players a previous run failed
+      to fetch (`missing`), and players whose team has more than one
+      fixture in a dirty round, since live stats are per gameweek and a
+      double gameweek needs one row per fixture.
+    """
+    settled = {int(e["id"]) for e in events if e.get("finished") and e.get("data_checked")}
+
+    stored_rounds = set(stored["round"].astype(int)) if not stored.empty else set()
+    if known_settled is None:
+        latest = max(stored_rounds, default=0)
+        known_settled = {r for r in stored_rounds if r < latest}
+    dirty_rounds = sorted(settled - set(known_settled))
+
+    double_teams = set()
+    for gw in dirty_rounds:
+        teams = pd.Series([t for f in fixtures if f.get("event") == gw for t in (f["team_h"], f["team_a"])])
+        double_teams.update(teams[teams.duplicated()])
+
+    to_fetch = set(players.loc[players["team"].isin(double_teams), "id"]) | set(missing)
+    if not stored.empty and "modified" in stored.columns:
+        modified = stored["modified"].astype(str).str.lower() == "true"
+        to_fetch |= set(stored.loc[modified, "player_id"])
+
+    player_order = players["id"].tolist()
+    return dirty_rounds, [pid for pid in player_order if pid in to_fetch]
+
+# Deadline'da sabitlenen kolonlar: event/live'da yok
+DEADLINE_COLUMNS = ("value", "transfers_balance", "selected", "transfers_in", "transfers_out")
+
+def _live_rows(live, gw, fixtures, players, stored, data):
+    """
+    History rows (element-summary layout) for one settled round from its
+    event/{gw}/live payload; players without exactly one fixture get none.
+    Stats and fixture fields come from live + fixtures. The deadline
+    columns (value, selected, transfers) are taken from a stored row of the
+    same fixture if one exists, else from bootstrap for the current round
+    (value: now_cost for any round); otherwise they are left empty.
+    """
+    by_id = {f["id"]: f for f in fixtures if f.get("event") == gw}
+    team_fixtures = {}
+    for f in by_id.values():
+        team_fixtures.setdefault(f["team_h"], []).append(f["id"])
+        team_fixtures.setdefault(f["team_a"], []).append(f["id"])
+    team_of = players.set_index("id")["team"].to_dict()
+
+    rows = []
+    for el in live.get("elements", []):
+        pid = el["id"]
+        team = team_of.get(pid)
+        if team is None:
+            continue
+        fids = [e["fixture"] for e in el.get("explain", []) if e.get("fixture") in by_id]
+        fids = fids or team_fixtures.get(team, [])
+        if len(fids) != 1:
+            # Blank GW: satır yok (element-summary'de de yok); çift maç: element-summary çeker
+            continue
+        f = by_id[fids[0]]
+        was_home = f["team_h"] == team
+        row = {k: v for k, v in el["stats"].items() if k in WEEKLY_POINTS_SCHEMA}
+        row.update({
+            "element": pid,
+            "fixture": f["id"],
+            "opponent_team": f["team_a"] if was_home else f["team_h"],
+            "was_home": was_home,
+            "kickoff_time": f["kickoff_time"],
+            "team_h_score": f["team_h_score"],
+            "team_a_score": f["team_a_score"],
+            "round": gw,
+            "modified": bool(el.get("modified", False)),
+            "player_id": pid,
+        })
+        rows.append(row)
+    live_df = pd.DataFrame(rows)
+    if live_df.empty:
+        return live_df
+
+    keys = ["player_id", "fixture"]
+    known = [c for c in DEADLINE_COLUMNS if c in stored.columns]
+    if known:
+        live_df = live_df.merge(stored[keys + known].drop_duplicates(keys), on=keys, how="left")
+    for col in DEADLINE_COLUMNS:
+        if col not in live_df.columns:
+            live_df[col] = float("nan")
+    boot = players.set_index("id").reindex(live_df["player_id"])
+    live_df["value"] = live_df["value"].fillna(pd.Series(boot["now_cost"].to_numpy(), index=live_df.index))
+    current = next((e["id"] for e in data["events"] if e.get("is_current")), None)
+    if gw == current:
+        t_in = boot["transfers_in_event"].to_numpy()
+        t_out = boot["transfers_out_event"].to_numpy()
+        selected = (pd.to_numeric(boot["selected_by_percent"], errors="coerce") / 100 * data.get("total_players", 0)).round()
+        live_df["transfers_in"] = live_df["transfers_in"].fillna(pd.Series(t_in, index=live_df.index))
+        live_df["transfers_out"] = live_df["transfers_out"].fillna(pd.Series(t_out, index=live_df.index))
+        live_df["transfers_balance"] = live_df["transfers_balance"].fillna(pd.Series(t_in - t_out, index=live_df.index))
+        live_df["selected"] = live_df["selected"].fillna(pd.Series(selected.to_numpy(), index=live_df.index))
+    return live_df
+
+def get_fpl_players_history_incremental(max_workers=8, rate=10.0, burst=None, resume=False):
+    """
+    Mevcut weekly_points.csv'yi okur; yeni settled round'ları event/{gw}/live
+    ile (GW başına tek istek) ekler, sadece düzeltilmiş/eksik/çift maçlı
+    oyuncuları element-summary ile çeker ve store'a yerinde (in place) merge eder.
+    Store yoksa ya da önceki sezona aitse tam (concurrent) indirmeye düşer.
+    """
+    print("get_fpl_players_history_incremental executed")
+    data, players, _ = load_bootstrap()
+    season = season_from_events(data["events"])
+    path = DATA_DIR / "weekly_points.csv"
+    meta = _load_history_meta()
+    if not path.exists() or meta.get("season", season) != season:
+        print(f"{season} için weekly_points.csv bulunamadı, tam indirme yapılıyor")
+        # Tam indirme meta'yı kendisi yazar
+        return get_fpl_players_history_concurrent(max_workers, rate, burst, resume=resume)
+
+    stored = pd.read_csv(path, encoding="utf-8-sig")
+    client = get_client()
+    fixtures = client.fixtures()
+
+    if resume:
+        # Artımlı çalıştırma checkpoint tutmaz: yarıda kalan bir çalıştırma hiçbir şey
+        # yazmamıştır, tekrar çalıştırınca aynı oyuncular yeniden planlanır
+        print("⚠️ --resume only applies to full history ingests; the incremental run re-plans from weekly_points.csv")
+
+    known = meta.get("settled_rounds")
+    dirty_rounds, to_fetch = plan_incremental_refresh(
+        stored, players, data["events"], fixtures,
+        known_settled=set(known) if known is not None else None,
+        missing=meta.get("missing_players", ()),
+    )
+    print(f"Yeni/değişmiş round'lar: {dirty_rounds} -> {len(dirty_rounds)} event/live + "
+          f"{len(to_fetch)} element-summary isteği (tam indirme: {len(players)})")
+
+    if not dirty_rounds and not to_fetch:
+        # Yeni/değişmiş veri yok: CSV ve partition'lar yeniden yazılmaz
+        _save_history_meta({"season": season, "settled_rounds": _settled_rounds(data["events"]), "missing_players": []})
+        return stored, players
+
+    # GW başına tek istek; başarısız olursa çalıştırma hiçbir şey yazmadan durur
+    live = [
+        _live_rows(retry_with_backoff(lambda gw=gw: client.event_live(gw)), gw, fixtures, players, stored, data)
+        for gw in dirty_rounds
+    ]
+    results = _fetch_histories(to_fetch, max_workers, rate, burst)
+
+    # Sadece başarıyla çekilen oyuncuların satırlarını değiştir;
+    # hata alanlar eski satırlarıyla kalır ve bir sonraki çalıştırmada tekrar denenir.
+    # Onların yeni round satırları (varsa) live'dan gelir.
+    refreshed = list(results)
+    live_df = pd.concat([df for df in live if not df.empty] or [stored.iloc[:0]], ignore_index=True)
+    live_df = live_df[~live_df["player_id"].isin(refreshed)]
+    # Live satırı gelen (oyuncu, round) çiftlerinin eski (mid-GW) satırları düşer
+    pairs = pd.MultiIndex.from_frame(stored[["player_id", "round"]])
+    replaced = pairs.isin(pd.MultiIndex.from_frame(live_df[["player_id", "round"]]))
+    kept = stored[~stored["player_id"].isin(refreshed) & ~replaced]
+    merged = pd.concat([kept, live_df] + [results[pid] for pid in refreshed], ignore_index=True)
+
+    # Tam indirme ile aynı sıra: bootstrap oyuncu sırası, sonra kickoff
+    order = {pid: i for i, pid in enumerate(players["id"].tolist())}
+    merged["_order"] = merged["player_id"].map(order).fillna(len(order))
+    merged = (
+        merged.sort_values(["_order", "kickoff_time"], kind="stable")
+        .drop(columns="_order")
+        .reset_index(drop=True)
+    )
+    # Sadece yenilenen oyuncuların ve yeni round'ların partition'larını yeniden yaz
+    touched = set(stored.loc[stored["player_id"].isin(refreshed), "round"]) | set(live_df["round"])
+    for pid in refreshed:
+        touched |= set(results[pid]["round"])
+    history_df = _save_history([merged], data, players, rounds=touched)
+
+    # Consistency özetini sadece yeni gelen satırlarla güncelle (Welford/Chan):
+    # değişen oyuncuların tüm history'si, diğerlerine sadece yeni fixture'lar eklenir
+    stats_path = consistency_stats_path(_staged_season_dir(season))
+    fresh = merged[merged["player_id"].isin(set(refreshed) | set(live_df["player_id"]))]
+    stats = update_consistency_stats(stored, fresh, stats_path)
+    if stats.empty:
+        write_consistency_stats(summarize_points(history_df), stats_path)
+
+    # Çekilemeyen oyuncular bir sonraki çalıştırmada tekrar denenir (round'lar settled sayılır)
+    failed = set(to_fetch) - set(refreshed)
+    _save_history_meta({
+        "season": season,
+        "settled_rounds": _settled_rounds(data["events"]),
+        "missing_players": sorted(int(pid) for pid in failed),
+    })
 
     return history_df, players
 
+def _settled_rounds(events):
+    return sorted(int(e["id"]) for e in events if e.get("finished") and e.get("data_checked"))
+
 def fpl_value_calc():
+    _, players, teams = load_bootstrap()
     position_map = {
         1: "Goalkeeper",
         2: "Defender",
@@ -110,13 +602,14 @@ def fpl_value_calc():
     print(table_data.head())  # İlk birkaç satırı yazdır
 
 
-    table_data.to_csv(DATA_DIR / "player_stats.csv", index=False, encoding='utf-8-sig')
+    write_csv_atomic(table_data, _staged("player_stats.csv"))
 
 def pl_table():
-    url = "https://api.football-data.org/v4/competitions/PL/standings"
-    headers = {"X-Auth-Token": "8df16e10df3c45a08707dfdc1c76ef29"}
+    url = f"{FOOTBALL_DATA_API_BASE}/competitions/PL/standings"
+    headers = {"X-Auth-Token": FOOTBALL_DATA_TOKEN}
 
-    response = requests.get(url, headers=headers)
+    response = requests.get(url, headers=headers, timeout=15)
+    response.raise_for_status()
     data = response.json()
     table = data['standings'][0]['table']   # bu list of dict
     df = pd.DataFrame(table)                # DataFrame'e çevir
@@ -125,9 +618,206 @@ def pl_table():
     # df = df[["position", "team", "playedGames", "won", "draw", "lost", "points", "goalDifference"]]
 
     #df.to_csv("./league_table.csv", index=False, encoding='utf-8-sig')
-    df.to_csv(DATA_DIR / "league_table.csv", index=False, encoding='utf-8-sig')
+    write_csv_atomic(df, _staged("league_table.csv"))
+
+def build_snapshot_stage():
+    """
+    Dashboard'un sadece haftalık veriye bağlı çıktılarını (puan tablosu HTML,
+    value tablosu, TDR, consistency, fikstür tabloları) önceden hesaplar ve
+    yeni bir snapshot version'ı olarak yazar. fpl_value_calc, pl_table ve
+    history aşamalarından sonra çalışmalı; onların bu run'da staging'e
+    yazdığı çıktıları okur. Returns the version, not yet active
+    (run_pipeline activates it after publishing the staged files).
+    """
+    data, players, teams = load_bootstrap()
+    players = build_player_table(apply_schema(players, PLAYERS_SCHEMA, compact_remaining=True), teams)
+    fixtures = get_client().fixtures()
+    events = data["events"]
+    # Sezon öncesi (ilk deadline'dan önce) is_current olan event yok
+    current_gw = next((e["id"] for e in events if e["is_current"]), None)
+    season = season_from_events(events)
+
+    season_root = season_dir(season, archive=STAGING_DIR / "history")
+    if not season_root.exists():
+        season_root = season_dir(season)
+    stats = read_consistency_stats(consistency_stats_path(season_root))
+    if stats.empty:
+        history = pd.read_csv(_latest("weekly_points.csv"), usecols=["player_id", "total_points"])
+        stats = summarize_points(history)
+
+    artifacts = {
+        "standings_html": render_standings_html(
+            parse_pl_standings(pd.read_csv(_latest("league_table.csv"), encoding="utf-8-sig"))
+        ),
+        "value_table": pd.read_csv(_latest("player_stats.csv"), encoding="utf-8-sig"),
+        "tdr": team_dependency_leaders(players),
+        "consistency": compute_consistency_from_stats(stats, players),
+    }
+    # Fikstür tabloları current GW'ye bağlı; yoksa snapshot'a girmez, panel canlı hesaplar
+    if current_gw is not None:
+        fixture_avg, fixture_df = build_fixture_difficulty(fixtures, teams, events, gameweeks=5)
+        if not fixture_df.empty:
+            artifacts["fixture_avg"] = fixture_avg
+            artifacts["fixture_pivot"] = fixture_pivot(fixture_df).reset_index()
+
+    start = time.perf_counter()
+    version = build_snapshot(artifacts, meta={"season": season, "gw": current_gw}, activate=False)
+    print(f"Snapshot {version}: {len(artifacts)} artifact ({time.perf_counter() - start:.2f} s)")
+    return version
 
  
-get_fpl_players_history()
-fpl_value_calc()
-pl_table()
+def history_stage(ingest_mode=None, resume=False):
+    # FPL_INGEST_MODE=concurrent -> paralel, token bucket ile sınırlı ingestion
+    # FPL_INGEST_MODE=incremental -> sadece yeni/değişmiş round'ları çek ve merge et
+    ingest_mode = ingest_mode or os.getenv("FPL_INGEST_MODE", "sequential")
+    ingest_kwargs = dict(
+        max_workers=int(os.getenv("FPL_INGEST_WORKERS", "8")),
+        rate=float(os.getenv("FPL_INGEST_RATE", "10")),
+    )
+    if ingest_mode == "concurrent":
+        return get_fpl_players_history_concurrent(**ingest_kwargs, resume=resume)
+    if ingest_mode == "incremental":
+        return get_fpl_players_history_incremental(**ingest_kwargs, resume=resume)
+    return get_fpl_players_history(resume=resume)
+
+def run_pipeline(ingest_mode=None, resume=False, skip=(), on_stage_done=None):
+    """
+    One full run under the job lock. history, value table and standings
+    don't depend on each other and run in parallel; the snapshot stage
+    reads all three outputs, so it runs after them.
+    Stages write to STAGING_DIR. Nothing is published until every stage and
+    the snapshot build succeeded; then the staged files are moved into place
+    and the snapshot is activated, so the CSVs, the history partitions and
+    the snapshot always come from the same run.
+    - resume: continue an interrupted full history ingest from its checkpoint
+    - skip: stages already done for this data (history, value_table,
+      standings, snapshot); the daemon reruns only the failed ones, the
+      staged outputs of the others are kept for the publish
+    - on_stage_done(name): called as soon as a stage succeeds ("snapshot":
+      once everything is published)
+    """
+    with job_lock():
+        start = time.perf_counter()
+        # Daemon'da bootstrap/fixtures bellekte eski kalmasın: bu run için taze yükle
+        client = get_client()
+        client.bootstrap(refresh=True)
+        client.fixtures(refresh=True)
+
+        stages = {
+            "history": lambda: history_stage(ingest_mode, resume),
+            "value_table": fpl_value_calc,
+            "standings": pl_table,
+        }
+        stages = {name: fn for name, fn in stages.items() if name not in skip}
+        if not skip:
+            shutil.rmtree(STAGING_DIR, ignore_errors=True)
+        for name in stages:
+            # Yarım kalmış önceki denemenin çıktıları
+            _clear_staged(name)
+        errors = {}
+        if stages:
+            with ThreadPoolExecutor(max_workers=len(stages), thread_name_prefix="weekly-stage") as pool:
+                futures = {pool.submit(fn): name for name, fn in stages.items()}
+                for future in as_completed(futures):
+                    name = futures[future]
+                    try:
+                        future.result()
+                    except Exception as e:
+                        errors[name] = e
+                        continue
+                    if on_stage_done is not None:
+                        on_stage_done(name)
+        if errors:
+            # Hiçbir şey yayınlanmaz: eski CSV'ler ve snapshot birlikte kalır,
+            # başarılı aşamaların çıktıları bir sonraki deneme için staging'de bekler
+            raise RuntimeError(f"weekly stages failed: {errors}")
+        if "snapshot" not in skip:
+            version = build_snapshot_stage()
+            publish_staged()
+            activate_snapshot(version)
+            if on_stage_done is not None:
+                on_stage_done("snapshot")
+        print(f"Weekly job: {time.perf_counter() - start:.1f} s")
+
+def _load_daemon_state():
+    path = DATA_DIR / DAEMON_STATE_FILE
+    if not path.exists():
+        return {}
+    return json.loads(path.read_text(encoding="utf-8"))
+
+def run_daemon(poll_interval=DAEMON_POLL_INTERVAL, ingest_mode=None, once=False):
+    """
+    Long-running scheduler: polls the events state and runs the pipeline
+    only when a gameweek's `data_checked` flips (yeni settled round).
+    bootstrap-static conditional GET ile sorulur; değişmediyse 304 döner.
+
+    Each successful stage is recorded in the state file under `pending`
+    (for the settled rounds it ran for). After a failure, the next poll
+    reruns only the stages not recorded there, e.g. a standings outage
+    does not trigger another full history ingest.
+    """
+    path = DATA_DIR / DAEMON_STATE_FILE
+    # Daemon her settled round'da çalışır: varsayılan artımlı ingest
+    ingest_mode = ingest_mode or os.getenv("FPL_INGEST_MODE", "incremental")
+    while True:
+        try:
+            events = get_client().bootstrap(refresh=True)["events"]
+            settled = _settled_rounds(events)
+            state = _load_daemon_state()
+            if settled != state.get("settled_rounds"):
+                pending = state.get("pending") or {}
+                # Başka bir round seti için yarım kalmış aşamalar geçersiz
+                done = set(pending.get("done", [])) if pending.get("settled_rounds") == settled else set()
+                # Staging'de çıktısı kalmamış aşama tekrar çalışır
+                done = {n for n in done if n not in STAGE_OUTPUTS
+                        or any((STAGING_DIR / p).exists() for p in STAGE_OUTPUTS[n])}
+                new = sorted(set(settled) - set(state.get("settled_rounds") or []))
+                print(f"Settled rounds changed (yeni: {new}), running weekly job"
+                      + (f" (already done: {sorted(done)})" if done else ""))
+
+                def stage_done(name):
+                    done.add(name)
+                    _write_json_atomic({**state, "pending": {"settled_rounds": settled, "done": sorted(done)}}, path)
+
+                run_pipeline(ingest_mode, skip=set(done), on_stage_done=stage_done)
+                _write_json_atomic({"settled_rounds": settled, "ran_at": time.strftime("%Y-%m-%dT%H:%M:%S")}, path)
+        except JobLocked as e:
+            print(f"Skipped: {e}")
+        except Exception as e:
+            # settled_rounds güncellenmez; bir sonraki poll'da sadece başarısız aşamalar tekrar denenir
+            print(f"Weekly job failed, retrying at next poll: {e!r}")
+        if once:
+            return
+        time.sleep(poll_interval)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="FPL weekly data job")
+    parser.add_argument("--daemon", action="store_true",
+                        help="keep running and refresh when a gameweek's data_checked flips")
+    parser.add_argument("--poll-interval", type=float, default=DAEMON_POLL_INTERVAL,
+                        help="seconds between events polls in daemon mode (FPL_DAEMON_POLL)")
+    parser.add_argument("--resume", action="store_true",
+                        help="continue an interrupted full history ingest: fetch only missing/failed players "
+                             "(incremental runs ignore it and re-plan from the stored history)")
+    parser.add_argument("--once", action="store_true",
+                        help="with --daemon: poll once and exit (e.g. from cron)")
+    args = parser.parse_args(argv)
+
+    if args.daemon:
+        run_daemon(args.poll_interval, once=args.once)
+        return
+
+    try:
+        run_pipeline(resume=args.resume)
+    except JobLocked as e:
+        print(e)
+        raise SystemExit(1)
+    _, players, _ = load_bootstrap()
+    print(format_memory_report(memory_report(
+        "players", players, apply_schema(players, PLAYERS_SCHEMA, compact_remaining=True)
+    )))
+    print("HTTP cache:", get_client().cache.stats())
+
+
+if __name__ == "__main__":
+    main()
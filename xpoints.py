@@ -0,0 +1,156 @@
+import numpy as np
+import pandas as pd
+
+from fixture_index import get_fixture_index
+
+# Fikstür çarpanları: FDR 1 (kolay) .. 5 (zor); index 0 kullanılmaz (boş slot)
+DIFFICULTY_FACTOR = np.array([0.0, 1.25, 1.12, 1.0, 0.88, 0.76])
+# [deplasman, iç saha]
+HOME_FACTOR = np.array([0.95, 1.05])
+# Oynanan maç başı puan, pozisyon ortalamasına bu kadar maç ağırlığıyla çekilir
+PRIOR_APPEARANCES = 3
+# Oynama olasılığı son bu kadar GW'deki fikstürlerden hesaplanır
+RECENT_GWS = 8
+# Chip önerileri ve paneller için varsayılan ufuk
+XP_HORIZON = 5
+
+RATE_COLUMNS = ["player_id", "round", "total_points", "minutes"]
+
+
+def horizon_start(events) -> int:
+    """
+    First GW of the default horizon: the first GW whose deadline has not
+    passed, i.e. is_next (current + 1, as in the fixture difficulty tables).
+    Pre-season that is the first GW; after the last GW it is past the season
+    and the projection is all zeros.
+    """
+    nxt = next((e["id"] for e in events if e.get("is_next")), None)
+    if nxt is not None:
+        return int(nxt)
+    current = next((e["id"] for e in events if e.get("is_current")), None)
+    if current is not None:
+        return int(current) + 1
+    return int(min((e["id"] for e in events), default=1))
+
+
+def player_rates(weekly_points: pd.DataFrame, players: pd.DataFrame) -> pd.DataFrame:
+    """
+    Per-player inputs of the projection, from weekly_points:
+    - rate: points per appearance (minutes > 0), shrunk towards the position
+      average with PRIOR_APPEARANCES pseudo-games
+    - p_play: share of the team's fixtures in the last RECENT_GWS rounds the
+      player appeared in (0 without history)
+    One row per bootstrap player, in `players` order.
+    """
+    ids = players["id"].astype("int64").to_numpy()
+    position = pd.Series(players["element_type"].to_numpy(), index=ids)
+
+    wp = weekly_points.dropna(subset=["player_id"])
+    pid = wp["player_id"].astype("int64")
+    points = wp["total_points"].astype("float64")
+    played = wp["minutes"].astype("float64") > 0
+
+    apps = played.groupby(pid).sum()
+    app_points = points.where(played, 0.0).groupby(pid).sum()
+    pos = position.reindex(apps.index)
+    pos_mean = app_points.groupby(pos).sum() / apps.groupby(pos).sum().replace(0, np.nan)
+    prior = pos.map(pos_mean).fillna(pos_mean.mean() if len(pos_mean) else 0.0)
+    rate = (app_points + PRIOR_APPEARANCES * prior) / (apps + PRIOR_APPEARANCES)
+
+    last_round = wp["round"].max() if len(wp) else 0
+    recent = wp["round"] > last_round - RECENT_GWS
+    p_play = played[recent].groupby(pid[recent]).mean()
+
+    out = pd.DataFrame({"id": ids})
+    out["rate"] = rate.reindex(ids).fillna(0.0).to_numpy()
+    out["p_play"] = p_play.reindex(ids).fillna(0.0).to_numpy()
+    return out
+
+
+class Projection:
+    """
+    Expected points of every player for every GW of a horizon.
+    - player_ids: (P,) bootstrap ids; gws: (H,) gameweek numbers
+    - xp: (P, H) array; 0 for blank GWs, both fixtures summed for doubles
+    - version: id of the inputs it was built from (cache keys of callers)
+    Treat the arrays as read-only (paylaşılan nesne).
+    """
+
+    def __init__(self, player_ids, gws, xp, version=None):
+        self.player_ids = np.asarray(player_ids)
+        self.gws = np.asarray(gws)
+        self.xp = xp
+        self.version = version
+        self._row = pd.Series(np.arange(len(self.player_ids)), index=self.player_ids)
+
+    @property
+    def horizon(self) -> int:
+        return len(self.gws)
+
+    def _rows(self, player_ids):
+        return self._row.reindex(np.asarray(player_ids)).to_numpy()
+
+    def for_gw(self, player_ids, gw) -> np.ndarray:
+        """xP of `player_ids` in `gw` (NaN for unknown players or a GW outside the horizon)."""
+        rows = self._rows(player_ids)
+        out = np.full(len(rows), np.nan)
+        if gw not in self.gws:
+            return out
+        col = int(np.flatnonzero(self.gws == gw)[0])
+        known = ~np.isnan(rows)
+        out[known] = self.xp[rows[known].astype(np.int64), col]
+        return out
+
+    def total(self, player_ids, n_gws=None) -> np.ndarray:
+        """xP of `player_ids` summed over the first `n_gws` GWs of the horizon (default: all)."""
+        rows = self._rows(player_ids)
+        out = np.full(len(rows), np.nan)
+        known = ~np.isnan(rows)
+        out[known] = self.xp[rows[known].astype(np.int64), :n_gws].sum(axis=1)
+        return out
+
+    def to_frame(self) -> pd.DataFrame:
+        """id, one `GW n` column per gameweek and `xP total`."""
+        out = pd.DataFrame(self.xp, columns=[f"GW {gw}" for gw in self.gws])
+        out.insert(0, "id", self.player_ids)
+        out["xP total"] = self.xp.sum(axis=1)
+        return out
+
+
+def project_points(players: pd.DataFrame, rates: pd.DataFrame, index, gw_start, horizon=XP_HORIZON) -> Projection:
+    """
+    One NumPy pass: players × GW × fixture slot difficulty/venue lookups from
+    the FixtureIndex, times each player's rate and play probability.
+    - GW 1 of the horizon also uses chance_of_playing_next_round
+    - status "u" (unavailable, left the club) projects 0 everywhere
+    """
+    gws = np.arange(int(gw_start), int(gw_start) + int(horizon))
+    teams = players["team"].astype("int64").to_numpy()
+    rows = np.where((teams >= 0) & (teams <= index.n_teams), teams, 0)
+
+    # Sezon sonunu aşan GW'ler fikstürsüz (0) kalır
+    in_season = (gws >= 0) & (gws <= index.n_gws)
+    cols = np.where(in_season, gws, 0)
+    count = index.count[rows[:, None], cols[None, :]] * in_season           # (P, H)
+    difficulty = index.difficulty[rows[:, None], cols[None, :]]            # (P, H, S)
+    is_home = index.is_home[rows[:, None], cols[None, :]]
+    used = np.arange(difficulty.shape[2]) < count[..., None]
+    fixture_weight = (DIFFICULTY_FACTOR[difficulty] * HOME_FACTOR[is_home.astype(np.int64)] * used).sum(axis=2)
+
+    base = (rates["rate"] * rates["p_play"]).to_numpy()
+    xp = base[:, None] * fixture_weight
+
+    if "chance_of_playing_next_round" in players.columns:
+        chance = pd.to_numeric(players["chance_of_playing_next_round"], errors="coerce").to_numpy()
+        xp[:, 0] *= np.where(np.isnan(chance), 1.0, chance / 100)
+    if "status" in players.columns:
+        xp[(players["status"].astype(str) == "u").to_numpy()] = 0.0
+
+    return Projection(players["id"].to_numpy(), gws, xp)
+
+
+def build_projection(players: pd.DataFrame, fixtures, weekly_points: pd.DataFrame, gw_start,
+                     horizon=XP_HORIZON) -> Projection:
+    """player_rates + project_points with the shared FixtureIndex."""
+    rates = player_rates(weekly_points, players)
+    return project_points(players, rates, get_fixture_index(fixtures), gw_start, horizon)